@@ -9,12 +9,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.api.polygon_fetcher import PolygonDataFetcher
+from src.api.quote_stream import get_quote_stream
 from src.processing.feature_engineer import add_all_features
 from src.analysis.historical_analysis import calculate_performance_metrics
 from src.components.chart_generator import (
     create_candlestick_chart, create_line_chart, 
-    create_volume_chart, create_multi_line_chart
+    create_volume_chart, create_multi_line_chart, cached_figure
 )
+from src.components.downsampling import candle_budget
 from src.components.table_display import display_key_stats, display_metrics_row
 from config.settings import COLORS
 
@@ -36,6 +38,12 @@ def fetch_stock_data_polygon(ticker: str, days_back: int = 365):
     return info, price, historical
 
 
+@st.cache_data(ttl=3600)
+def compute_features(historical: pd.DataFrame) -> pd.DataFrame:
+    """Add technical indicators (cached so widget reruns skip recomputing them)."""
+    return add_all_features(historical, 'close')
+
+
 def show():
     """Display the stock dashboard page."""
     st.title("📈 Stock Analysis Dashboard")
@@ -82,6 +90,12 @@ def show():
                 st.info("Please check the ticker symbol and try again.")
                 return
             
+            # Overlay streamed trades on the (cached) REST price when the stream is fresh
+            stream = get_quote_stream()
+            if stream is not None:
+                stream.subscribe([ticker])
+                price = stream.aggregator.apply_to_price(ticker, price)
+            
             st.markdown("---")
             
             # Display stock header and key metrics
@@ -99,6 +113,12 @@ def show():
                     f"{price['change']:+.2f} ({price['change_percent']:+.2f}%)",
                     delta_color=change_color
                 )
+                if price.get('source') == 'stream' and price.get('delayed'):
+                    st.caption(f"🟡 Delayed (~15 min) as of {price['as_of'].strftime('%H:%M:%S')} UTC")
+                elif price.get('source') == 'stream':
+                    st.caption(f"🟢 Live as of {price['as_of'].strftime('%H:%M:%S')} UTC")
+                else:
+                    st.caption("Latest daily close (streaming quote unavailable)")
             
             # Key statistics
             st.markdown("---")
@@ -128,28 +148,61 @@ def show():
                         ["Candlestick", "Line"],
                         help="Select chart visualization type"
                     )
+                    
+                    # Long histories are downsampled; zooming redraws the window at full resolution
+                    x_range = None
+                    first_day = historical['date'].min().date()
+                    last_day = historical['date'].max().date()
+                    if len(historical) > candle_budget() and first_day < last_day:
+                        x_range = st.slider(
+                            "Zoom",
+                            min_value=first_day,
+                            max_value=last_day,
+                            value=(first_day, last_day),
+                            help="Narrow the date range to see every bar"
+                        )
                 
                 with chart_col2:
                     if chart_type == "Candlestick":
-                        fig = create_candlestick_chart(
+                        fig = cached_figure(
+                            create_candlestick_chart,
                             historical,
-                            title=f"{ticker} Price - {period_label}"
+                            title=f"{ticker} Price - {period_label}",
+                            x_range=x_range
                         )
                     else:
-                        fig = create_line_chart(
+                        fig = cached_figure(
+                            create_line_chart,
                             historical,
                             x_column='date',
                             y_column='close',
                             title=f"{ticker} Price - {period_label}",
                             y_label="Close Price",
-                            color=COLORS['info']
+                            color=COLORS['info'],
+                            x_range=x_range
                         )
                     
                     st.plotly_chart(fig, use_container_width=True)
+                    meta = fig.layout.meta or {}
+                    if meta.get('downsampled'):
+                        st.caption(
+                            f"Showing {meta['points']:,} of {meta['total']:,} points - "
+                            "zoom in for full resolution"
+                        )
+                
+                # Intraday bars aggregated from the quote stream
+                if stream is not None:
+                    intraday = stream.aggregator.bars(ticker)
+                    if not intraday.empty:
+                        with st.expander("⏱️ Intraday (1-minute bars, streamed)"):
+                            st.plotly_chart(
+                                create_candlestick_chart(intraday, title=f"{ticker} - 1 Minute Bars"),
+                                use_container_width=True
+                            )
                 
                 # Volume chart
                 with st.expander("📊 View Trading Volume"):
-                    vol_fig = create_volume_chart(historical, title=f"{ticker} Volume")
+                    vol_fig = cached_figure(create_volume_chart, historical, title=f"{ticker} Volume")
                     st.plotly_chart(vol_fig, use_container_width=True)
                 
                 st.markdown("---")
@@ -158,24 +211,27 @@ def show():
                 st.subheader("🔧 Technical Analysis")
                 
                 # Add technical indicators
-                historical_with_features = add_all_features(historical, 'close')
+                historical_with_features = compute_features(historical)
                 
                 # Display moving averages
                 st.markdown("##### Moving Averages")
                 
-                ma_fig = create_multi_line_chart(
+                ma_fig = cached_figure(
+                    create_multi_line_chart,
                     historical_with_features,
                     x_column='date',
                     y_columns=['close', 'ma_20', 'ma_50', 'ma_200'],
                     title=f"{ticker} - Price with Moving Averages",
-                    y_label="Price"
+                    y_label="Price",
+                    x_range=x_range
                 )
                 st.plotly_chart(ma_fig, use_container_width=True)
                 
                 # RSI
                 with st.expander("📉 Relative Strength Index (RSI)"):
                     if 'rsi' in historical_with_features.columns:
-                        rsi_fig = create_line_chart(
+                        rsi_fig = cached_figure(
+                            create_line_chart,
                             historical_with_features,
                             x_column='date',
                             y_column='rsi',
@@ -197,7 +253,8 @@ def show():
                 # MACD
                 with st.expander("📊 MACD"):
                     if 'macd' in historical_with_features.columns:
-                        macd_fig = create_multi_line_chart(
+                        macd_fig = cached_figure(
+                            create_multi_line_chart,
                             historical_with_features,
                             x_column='date',
                             y_columns=['macd', 'macd_signal'],
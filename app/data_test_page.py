@@ -3,11 +3,12 @@ Data Test Page - Check if APIs are fetching real data
 Tests newsdata.io and FMP APIs
 """
 import streamlit as st
-import requests
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 
+from src.api.http_client import get_http_client
+
 # Load environment variables
 load_dotenv()
 
@@ -69,7 +70,7 @@ def test_newsdata_io(ticker, company_name):
         st.info(f"📡 Calling newsdata.io for {ticker}...")
         st.code(f"GET {url}?q={ticker}")
         
-        response = requests.get(url, params=params, timeout=10)
+        response = get_http_client().get(url, params=params, timeout=10)
         st.markdown(f"**Status Code:** {response.status_code}")
         
         data = response.json()
@@ -121,7 +122,7 @@ def test_fmp_profile(ticker):
         st.info(f"📡 Calling FMP Profile API for {ticker}...")
         st.code(f"GET {url}")
         
-        response = requests.get(url, params=params, timeout=10)
+        response = get_http_client().get(url, params=params, timeout=10)
         st.markdown(f"**Status Code:** {response.status_code}")
         
         data = response.json()
@@ -170,7 +171,7 @@ def test_fmp_quote(ticker):
         
         st.info(f"📡 Calling FMP Quote API for {ticker}...")
         
-        response = requests.get(url, params=params, timeout=10)
+        response = get_http_client().get(url, params=params, timeout=10)
         st.markdown(f"**Status Code:** {response.status_code}")
         
         data = response.json()
@@ -217,7 +218,7 @@ def test_fmp_income_statement(ticker):
         
         st.info(f"📡 Calling FMP Income Statement API for {ticker}...")
         
-        response = requests.get(url, params=params, timeout=10)
+        response = get_http_client().get(url, params=params, timeout=10)
         st.markdown(f"**Status Code:** {response.status_code}")
         
         data = response.json()
@@ -4,13 +4,15 @@ Earnings Transcript Analysis - Display full transcripts with FinBERT sentiment a
 import streamlit as st
 import os
 import sys
+import time
 from datetime import datetime
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.api.fmp_transcript_fetcher import FMPTranscriptFetcher
-from src.analysis.finbert_sentiment import FinBERTAnalyzer
+from src.analysis.sentiment_jobs import get_job_queue
+from config.settings import SENTIMENT_JOB_POLL_SECONDS
 
 # Bloomberg-style colors
 COLORS = {
@@ -281,7 +283,7 @@ def show():
             transcript_data = fetcher.get_transcript(ticker)
             
             # If API fails, use sample data
-            if not transcript_data or 'content' not in transcript_data:
+            if not transcript_data or not transcript_data.get('content'):
                 st.warning(f"⚠️ Could not fetch real transcript for {ticker}. Using sample data for demonstration.")
                 
                 col_a, col_b = st.columns(2)
@@ -306,111 +308,136 @@ def show():
                     """)
                 
                 transcript_data = fetcher.get_sample_transcript(ticker)
+                transcript_data['is_sample'] = True
             else:
                 st.success(f"✅ Successfully fetched real earnings transcript for {ticker}!")
+        
+        # Keep the transcript across reruns so the page can poll the sentiment job
+        st.session_state.fmp_transcript = transcript_data
+        st.session_state.fmp_transcript_ticker = ticker
+    
+    # Set when a background sentiment job is still running
+    poll_job = False
+    
+    transcript_data = None
+    if st.session_state.get('fmp_transcript_ticker') == ticker:
+        transcript_data = st.session_state.get('fmp_transcript')
+    
+    if transcript_data:
+        # Extract transcript content
+        transcript_text = transcript_data.get('content', '')
+        symbol = transcript_data.get('symbol', ticker)
+        quarter = transcript_data.get('quarter', 'N/A')
+        year = transcript_data.get('year', 'N/A')
+        date = transcript_data.get('date', 'N/A')
+        
+        # Display transcript metadata
+        st.markdown(f"""
+            <div class="sentiment-card">
+                <h3 style='margin: 0;'>{symbol} - Q{quarter} {year} Earnings Call</h3>
+                <p style='margin: 5px 0; color: {COLORS['text_secondary']};'>
+                    Date: {date} | Transcript Length: {len(transcript_text):,} characters
+                </p>
+            </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("---")
+        
+        # Perform sentiment analysis
+        st.markdown("### 🤖 AI Sentiment Analysis")
+        
+        # Split transcript into chunks (FinBERT has 512 token limit)
+        # Split by paragraphs for more meaningful analysis
+        chunks = [p.strip() for p in transcript_text.split('\n\n') if p.strip() and len(p.strip()) > 50]
+        
+        if len(chunks) == 0:
+            chunks = [transcript_text]
+        
+        # Analyze in the background job queue; sample transcripts get their own key
+        is_sample = transcript_data.get('is_sample', False)
+        job = get_job_queue().submit(
+            f"{symbol}-SAMPLE" if is_sample else symbol,
+            year,
+            quarter,
+            chunks,
+            persist=not is_sample
+        )
+        job_state = job.snapshot()
+        aggregate_sentiment = job_state['aggregate']
+        
+        if job_state['status'] == 'failed':
+            st.error(f"❌ Sentiment analysis failed: {job_state['error']}")
+        elif job_state['status'] != 'completed':
+            st.progress(
+                job_state['progress'],
+                text=f"🧠 Analyzing {job_state['processed_segments']}/{job_state['total_segments']} segments with FinBERT AI..."
+            )
+            poll_job = True
+        
+        # Display sentiment overview (partial until the job completes)
+        display_sentiment_overview(aggregate_sentiment)
+        
+        st.markdown("---")
+        
+        # Display full transcript
+        display_transcript(transcript_text, f"{symbol} Q{quarter} {year} Earnings Call Transcript")
+        
+        st.markdown("---")
+        
+        # Detailed segment analysis
+        with st.expander("🔍 Detailed Segment Analysis", expanded=False):
+            st.markdown("### Sentiment by Segment")
             
-            # Extract transcript content
-            transcript_text = transcript_data.get('content', '')
-            symbol = transcript_data.get('symbol', ticker)
-            quarter = transcript_data.get('quarter', 'N/A')
-            year = transcript_data.get('year', 'N/A')
-            date = transcript_data.get('date', 'N/A')
-            
-            # Display transcript metadata
-            st.markdown(f"""
-                <div class="sentiment-card">
-                    <h3 style='margin: 0;'>{symbol} - Q{quarter} {year} Earnings Call</h3>
-                    <p style='margin: 5px 0; color: {COLORS['text_secondary']};'>
-                        Date: {date} | Transcript Length: {len(transcript_text):,} characters
-                    </p>
-                </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown("---")
-            
-            # Perform sentiment analysis
-            st.markdown("### 🤖 AI Sentiment Analysis")
-            
-            with st.spinner('🧠 Analyzing sentiment with FinBERT AI...'):
-                # Initialize FinBERT analyzer
-                analyzer = FinBERTAnalyzer()
-                
-                # Split transcript into chunks (FinBERT has 512 token limit)
-                # Split by paragraphs for more meaningful analysis
-                chunks = [p.strip() for p in transcript_text.split('\n\n') if p.strip() and len(p.strip()) > 50]
-                
-                if len(chunks) == 0:
-                    chunks = [transcript_text]
-                
-                st.info(f"📊 Analyzing {len(chunks)} segments from the transcript...")
-                
-                # Analyze sentiment
-                aggregate_sentiment = analyzer.get_aggregate_sentiment(chunks)
-                
-                # Display sentiment overview
-                display_sentiment_overview(aggregate_sentiment)
-            
-            st.markdown("---")
-            
-            # Display full transcript
-            display_transcript(transcript_text, f"{symbol} Q{quarter} {year} Earnings Call Transcript")
-            
-            st.markdown("---")
-            
-            # Detailed segment analysis
-            with st.expander("🔍 Detailed Segment Analysis", expanded=False):
-                st.markdown("### Sentiment by Segment")
-                
-                detailed = aggregate_sentiment.get('detailed_results', [])
-                
-                if detailed:
-                    for i, result in enumerate(detailed[:20], 1):  # Show first 20 segments
-                        sentiment = result.get('sentiment', 'neutral')
-                        confidence = result.get('confidence', 0.0)
-                        text = result.get('text', '')[:200]  # First 200 chars
-                        
-                        if sentiment == 'positive':
-                            emoji = '📈'
-                            color = COLORS['positive']
-                        elif sentiment == 'negative':
-                            emoji = '📉'
-                            color = COLORS['negative']
-                        else:
-                            emoji = '➡️'
-                            color = COLORS['neutral']
-                        
-                        st.markdown(f"""
-                            <div style='background-color: {COLORS['bg_light']}; padding: 15px; margin: 10px 0; border-radius: 6px; border-left: 3px solid {color};'>
-                                <strong>Segment {i}:</strong> {emoji} {sentiment.upper()} ({confidence:.1%} confidence)<br>
-                                <em style='color: {COLORS['text_secondary']};'>{text}...</em>
-                            </div>
-                        """, unsafe_allow_html=True)
-                else:
-                    st.info("No detailed segment data available.")
-            
-            st.markdown("---")
-            
-            # Analysis summary
-            st.markdown("### 💡 Key Insights")
-            
-            overall = aggregate_sentiment.get('overall_sentiment', 'neutral')
-            total = aggregate_sentiment.get('total_analyzed', 0)
+            detailed = aggregate_sentiment.get('detailed_results', [])
             
-            if overall == 'positive':
-                st.success(f"""
-                ✅ **Positive Outlook**: The earnings call shows a predominantly positive sentiment across {total} analyzed segments.
-                Management appears confident about the company's performance and future prospects.
-                """)
-            elif overall == 'negative':
-                st.error(f"""
-                ⚠️ **Cautionary Tone**: The earnings call reflects concerns, with negative sentiment detected across {total} segments.
-                Investors should pay attention to challenges and risk factors discussed.
-                """)
+            if detailed:
+                for i, result in enumerate(detailed[:20], 1):  # Show first 20 segments
+                    sentiment = result.get('sentiment', 'neutral')
+                    confidence = result.get('confidence', 0.0)
+                    text = result.get('text', '')[:200]  # First 200 chars
+                    
+                    if sentiment == 'positive':
+                        emoji = '📈'
+                        color = COLORS['positive']
+                    elif sentiment == 'negative':
+                        emoji = '📉'
+                        color = COLORS['negative']
+                    else:
+                        emoji = '➡️'
+                        color = COLORS['neutral']
+                    
+                    st.markdown(f"""
+                        <div style='background-color: {COLORS['bg_light']}; padding: 15px; margin: 10px 0; border-radius: 6px; border-left: 3px solid {color};'>
+                            <strong>Segment {i}:</strong> {emoji} {sentiment.upper()} ({confidence:.1%} confidence)<br>
+                            <em style='color: {COLORS['text_secondary']};'>{text}...</em>
+                        </div>
+                    """, unsafe_allow_html=True)
             else:
-                st.info(f"""
-                ℹ️ **Balanced Perspective**: The earnings call presents a neutral to mixed sentiment across {total} segments.
-                Management is providing a balanced view of opportunities and challenges.
-                """)
+                st.info("No detailed segment data available.")
+        
+        st.markdown("---")
+        
+        # Analysis summary
+        st.markdown("### 💡 Key Insights")
+        
+        overall = aggregate_sentiment.get('overall_sentiment', 'neutral')
+        total = aggregate_sentiment.get('total_analyzed', 0)
+        
+        if overall == 'positive':
+            st.success(f"""
+            ✅ **Positive Outlook**: The earnings call shows a predominantly positive sentiment across {total} analyzed segments.
+            Management appears confident about the company's performance and future prospects.
+            """)
+        elif overall == 'negative':
+            st.error(f"""
+            ⚠️ **Cautionary Tone**: The earnings call reflects concerns, with negative sentiment detected across {total} segments.
+            Investors should pay attention to challenges and risk factors discussed.
+            """)
+        else:
+            st.info(f"""
+            ℹ️ **Balanced Perspective**: The earnings call presents a neutral to mixed sentiment across {total} segments.
+            Management is providing a balanced view of opportunities and challenges.
+            """)
     
     else:
         # Show instructions when not analyzing
@@ -459,6 +486,11 @@ def show():
         
         **Ready to analyze?** Enter a ticker above! 🚀
         """)
+    
+    # Poll the running job: rerun shortly to show the next partial aggregate
+    if poll_job:
+        time.sleep(SENTIMENT_JOB_POLL_SECONDS)
+        st.rerun()
 
 
 if __name__ == "__main__":
@@ -8,26 +8,23 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.api.data_fetcher import DataFetcher
+from src.api import cached_data
 from src.components.chart_generator import create_bar_chart, create_line_chart
 from src.components.table_display import display_metrics_row, display_stock_table, style_gainers_losers
 from config.settings import DEFAULT_INDICES, DEFAULT_STOCKS, COLORS
 
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def fetch_market_data():
-    """Fetch all market overview data."""
-    fetcher = DataFetcher()
-    
+    """Fetch all market overview data (stale-while-revalidate cached)."""
     # Get indices data
     indices_list = list(DEFAULT_INDICES.keys())
-    indices_data = fetcher.get_market_indices(indices_list)
+    indices_data = cached_data.get_market_indices(indices_list)
     
     # Get gainers/losers
-    gainers_losers = fetcher.get_top_gainers_losers(DEFAULT_STOCKS)
+    gainers_losers = cached_data.get_top_gainers_losers(DEFAULT_STOCKS)
     
     # Get sector performance
-    sector_perf = fetcher.get_sector_performance(DEFAULT_STOCKS)
+    sector_perf = cached_data.get_sector_performance(DEFAULT_STOCKS)
     
     return indices_data, gainers_losers, sector_perf
 
@@ -41,7 +38,8 @@ def show():
     col1, col2, col3 = st.columns([6, 1, 1])
     with col3:
         if st.button("🔄 Refresh"):
-            st.cache_data.clear()
+            # Revalidate this page's quotes in the background; other caches are untouched
+            cached_data.invalidate(cached_data.YFINANCE, 'quotes')
             st.rerun()
     
     st.markdown("---")
@@ -73,8 +71,7 @@ def show():
             
             # Show mini chart for S&P 500
             st.markdown("---")
-            fetcher = DataFetcher()
-            sp500_hist = fetcher.get_historical_data("^GSPC", period="1mo", interval="1d")
+            sp500_hist = cached_data.get_historical_data("^GSPC", period="1mo", interval="1d")
             
             if sp500_hist is not None and not sp500_hist.empty:
                 fig = create_line_chart(
@@ -168,7 +165,10 @@ def show():
                 st.info(sentiment_text)
         
         # Last updated timestamp
-        st.caption(f"Last updated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        updated_at, refreshing = cached_data.cache_status(cached_data.YFINANCE)
+        if updated_at is not None:
+            st.caption(f"Last updated: {updated_at.strftime('%Y-%m-%d %H:%M:%S')}"
+                       + (" | 🔄 Refreshing in background" if refreshing else ""))
         
     except Exception as e:
         st.error(f"Error loading market data: {str(e)}")
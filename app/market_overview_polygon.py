@@ -8,22 +8,19 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.api.polygon_fetcher import PolygonDataFetcher
+from src.api import cached_data
 from src.components.chart_generator import create_bar_chart, create_line_chart
 from src.components.table_display import display_metrics_row, style_gainers_losers
 from config.settings import DEFAULT_STOCKS, COLORS
 
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def fetch_market_data_polygon():
     """Fetch market data using Polygon.io - limited to 4 stocks for free tier."""
-    fetcher = PolygonDataFetcher()
-    
     # Limit to 4 stocks max for free tier (4 API calls)
     stocks_to_fetch = DEFAULT_STOCKS[:4]  
     
-    # Get stock data with rate limiting built in
-    stock_data = fetcher.get_multiple_tickers(stocks_to_fetch, max_tickers=4)
+    # Get stock data with rate limiting built in (stale-while-revalidate cached)
+    stock_data = cached_data.get_polygon_quotes(stocks_to_fetch, max_tickers=4)
     
     return stock_data
 
@@ -38,7 +35,8 @@ def show():
     col1, col2 = st.columns([8, 1])
     with col2:
         if st.button("🔄 Refresh"):
-            st.cache_data.clear()
+            # Revalidate Polygon quotes in the background; other caches are untouched
+            cached_data.invalidate(cached_data.POLYGON, 'quotes')
             st.rerun()
     
     st.markdown("---")
@@ -111,7 +109,10 @@ def show():
             
             # Show rate limit info
             st.markdown("---")
-            st.caption(f"💡 Free tier limits: Showing 4 stocks | Data cached for 1 hour | Last updated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            updated_at, refreshing = cached_data.cache_status(cached_data.POLYGON)
+            updated_text = updated_at.strftime('%Y-%m-%d %H:%M:%S') if updated_at is not None else 'N/A'
+            st.caption(f"💡 Free tier limits: Showing 4 stocks | Quotes revalidated in the background | Last updated: {updated_text}"
+                       + (" | 🔄 Refreshing" if refreshing else ""))
             
         else:
             st.warning("No data available. Please check your Polygon.io API key.")
@@ -123,7 +124,7 @@ def show():
         **Troubleshooting:**
         - Check that your Polygon.io API key is valid
         - Free tier allows 5 API calls per minute
-        - Data is cached for 1 hour to minimize API calls
+        - Cached quotes are shown while fresh data loads in the background
         - Try refreshing in a few moments
         """)
 
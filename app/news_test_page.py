@@ -3,13 +3,14 @@ News Test Page - Test newsdata.io API only
 Simple page to verify news API is working
 """
 import streamlit as st
-import requests
 import os
 import sys
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.api.http_client import get_http_client
+
 # Bloomberg-style colors
 COLORS = {
     'bg_dark': '#0D1117',
@@ -61,7 +62,7 @@ def test_newsdata_io_api(ticker, company_name, api_key):
         st.info(f"📡 Calling newsdata.io API...")
         st.code(f"GET {url}?q={ticker} OR {company_name}&category=business")
         
-        response = requests.get(url, params=params, timeout=10)
+        response = get_http_client().get(url, params=params, timeout=10)
         
         st.markdown(f"**Status Code:** {response.status_code}")
         
@@ -7,12 +7,16 @@ import streamlit as st
 import requests
 import os
 import sys
+import time
 from datetime import datetime
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.analysis.finbert_sentiment import FinBERTAnalyzer
+from src.analysis.sentiment_jobs import get_job_queue
+from src.api.http_client import get_http_client
+from src.utils.search_index import get_search_index
+from config.settings import SENTIMENT_JOB_POLL_SECONDS
 
 # Bloomberg-style colors
 COLORS = {
@@ -99,7 +103,7 @@ API Key Format: {'Valid' if api_key and len(api_key) > 10 else 'Invalid - too sh
 Full URL: {url}?ticker={params['ticker']}&year={params['year']}&quarter={params['quarter']}
             """)
         
-        response = requests.get(url, params=params, headers=headers, timeout=20)
+        response = get_http_client().get(url, params=params, headers=headers, timeout=20)
         
         # Log response for debugging
         st.caption(f"📡 Response Status: {response.status_code}")
@@ -393,6 +397,18 @@ def show():
                     }
                     # Track what query this data is for
                     st.session_state.transcript_query = current_query
+                    
+                    # Add to the full-text search index (replaces any earlier copy)
+                    try:
+                        get_search_index().index_transcript(
+                            symbol, yr, qtr, content,
+                            call_date=transcript_data.get('date')
+                        )
+                    except Exception as e:
+                        st.caption(f"⚠️ Could not index transcript for search: {e}")
+    
+    # Set when a background sentiment job is still running
+    poll_job = False
     
     # Display data if it exists AND matches current inputs
     if st.session_state.transcript_result and st.session_state.transcript_query == current_query:
@@ -415,26 +431,32 @@ def show():
         
         st.markdown("---")
         
-        # Sentiment Analysis (compute once and cache in session state)
+        # Sentiment Analysis (runs in the background job queue, cached in session state)
+        st.markdown("### 🤖 AI Sentiment Analysis")
+        
         if data['sentiment'] is None:
-            st.markdown("### 🤖 AI Sentiment Analysis")
+            # Split into chunks
+            chunks = [p.strip() for p in content.split('\n\n') if p.strip() and len(p.strip()) > 50]
+            if len(chunks) == 0:
+                chunks = [content[i:i+500] for i in range(0, len(content), 500)]
             
-            with st.spinner('🧠 Analyzing with FinBERT...'):
-                analyzer = FinBERTAnalyzer()
-                
-                # Split into chunks
-                chunks = [p.strip() for p in content.split('\n\n') if p.strip() and len(p.strip()) > 50]
-                if len(chunks) == 0:
-                    chunks = [content[i:i+500] for i in range(0, len(content), 500)]
-                
-                st.info(f"📊 Analyzing {len(chunks)} segments...")
-                
-                # Analyze and store in session state
-                aggregate_sentiment = analyzer.get_aggregate_sentiment(chunks)
+            # Identical (ticker, year, quarter) jobs from other sessions are shared
+            job = get_job_queue().submit(ticker, year, quarter, chunks)
+            job_state = job.snapshot()
+            aggregate_sentiment = job_state['aggregate']
+            
+            if job_state['status'] == 'completed':
                 st.session_state.transcript_result['sentiment'] = aggregate_sentiment
+            elif job_state['status'] == 'failed':
+                st.error(f"❌ Sentiment analysis failed: {job_state['error']}")
+            else:
+                st.progress(
+                    job_state['progress'],
+                    text=f"🧠 Analyzing with FinBERT... {job_state['processed_segments']}/{job_state['total_segments']} segments"
+                )
+                poll_job = True
         else:
             # Use cached sentiment from session state
-            st.markdown("### 🤖 AI Sentiment Analysis")
             aggregate_sentiment = data['sentiment']
         
         # Display sentiment
@@ -523,6 +545,11 @@ def show():
         
         **Ready? Enter a ticker above!** 🚀
         """)
+    
+    # Poll the running job: rerun shortly to show the next partial aggregate
+    if poll_job:
+        time.sleep(SENTIMENT_JOB_POLL_SECONDS)
+        st.rerun()
 
 
 if __name__ == "__main__":
@@ -45,6 +45,10 @@ HISTORICAL_DATA_YEARS = 10  # Years of historical data to fetch
 # Chart Configuration
 DEFAULT_CHART_HEIGHT = 500
 DEFAULT_CHART_TEMPLATE = "plotly_white"
+CHART_WIDTH_PX = 1200  # Approximate plot width in the wide layout; sizes server-side downsampling
+CHART_CANDLE_PX = 4  # Minimum horizontal pixels per candle
+CHART_WEBGL_THRESHOLD = 5000  # Line traces with more points render as WebGL (Scattergl) instead of SVG
+FIGURE_CACHE_TTL = 3600  # Seconds a built chart is reused for unchanged data and parameters
 
 # Date Ranges for Analysis
 DATE_RANGES = {
@@ -72,6 +76,100 @@ CSV_DATE_FORMAT = "%Y-%m-%d"
 # Cache Settings
 CACHE_TTL = 3600  # Cache time-to-live in seconds (1 hour)
 
+# Stale-while-revalidate cache: seconds each data type stays fresh
+SWR_TTLS = {
+    "quotes": 60,
+    "history": 3600,
+    "sectors": 900,
+    "fundamentals": 86400
+}
+SWR_MAX_STALE_SECONDS = 86400  # Older values are reloaded before being served
+SWR_REFRESH_WORKERS = 4  # Background refresh threads
+
+# Cache Pre-warming (DEFAULT_STOCKS, DEFAULT_INDICES and config/watchlists.py)
+CACHE_WARM_ENABLED = os.getenv("CACHE_WARM_ENABLED", "0") == "1"  # Opt-in; each warming process spends its own budget
+CACHE_WARM_INTERVAL_SECONDS = 15  # How often the warmer looks for entries nearing expiry
+CACHE_WARM_LEAD_FRACTION = 0.8  # Re-fetch once an entry is 80% through its TTL
+CACHE_WARM_NEWS_INTERVAL_SECONDS = 1800  # Incremental news fetch per watchlist symbol
+CACHE_WARM_RATE_LIMITS = {  # Warmer budget per provider: (requests per second, burst)
+    "yfinance": (1.0, 10),
+    "polygon": (4 / 60, 4),  # Free tier allows 5 calls/minute; leave headroom for pages
+    "newsapi": (50 / 86400, 2),  # Half the free tier's 100 requests/day; pages use the rest
+    "fmp": (100 / 86400, 2),  # Free tier allows 250/day, shared with quotes and transcripts
+    "newsdata": (100 / 86400, 2)  # Half the free tier's 200 credits/day
+}
+
+# Shared Cache Backend (fetcher/analysis results shared across Streamlit processes)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite")  # "memory", "sqlite" or "redis"
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # Least recently used entries are evicted beyond this
+CACHE_MAX_ITEM_BYTES = 16 * 1024 * 1024  # Larger values are not cached
+CACHE_SQLITE_PATH = "data/cache.db"
+CACHE_TOUCH_INTERVAL_SECONDS = 60  # SQLite hits update an entry's LRU time at most this often
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_NAMESPACE = "frt"  # Key prefix on shared Redis servers
+
+# HTTP Client
+HTTP_MAX_RETRIES = 3  # Retries for 429/5xx responses and connection errors
+HTTP_BACKOFF_SECONDS = 0.5  # Base delay for exponential backoff
+HTTP_MAX_BACKOFF_SECONDS = 30.0  # Longest single wait, including Retry-After
+HTTP_POOL_SIZE = 10  # Keep-alive connections per host
+HTTP_MAX_CONCURRENCY_PER_HOST = 4  # Concurrent requests per host
+HTTP_HOST_CONCURRENCY = {  # Per-host overrides
+    "financialmodelingprep.com": 2,
+    "newsdata.io": 2
+}
+
+# Realtime Quote Stream (Polygon.io websocket)
+QUOTE_STREAM_ENABLED = os.getenv("QUOTE_STREAM_ENABLED", "0") == "1"  # Needs a plan with websocket access
+QUOTE_STREAM_FEED = os.getenv("QUOTE_STREAM_FEED", "delayed")  # "realtime" or "delayed"
+QUOTE_STREAM_BAR_CAPACITY = 390  # 1-minute bars kept per symbol (one trading session)
+QUOTE_STREAM_FRESH_SECONDS = 60  # Streamed prices older than this fall back to REST
+QUOTE_STREAM_RECONNECT_SECONDS = 5.0  # First pause after a stream error (doubles per failure)
+QUOTE_STREAM_MAX_BACKOFF_SECONDS = 300.0  # Longest pause between reconnect attempts
+
+# News Aggregation
+NEWS_SOURCE_DEADLINES = {  # Seconds each source may take before it is skipped
+    "newsapi": 8.0,
+    "fmp": 6.0,
+    "newsdata": 8.0
+}
+
+# Earnings Transcript Store
+TRANSCRIPT_STORAGE_PATH = "data/transcripts/"  # Compressed transcript content
+TRANSCRIPT_CATALOG_REFRESH_SECONDS = 3600  # How often to re-list available transcripts
+
+# Lexicon Sentiment
+# Optional Loughran-McDonald master dictionary CSV; built-in word lists are used if unset
+SENTIMENT_LEXICON_PATH = os.getenv("SENTIMENT_LEXICON_PATH", "")
+SENTIMENT_CASCADE_BAND = 0.3  # Lexicon |polarity| below this is re-scored by FinBERT
+FINBERT_BATCH_SIZE = 16  # Texts per FinBERT forward pass
+
+# Background Sentiment Jobs
+SENTIMENT_JOB_WORKERS = 2  # Concurrent FinBERT analysis jobs
+SENTIMENT_JOB_BATCH_SIZE = 8  # Segments analyzed between progress updates
+SENTIMENT_JOB_POLL_SECONDS = 1.0  # How often pages poll a running job
+SENTIMENT_JOB_MAX_FINISHED = 32  # Finished jobs kept in memory when their results aren't persisted
+
+# Backtesting
+BACKTEST_INITIAL_CAPITAL = 100000.0  # Starting equity for backtests
+BACKTEST_COST_BPS = 5.0  # Commission + slippage per unit of turnover, in basis points
+BACKTEST_WORKERS = 0  # Parameter sweep processes (0 = one per CPU)
+
+# Universe Screener
+SCREENER_UNIVERSE_PATH = os.getenv("SCREENER_UNIVERSE_PATH", "")  # Optional file with one ticker per line
+SCREENER_HISTORY_PERIOD = "max"  # History fetched per ticker (covers every DATE_RANGES return)
+SCREENER_BATCH_SIZE = 200  # Tickers per feature panel in the nightly build
+SCREENER_FETCH_WORKERS = 8  # Concurrent history downloads
+SCREENER_SENTIMENT_DAYS = 7  # Window of daily news sentiment averaged into the factor
+SCREENER_RELOAD_SECONDS = 60  # How often the in-memory snapshot checks for a newer build
+
+# Correlation Service
+CORRELATION_WINDOW = 63  # Trailing trading days for rolling correlation (about 3 months)
+CORRELATION_HALFLIFE = 21  # EWMA half-life in trading days
+CORRELATION_HISTORY_PERIOD = "1y"  # Price history fetched for the returns panel
+CORRELATION_CACHE_TTL = 21600  # Seconds a matrix is reused for the same universe and as-of date
+CORRELATION_FETCH_WORKERS = 8  # Concurrent history reads when building a panel
+
 # Alert Types
 ALERT_TYPES = [
     "PRICE_ABOVE",
@@ -79,6 +177,8 @@ ALERT_TYPES = [
     "VOLUME_SPIKE",
     "PERCENT_CHANGE"
 ]
+ALERT_CHECK_INTERVAL_SECONDS = 60  # How often the warmer fetches quotes for symbols with active alerts
+ALERT_SYNC_SECONDS = 30  # How often the in-memory alert index picks up alerts added elsewhere
 
 # Color Scheme (from styling guidelines)
 COLORS = {
@@ -9,8 +9,13 @@ import os
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from config.settings import APP_TITLE, APP_ICON, PAGE_LAYOUT
+from config.settings import APP_TITLE, APP_ICON, PAGE_LAYOUT, CACHE_WARM_ENABLED
 from app import market_overview_polygon, dashboard_polygon, data_export_polygon, news_test_page, simple_earnings_analysis
+from src.api.cache_warmer import start_cache_warmer
+
+# Keep common pages warm (starts once per server process)
+if CACHE_WARM_ENABLED:
+    start_cache_warmer()
 
 # Page configuration
 st.set_page_config(
@@ -0,0 +1,130 @@
+"""
+Chart benchmark script - times figure builds for long price histories.
+Compares the chart builders on 10 years of daily bars and 30 days of
+1-minute bars, with and without downsampling.
+"""
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from src.components.chart_generator import (
+    create_candlestick_chart, create_line_chart,
+    create_volume_chart, create_multi_line_chart,
+    figure_to_json, figure_from_json
+)
+from config.settings import COLORS
+
+REPEATS = 5
+
+
+def session_minutes(sessions: int, start: str = '2024-01-02') -> pd.DatetimeIndex:
+    """
+    Regular-hours minute timestamps (09:30-16:00 New York) for trading days.
+    
+    Args:
+        sessions: Number of trading days
+        start: First trading day
+    
+    Returns:
+        390 timestamps per session, tz-aware
+    """
+    days = pd.bdate_range(start, periods=sessions).to_numpy()
+    offsets = (pd.Timedelta(hours=9, minutes=30) + pd.to_timedelta(np.arange(390), unit='min')).to_numpy()
+    return pd.DatetimeIndex((days[:, None] + offsets).ravel()).tz_localize('America/New_York')
+
+
+def synthetic_bars(dates: pd.DatetimeIndex, seed: int = 0) -> pd.DataFrame:
+    """
+    Random-walk OHLCV bars.
+    
+    Args:
+        dates: Bar timestamps
+        seed: Random seed
+    
+    Returns:
+        DataFrame with date, open, high, low, close, volume
+    """
+    periods = len(dates)
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, periods)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.005, periods)) * close
+    return pd.DataFrame({
+        'date': dates,
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.integers(1_000, 1_000_000, periods)
+    })
+
+
+def legacy_volume_colors(df: pd.DataFrame) -> list:
+    """The previous row-by-row volume coloring, kept as a baseline."""
+    colors = []
+    for i in range(len(df)):
+        if i == 0:
+            colors.append(COLORS['info'])
+        else:
+            if df.iloc[i]['close'] >= df.iloc[i-1]['close']:
+                colors.append(COLORS['positive'])
+            else:
+                colors.append(COLORS['negative'])
+    return colors
+
+
+def time_call(fn, repeats: int = REPEATS) -> float:
+    """Best wall time of fn() over repeats, in milliseconds."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def benchmark(label: str, df: pd.DataFrame):
+    """Print build, serialization and figure-cache hit times for each chart on one dataset."""
+    df = df.assign(ma_20=df['close'].rolling(20).mean(), ma_50=df['close'].rolling(50).mean())
+    cases = {
+        "Line (downsampled)": lambda: create_line_chart(df, 'date', 'close'),
+        "Line (full)": lambda: create_line_chart(df, 'date', 'close', max_points=0),
+        "Candlestick (downsampled)": lambda: create_candlestick_chart(df),
+        "Candlestick (full)": lambda: create_candlestick_chart(df, max_points=0),
+        "Multi-line (downsampled)": lambda: create_multi_line_chart(df, 'date', ['close', 'ma_20', 'ma_50']),
+        "Volume": lambda: create_volume_chart(df),
+    }
+    
+    print(f"{label}: {len(df):,} bars")
+    print(f"  {'Chart':<28}{'build ms':>10}{'to_json ms':>12}{'hit ms':>10}{'points':>10}")
+    for name, build in cases.items():
+        fig = build()
+        build_ms = time_call(build)
+        json_ms = time_call(fig.to_json)
+        payload = figure_to_json(fig)
+        hit_ms = time_call(lambda: figure_from_json(payload))  # cached_figure hit, minus the backend read
+        points = sum(len(trace.x) for trace in fig.data)
+        print(f"  {name:<28}{build_ms:>10.1f}{json_ms:>12.1f}{hit_ms:>10.1f}{points:>10,}")
+    
+    legacy_ms = time_call(lambda: legacy_volume_colors(df), repeats=1)
+    print(f"  {'Volume colors (row loop)':<28}{legacy_ms:>10.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Financial Research Tool - Chart Benchmark")
+    print("=" * 60)
+    print()
+    
+    # ~10 years of trading days
+    benchmark("10y daily", synthetic_bars(pd.bdate_range('2015-01-02', periods=252 * 10)))
+    
+    # 30 sessions of regular-hours minute bars
+    benchmark("30d minute", synthetic_bars(session_minutes(30), seed=1))
@@ -10,6 +10,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.api.data_fetcher import DataFetcher
 from src.utils.database import Database
+from src.api.news_store import get_news_store
+from src.analysis.sentiment_timeseries import get_sentiment_aggregator
+from src.analysis.screener import get_screener
 from config.settings import DEFAULT_STOCKS, DEFAULT_INDICES
 from datetime import datetime
 import logging
@@ -148,6 +151,54 @@ def update_indices_data():
     logger.info("Indices data update complete!")
 
 
+def update_news_data():
+    """Fetch new articles for default stocks since each source's last high-water mark."""
+    logger.info("Starting news update...")
+    
+    store = get_news_store()
+    cursor = store.db.conn.cursor()
+    
+    for ticker in DEFAULT_STOCKS:
+        try:
+            cursor.execute("SELECT company_name FROM Companies WHERE ticker = ?", (ticker,))
+            result = cursor.fetchone()
+            company_name = result[0] if result else ticker
+            
+            articles = store.fetch_incremental(ticker, company_name, days_back=7)
+            logger.info(f"✓ {ticker}: {len(articles)} stored articles in the last 7 days")
+        
+        except Exception as e:
+            logger.error(f"✗ Error updating news for {ticker}: {e}")
+    
+    logger.info("News update complete!")
+
+
+def update_sentiment_series():
+    """Roll newly stored articles into the daily ticker and market sentiment series."""
+    logger.info("Starting sentiment series update...")
+    
+    try:
+        stats = get_sentiment_aggregator().update()
+        logger.info(f"✓ Updated {stats['ticker_days']} ticker-days and {stats['market_days']} market days")
+    except Exception as e:
+        logger.error(f"✗ Error updating sentiment series: {e}")
+    
+    logger.info("Sentiment series update complete!")
+
+
+def update_screener_factors():
+    """Rebuild the screener factor table for the whole universe (run after sentiment)."""
+    logger.info("Starting screener factor update...")
+    
+    try:
+        stats = get_screener().update()
+        logger.info(f"✓ Updated factors for {stats['updated']} tickers ({len(stats['failed'])} failed)")
+    except Exception as e:
+        logger.error(f"✗ Error updating screener factors: {e}")
+    
+    logger.info("Screener factor update complete!")
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("Financial Research Tool - Data Update")
@@ -162,6 +213,18 @@ if __name__ == "__main__":
     update_indices_data()
     print()
     
+    # Update news (incremental)
+    update_news_data()
+    print()
+    
+    # Update daily sentiment series (only days with new articles)
+    update_sentiment_series()
+    print()
+    
+    # Rebuild screener factors (uses the fresh sentiment series)
+    update_screener_factors()
+    print()
+    
     print("=" * 60)
     print("Data update completed!")
     print("=" * 60)
@@ -0,0 +1,361 @@
+"""
+Alert evaluation engine for the Alerts table.
+Active alerts are indexed in memory by symbol and condition as sorted
+threshold arrays, so each quote finds the alerts it fires with one binary
+search; fired alerts are marked TRIGGERED in the database in bulk.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.utils.database import Database
+from config.settings import DATABASE_PATH, ALERT_TYPES, ALERT_SYNC_SECONDS, DEFAULT_INDICES
+
+logger = logging.getLogger(__name__)
+
+ABOVE = 'above'  # Fires when the value reaches the threshold or higher
+BELOW = 'below'  # Fires when the value reaches the threshold or lower
+
+# Quote field each alert type is checked against
+ALERT_FIELDS = {
+    'PRICE_ABOVE': 'price',
+    'PRICE_BELOW': 'price',
+    'VOLUME_SPIKE': 'volume_ratio',  # Threshold is a multiple of average volume
+    'PERCENT_CHANGE': 'change_percent'  # Positive thresholds fire on gains, negative on losses
+}
+
+
+class ThresholdIndex:
+    """Alert ids sorted by threshold for one (symbol, alert type, direction)."""
+    
+    def __init__(self, direction: str):
+        self.direction = direction
+        self.thresholds = np.empty(0, dtype=float)
+        self.ids = np.empty(0, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def add(self, ids: np.ndarray, thresholds: np.ndarray):
+        """Merge alerts into the sorted arrays."""
+        thresholds = np.concatenate([self.thresholds, np.asarray(thresholds, dtype=float)])
+        ids = np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)])
+        order = np.argsort(thresholds, kind='stable')
+        self.thresholds, self.ids = thresholds[order], ids[order]
+    
+    def remove(self, alert_id: int) -> bool:
+        """Drop one alert (O(n); cancellations are rare)."""
+        hits = np.flatnonzero(self.ids == alert_id)
+        if not len(hits):
+            return False
+        self.thresholds = np.delete(self.thresholds, hits)
+        self.ids = np.delete(self.ids, hits)
+        return True
+    
+    def pop_crossed(self, value: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Remove and return every alert the value fires.
+        
+        Fired alerts are always a prefix (above) or suffix (below) of the
+        sorted thresholds, so this is one binary search plus a slice.
+        
+        Args:
+            value: Current value of the quote field
+        
+        Returns:
+            Tuple of (alert ids, thresholds)
+        """
+        if self.direction == ABOVE:
+            k = np.searchsorted(self.thresholds, value, side='right')
+            fired = self.ids[:k], self.thresholds[:k]
+            self.ids, self.thresholds = self.ids[k:], self.thresholds[k:]
+        else:
+            k = np.searchsorted(self.thresholds, value, side='left')
+            fired = self.ids[k:], self.thresholds[k:]
+            self.ids, self.thresholds = self.ids[:k], self.thresholds[:k]
+        return fired
+
+
+class AlertEngine:
+    """Evaluates quote batches against every active alert."""
+    
+    def __init__(self, db_path: str = DATABASE_PATH):
+        """
+        Initialize the engine and load active alerts.
+        
+        Args:
+            db_path: SQLite database path
+        """
+        self._lock = threading.Lock()
+        self.db = Database(db_path)
+        self.db.connect()
+        self.db.initialize_schema()
+        
+        # symbol -> {(alert_type, direction): ThresholdIndex}
+        self._index: Dict[str, Dict[Tuple[str, str], ThresholdIndex]] = {}
+        self._symbols: Dict[int, str] = {}  # alert_id -> symbol
+        self._last_id = 0
+        self._synced_at = 0.0
+        self.evaluations = 0
+        self.triggered = 0
+        self.load()
+    
+    def load(self) -> int:
+        """
+        Rebuild the index from every ACTIVE alert.
+        
+        Returns:
+            Number of active alerts
+        """
+        with self._lock:
+            self._index = {}
+            self._symbols = {}
+            self._last_id = 0
+            return self._sync_locked()
+    
+    def sync(self) -> int:
+        """
+        Index alerts created since the last load/sync (e.g. by another process).
+        
+        Returns:
+            Number of alerts added
+        """
+        with self._lock:
+            return self._sync_locked()
+    
+    def _sync_locked(self) -> int:
+        frame = pd.read_sql_query("""
+            SELECT a.alert_id, a.alert_type, a.threshold_value,
+                   COALESCE(c.ticker, m.symbol) AS symbol
+            FROM Alerts a
+            LEFT JOIN Companies c ON c.company_id = a.company_id
+            LEFT JOIN MarketIndices m ON m.index_id = a.index_id
+            WHERE a.status = 'ACTIVE' AND a.alert_id > ?
+        """, self.db.conn, params=(self._last_id,))
+        self._synced_at = time.monotonic()
+        if frame.empty:
+            return 0
+        
+        self._last_id = max(self._last_id, int(frame['alert_id'].max()))
+        frame = frame[frame['alert_type'].isin(ALERT_TYPES) & frame['symbol'].notna()]
+        below = (frame['alert_type'] == 'PRICE_BELOW') | (
+            (frame['alert_type'] == 'PERCENT_CHANGE') & (frame['threshold_value'] < 0)
+        )
+        frame = frame.assign(direction=np.where(below, BELOW, ABOVE))
+        frame = frame.sort_values(['symbol', 'alert_type', 'direction'], kind='stable')
+        
+        # Split the sorted rows at every (symbol, type, direction) change
+        symbols = frame['symbol'].to_numpy(dtype=object)
+        types = frame['alert_type'].to_numpy(dtype=object)
+        directions = frame['direction'].to_numpy(dtype=object)
+        ids = frame['alert_id'].to_numpy(dtype=np.int64)
+        thresholds = frame['threshold_value'].to_numpy(dtype=float)
+        changes = np.flatnonzero(
+            (symbols[1:] != symbols[:-1]) | (types[1:] != types[:-1]) | (directions[1:] != directions[:-1])
+        ) + 1
+        bounds = np.concatenate([[0], changes, [len(frame)]])
+        for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            key = (types[start], directions[start])
+            indexes = self._index.setdefault(symbols[start], {})
+            index = indexes.get(key)
+            if index is None:
+                index = indexes[key] = ThresholdIndex(directions[start])
+            index.add(ids[start:end], thresholds[start:end])
+        self._symbols.update(zip(frame['alert_id'].astype(int), frame['symbol']))
+        return len(frame)
+    
+    def _resolve_symbol(self, symbol: str) -> Tuple[Optional[int], Optional[int]]:
+        """(company_id, index_id) for a symbol, registering it if unknown."""
+        cursor = self.db.conn.cursor()
+        if symbol.startswith('^'):
+            cursor.execute(
+                "INSERT OR IGNORE INTO MarketIndices (symbol, index_name) VALUES (?, ?)",
+                (symbol, DEFAULT_INDICES.get(symbol, symbol))
+            )
+            row = cursor.execute("SELECT index_id FROM MarketIndices WHERE symbol = ?", (symbol,)).fetchone()
+            return None, row[0]
+        cursor.execute("INSERT OR IGNORE INTO Companies (ticker, company_name) VALUES (?, ?)", (symbol, symbol))
+        row = cursor.execute("SELECT company_id FROM Companies WHERE ticker = ?", (symbol,)).fetchone()
+        return row[0], None
+    
+    def add_alert(self, user_id: int, symbol: str, alert_type: str, threshold: float) -> int:
+        """
+        Create an alert and index it.
+        
+        Args:
+            user_id: Owner
+            symbol: Ticker, or index symbol starting with '^'
+            alert_type: One of ALERT_TYPES
+            threshold: Price, volume multiple (VOLUME_SPIKE) or percent
+                       change (PERCENT_CHANGE; negative for declines)
+        
+        Returns:
+            New alert_id
+        """
+        if alert_type not in ALERT_TYPES:
+            raise ValueError(f"Unknown alert type '{alert_type}'. Available: {', '.join(ALERT_TYPES)}")
+        symbol = symbol.upper()
+        with self._lock:
+            company_id, index_id = self._resolve_symbol(symbol)
+            cursor = self.db.conn.execute("""
+                INSERT INTO Alerts (user_id, company_id, index_id, alert_type, threshold_value)
+                VALUES (?, ?, ?, ?, ?)
+            """, (user_id, company_id, index_id, alert_type, float(threshold)))
+            self.db.conn.commit()
+            alert_id = cursor.lastrowid
+            self._sync_locked()
+        return alert_id
+    
+    def cancel_alert(self, alert_id: int) -> bool:
+        """
+        Cancel an active alert.
+        
+        Returns:
+            True if the alert was active
+        """
+        with self._lock:
+            cursor = self.db.conn.execute(
+                "UPDATE Alerts SET status = 'CANCELLED' WHERE alert_id = ? AND status = 'ACTIVE'", (alert_id,)
+            )
+            self.db.conn.commit()
+            symbol = self._symbols.pop(alert_id, None)
+            for index in self._index.get(symbol, {}).values():
+                if index.remove(alert_id):
+                    break
+            return cursor.rowcount > 0
+    
+    def symbols(self) -> List[str]:
+        """Symbols with at least one active alert."""
+        with self._lock:
+            return [s for s, indexes in self._index.items() if any(len(i) for i in indexes.values())]
+    
+    @staticmethod
+    def _quote_values(quote: Dict) -> Dict[str, float]:
+        """Fields alerts are checked against, from a get_current_price-style dict."""
+        values = {}
+        price = quote.get('current_price', quote.get('price'))
+        if price:
+            values['price'] = float(price)
+        if quote.get('change_percent') is not None and not pd.isna(quote.get('change_percent')):
+            values['change_percent'] = float(quote['change_percent'])
+        volume, avg_volume = quote.get('volume'), quote.get('avg_volume')
+        if volume and avg_volume:
+            values['volume_ratio'] = float(volume) / float(avg_volume)
+        return values
+    
+    def evaluate(self, quotes: Union[pd.DataFrame, Iterable[Dict]]) -> pd.DataFrame:
+        """
+        Fire every alert crossed by a batch of quotes.
+        
+        An alert fires the first time its condition holds and is then marked
+        TRIGGERED (with triggered_at and message) in one bulk update.
+        
+        Args:
+            quotes: Rows with ticker (or symbol), current_price, change_percent,
+                    volume and avg_volume (as from DataFetcher.get_multiple_tickers)
+        
+        Returns:
+            DataFrame of fired alerts: alert_id, symbol, alert_type,
+            threshold_value, value, message, triggered_at
+        """
+        if isinstance(quotes, pd.DataFrame):
+            quotes = quotes.to_dict('records')
+        if time.monotonic() - self._synced_at >= ALERT_SYNC_SECONDS:
+            self.sync()
+        
+        now = datetime.now().isoformat(sep=' ', timespec='seconds')
+        fired = []
+        with self._lock:
+            for quote in quotes:
+                symbol = str(quote.get('ticker') or quote.get('symbol') or '').upper()
+                indexes = self._index.get(symbol)
+                if not indexes:
+                    continue
+                values = self._quote_values(quote)
+                for (alert_type, direction), index in indexes.items():
+                    field = ALERT_FIELDS[alert_type]
+                    if field not in values or not len(index):
+                        continue
+                    value = values[field]
+                    ids, thresholds = index.pop_crossed(value)
+                    for alert_id, threshold in zip(ids.tolist(), thresholds.tolist()):
+                        self._symbols.pop(alert_id, None)
+                        fired.append((alert_id, symbol, alert_type, threshold, value,
+                                      self._message(symbol, alert_type, threshold, value), now))
+            self.evaluations += 1
+            
+            if fired:
+                self.db.conn.executemany(
+                    "UPDATE Alerts SET status = 'TRIGGERED', triggered_at = ?, message = ? "
+                    "WHERE alert_id = ? AND status = 'ACTIVE'",
+                    [(row[6], row[5], row[0]) for row in fired]
+                )
+                self.db.conn.commit()
+                self.triggered += len(fired)
+        
+        if fired:
+            logger.info(f"Triggered {len(fired)} alerts")
+        return pd.DataFrame(fired, columns=[
+            'alert_id', 'symbol', 'alert_type', 'threshold_value', 'value', 'message', 'triggered_at'
+        ])
+    
+    @staticmethod
+    def _message(symbol: str, alert_type: str, threshold: float, value: float) -> str:
+        if alert_type == 'PRICE_ABOVE':
+            return f"{symbol} price {value:,.2f} rose above {threshold:,.2f}"
+        if alert_type == 'PRICE_BELOW':
+            return f"{symbol} price {value:,.2f} fell below {threshold:,.2f}"
+        if alert_type == 'VOLUME_SPIKE':
+            return f"{symbol} volume at {value:.1f}x average (alert at {threshold:.1f}x)"
+        return f"{symbol} moved {value:+.2f}% (alert at {threshold:+.2f}%)"
+    
+    def get_alerts(self, user_id: Optional[int] = None, status: Optional[str] = None) -> pd.DataFrame:
+        """
+        List alerts with their symbols.
+        
+        Args:
+            user_id: Only this user's alerts
+            status: Only ACTIVE, TRIGGERED or CANCELLED alerts
+        
+        Returns:
+            DataFrame of alerts, newest first
+        """
+        sql = """
+            SELECT a.alert_id, a.user_id, COALESCE(c.ticker, m.symbol) AS symbol, a.alert_type,
+                   a.threshold_value, a.status, a.created_at, a.triggered_at, a.message
+            FROM Alerts a
+            LEFT JOIN Companies c ON c.company_id = a.company_id
+            LEFT JOIN MarketIndices m ON m.index_id = a.index_id
+            WHERE (? IS NULL OR a.user_id = ?) AND (? IS NULL OR a.status = ?)
+            ORDER BY a.alert_id DESC
+        """
+        with self._lock:
+            return pd.read_sql_query(sql, self.db.conn, params=(user_id, user_id, status, status))
+    
+    def stats(self) -> Dict:
+        """Active alerts, indexed symbols, evaluations and triggers so far."""
+        with self._lock:
+            return {
+                'active': sum(len(i) for indexes in self._index.values() for i in indexes.values()),
+                'symbols': len(self._index),
+                'evaluations': self.evaluations,
+                'triggered': self.triggered
+            }
+
+
+# Global instance
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_alert_engine() -> AlertEngine:
+    """Get or create global alert engine instance."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AlertEngine()
+    return _engine
@@ -0,0 +1,382 @@
+"""
+Vectorized strategy backtesting over technical features.
+Signal rules read (date x ticker) panels built from add_all_features output
+and return target positions; positions, PnL and transaction costs are
+computed on whole arrays, and parameter sweeps run in a process pool.
+"""
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.processing.feature_engineer import add_all_features
+from src.analysis.historical_analysis import calculate_performance_metrics
+from config.settings import BACKTEST_INITIAL_CAPITAL, BACKTEST_COST_BPS, BACKTEST_WORKERS
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+
+# Metrics kept per parameter set in sweep results
+SWEEP_METRICS = [
+    'total_return', 'annualized_return', 'annualized_volatility', 'sharpe_ratio',
+    'max_drawdown', 'annual_turnover', 'total_costs', 'exposure', 'trades'
+]
+
+
+class FeaturePanel:
+    """Technical features as wide (date x ticker) panels, one per feature column."""
+    
+    def __init__(self, features: Dict[str, pd.DataFrame], column: str = 'close'):
+        """
+        Initialize from existing panels.
+        
+        Args:
+            features: Mapping of feature name to panel (must include column)
+            column: Price column the features were computed from
+        """
+        self.column = column
+        close = features[column].sort_index()
+        self.features = {name: panel.reindex(index=close.index, columns=close.columns)
+                         for name, panel in features.items()}
+        self._derived: Dict[tuple, pd.DataFrame] = {}
+    
+    @classmethod
+    def from_price_data(
+        cls,
+        data: Dict[str, pd.DataFrame],
+        column: str = 'close',
+        features: Optional[List[str]] = None
+    ) -> 'FeaturePanel':
+        """
+        Run add_all_features for every ticker and pivot the result into panels.
+        
+        Args:
+            data: Mapping of ticker to price history (DataFetcher.get_historical_data)
+            column: Price column to use
+            features: Feature columns to keep (None = all)
+        
+        Returns:
+            FeaturePanel
+        """
+        featured = {}
+        for ticker, df in data.items():
+            if df is None or df.empty or column not in df.columns:
+                continue
+            frame = add_all_features(df, column)
+            # Same date alignment as build_price_panel, done once for all features
+            dates = pd.DatetimeIndex(pd.to_datetime(frame['date'] if 'date' in frame.columns else frame.index))
+            if dates.tz is not None:
+                dates = dates.tz_localize(None)
+            frame = frame.select_dtypes('number').set_axis(dates.normalize(), axis=0)
+            featured[ticker] = frame[~frame.index.duplicated(keep='last')]
+        if not featured:
+            raise ValueError("No price data to build features from")
+        
+        wide = pd.concat(featured, axis=1).sort_index()
+        names = features or list(dict.fromkeys(wide.columns.get_level_values(1)))
+        if column not in names:
+            names = [column] + list(names)
+        panels = {name: wide.xs(name, axis=1, level=1) for name in names}
+        return cls(panels, column)
+    
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        return self.features[name]
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.features
+    
+    @property
+    def close(self) -> pd.DataFrame:
+        """Price panel."""
+        return self.features[self.column]
+    
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return self.close.index
+    
+    @property
+    def tickers(self) -> List[str]:
+        return list(self.close.columns)
+    
+    def sma(self, window: int) -> pd.DataFrame:
+        """Simple moving average of price (reuses ma_20/50/200 where available)."""
+        if f'ma_{window}' in self.features:
+            return self.features[f'ma_{window}']
+        return self._derive(('sma', window), lambda: self.close.rolling(window).mean())
+    
+    def ema(self, span: int) -> pd.DataFrame:
+        """Exponential moving average of price (same convention as calculate_macd)."""
+        return self._derive(('ema', span), lambda: self.close.ewm(span=span, adjust=False).mean())
+    
+    def rolling_std(self, window: int) -> pd.DataFrame:
+        """Rolling standard deviation of price."""
+        return self._derive(('std', window), lambda: self.close.rolling(window).std())
+    
+    def _derive(self, key: tuple, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Memoize indicators that sweeps request repeatedly with the same window."""
+        if key not in self._derived:
+            self._derived[key] = compute()
+        return self._derived[key]
+    
+    def __getstate__(self):
+        # Derived indicators are cheap to rebuild; don't ship them to workers
+        state = self.__dict__.copy()
+        state['_derived'] = {}
+        return state
+
+
+def _hold(entries: pd.DataFrame, exits: pd.DataFrame) -> pd.DataFrame:
+    """Long from an entry until the next exit (vectorized via forward fill)."""
+    state = pd.DataFrame(np.nan, index=entries.index, columns=entries.columns)
+    state = state.mask(exits, 0.0).mask(entries, 1.0)
+    return state.ffill().fillna(0.0)
+
+
+def ma_crossover(panel: FeaturePanel, fast: int = 20, slow: int = 50) -> pd.DataFrame:
+    """Long while the fast moving average is above the slow one."""
+    return (panel.sma(fast) > panel.sma(slow)).astype(float)
+
+
+def rsi_reversion(panel: FeaturePanel, lower: float = 30, upper: float = 70) -> pd.DataFrame:
+    """Buy when RSI drops below lower, sell when it rises above upper."""
+    rsi = panel['rsi']
+    return _hold(rsi < lower, rsi > upper)
+
+
+def macd_trend(panel: FeaturePanel, threshold: float = 0.0) -> pd.DataFrame:
+    """Long while the MACD histogram is above threshold."""
+    return (panel['macd_histogram'] > threshold).astype(float)
+
+
+def bollinger_reversion(panel: FeaturePanel, window: int = 20, num_std: float = 2.0) -> pd.DataFrame:
+    """Buy below the lower band, sell once price recovers to the middle band."""
+    if window == 20 and num_std == 2.0 and 'bb_lower' in panel:
+        middle, lower = panel['bb_middle'], panel['bb_lower']
+    else:
+        middle = panel.sma(window)
+        lower = middle - panel.rolling_std(window) * num_std
+    return _hold(panel.close < lower, panel.close >= middle)
+
+
+RULES: Dict[str, Callable[..., pd.DataFrame]] = {
+    'ma_crossover': ma_crossover,
+    'rsi_reversion': rsi_reversion,
+    'macd_trend': macd_trend,
+    'bollinger_reversion': bollinger_reversion
+}
+
+
+def _resolve_rule(rule: Union[str, Callable]) -> Callable[..., pd.DataFrame]:
+    if callable(rule):
+        return rule
+    if rule not in RULES:
+        raise ValueError(f"Unknown rule '{rule}'. Available: {', '.join(RULES)}")
+    return RULES[rule]
+
+
+def signals_to_weights(signals: np.ndarray, tradable: np.ndarray) -> np.ndarray:
+    """
+    Turn raw signals into portfolio weights.
+    
+    Signals are clipped to [-1, 1] and active names share the book equally
+    (gross exposure 1 whenever anything is held).
+    
+    Args:
+        signals: (date x ticker) signal array
+        tradable: Mask of dates/tickers with a price
+    
+    Returns:
+        Weight array of the same shape
+    """
+    signals = np.clip(np.nan_to_num(signals), -1.0, 1.0)
+    signals[~tradable] = 0.0
+    gross = np.abs(signals).sum(axis=1, keepdims=True)
+    return np.divide(signals, gross, out=np.zeros_like(signals), where=gross > 0)
+
+
+def run_backtest(
+    panel: FeaturePanel,
+    rule: Union[str, Callable],
+    params: Optional[Dict] = None,
+    cost_bps: float = BACKTEST_COST_BPS,
+    initial_capital: float = BACKTEST_INITIAL_CAPITAL,
+    lag: int = 1,
+    include_positions: bool = True
+) -> Dict:
+    """
+    Backtest a signal rule on a feature panel.
+    
+    Signals computed on day t's close are traded at that close and earn
+    returns from t + lag onward, so no rule can see its own future.
+    
+    Args:
+        panel: Feature panels
+        rule: Rule name (see RULES) or callable(panel, **params) returning a
+              (date x ticker) DataFrame of target positions in [-1, 1]
+        params: Rule parameters
+        cost_bps: Cost per unit of turnover, in basis points
+        initial_capital: Starting equity
+        lag: Days between signal and position
+        include_positions: Return the positions panel (sweeps skip it)
+    
+    Returns:
+        Dict with 'equity_curve' (equity, daily_return, gross_return, costs,
+        turnover, exposure), 'metrics' and optionally 'positions'
+    """
+    params = params or {}
+    signals = _resolve_rule(rule)(panel, **params)
+    signals = signals.reindex(index=panel.dates, columns=panel.tickers)
+    
+    close = panel.close.to_numpy(dtype=float)
+    tradable = ~np.isnan(close)
+    weights = signals_to_weights(signals.to_numpy(dtype=float), tradable)
+    
+    # Shift weights down by lag rows: positions held over each day's return
+    positions = np.zeros_like(weights)
+    positions[lag:] = weights[:-lag] if lag else weights
+    
+    returns = np.zeros_like(close)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = close[1:] / close[:-1] - 1.0
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+    
+    gross_return = (positions * returns).sum(axis=1)
+    turnover = np.abs(np.diff(positions, axis=0, prepend=0.0)).sum(axis=1)
+    costs = turnover * cost_bps / 10000.0
+    daily_return = gross_return - costs
+    equity = initial_capital * np.cumprod(1.0 + daily_return)
+    
+    curve = pd.DataFrame({
+        'equity': equity,
+        'daily_return': daily_return,
+        'gross_return': gross_return,
+        'costs': costs,
+        'turnover': turnover,
+        'exposure': np.abs(positions).sum(axis=1)
+    }, index=panel.dates)
+    
+    result = {'equity_curve': curve, 'metrics': backtest_metrics(curve, positions)}
+    if include_positions:
+        result['positions'] = pd.DataFrame(positions, index=panel.dates, columns=panel.tickers)
+    return result
+
+
+def backtest_metrics(curve: pd.DataFrame, positions: np.ndarray) -> Dict:
+    """
+    Performance metrics for a backtest equity curve.
+    
+    Args:
+        curve: Equity curve from run_backtest
+        positions: Position array the curve was computed from
+    
+    Returns:
+        Dict with the historical_analysis metrics plus annualized return,
+        turnover, costs, exposure and trade count
+    """
+    # Reuse the single-series metrics on the equity column
+    metrics_frame = pd.DataFrame({'date': curve.index, 'equity': curve['equity'].to_numpy()})
+    metrics = calculate_performance_metrics(metrics_frame, price_column='equity')
+    
+    years = max(len(curve) / TRADING_DAYS, 1.0 / TRADING_DAYS)
+    growth = curve['equity'].iloc[-1] / curve['equity'].iloc[0] * (1.0 + curve['daily_return'].iloc[0])
+    metrics['total_return'] = (growth - 1.0) * 100
+    metrics['annualized_return'] = (growth ** (1.0 / years) - 1.0) * 100
+    metrics['annual_turnover'] = float(curve['turnover'].sum() / years)
+    metrics['total_costs'] = float(curve['costs'].sum() * 100)
+    metrics['exposure'] = float(curve['exposure'].mean())
+    # Entries, exits and reversals; daily re-weighting of held names is not a trade
+    metrics['trades'] = int(np.count_nonzero(np.diff(np.sign(positions), axis=0, prepend=0.0)))
+    return metrics
+
+
+def parameter_grid(grid: Dict[str, List]) -> List[Dict]:
+    """
+    Expand {'fast': [10, 20], 'slow': [50, 100]} into every combination.
+    
+    Args:
+        grid: Parameter name to candidate values
+    
+    Returns:
+        List of parameter dicts
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+# Per-process panel for sweep workers (set once by the pool initializer)
+_worker_panel: Optional[FeaturePanel] = None
+
+
+def _init_worker(panel: FeaturePanel):
+    global _worker_panel
+    _worker_panel = panel
+
+
+def _sweep_one(rule: Union[str, Callable], params: Dict, cost_bps: float, initial_capital: float) -> Dict:
+    result = run_backtest(_worker_panel, rule, params, cost_bps=cost_bps,
+                          initial_capital=initial_capital, include_positions=False)
+    row = dict(params)
+    row.update({name: result['metrics'].get(name) for name in SWEEP_METRICS})
+    return row
+
+
+def parameter_sweep(
+    panel: FeaturePanel,
+    rule: Union[str, Callable],
+    grid: Union[Dict[str, List], List[Dict]],
+    cost_bps: float = BACKTEST_COST_BPS,
+    initial_capital: float = BACKTEST_INITIAL_CAPITAL,
+    workers: int = BACKTEST_WORKERS,
+    sort_by: str = 'sharpe_ratio'
+) -> pd.DataFrame:
+    """
+    Backtest a rule for every parameter set, in parallel worker processes.
+    
+    The panel is shipped to each worker once; tasks only carry parameters
+    and return scalar metrics. Custom rules must be module-level functions
+    so they can be pickled.
+    
+    Args:
+        panel: Feature panels
+        rule: Rule name or callable (see run_backtest)
+        grid: Parameter grid (see parameter_grid) or explicit parameter dicts
+        cost_bps: Cost per unit of turnover, in basis points
+        initial_capital: Starting equity
+        workers: Worker processes (0 = one per CPU, 1 = run in this process)
+        sort_by: Metric to sort results by (descending)
+    
+    Returns:
+        DataFrame with one row per parameter set: parameters plus SWEEP_METRICS
+    """
+    param_sets = parameter_grid(grid) if isinstance(grid, dict) else list(grid)
+    if not param_sets:
+        return pd.DataFrame()
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(param_sets))
+    
+    if workers <= 1:
+        _init_worker(panel)
+        try:
+            rows = [_sweep_one(rule, p, cost_bps, initial_capital) for p in param_sets]
+        finally:
+            _init_worker(None)
+    else:
+        chunksize = max(1, len(param_sets) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(panel,)) as executor:
+            rows = list(executor.map(
+                _sweep_one,
+                itertools.repeat(rule), param_sets,
+                itertools.repeat(cost_bps), itertools.repeat(initial_capital),
+                chunksize=chunksize
+            ))
+    logger.info(f"Swept {len(param_sets)} parameter sets with {workers} worker(s)")
+    
+    results = pd.DataFrame(rows)
+    if sort_by in results.columns:
+        results = results.sort_values(sort_by, ascending=False, ignore_index=True)
+    return results
@@ -0,0 +1,515 @@
+"""
+Correlation and covariance service for watchlists and sectors.
+Builds a returns panel for a universe, computes rolling-window or EWMA
+correlation/covariance matrices with pairwise-complete data (optionally
+shrunk toward zero correlation), orders names by hierarchical clustering and
+caches results per (universe, window, as-of date).
+"""
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.historical_analysis import build_price_panel, calculate_returns_panel
+from src.utils.cache_backend import CacheBackend, get_cache_backend, make_cache_key
+from src.utils.database import Database
+from config.settings import (
+    DATABASE_PATH, CORRELATION_WINDOW, CORRELATION_HALFLIFE, CORRELATION_HISTORY_PERIOD,
+    CORRELATION_CACHE_TTL, CORRELATION_FETCH_WORKERS
+)
+from config.watchlists import DEFAULT_WATCHLISTS
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('rolling', 'ewma')
+
+
+def pairwise_covariance(returns: np.ndarray, weights: np.ndarray, min_periods: int = 2) -> Dict:
+    """
+    Weighted covariance and correlation over pairwise-complete observations.
+    
+    Every statistic for a pair (i, j) uses only the rows where both returns
+    are present, as DataFrame.cov/corr do, but computed with a handful of
+    matrix products instead of a loop over pairs.
+    
+    Args:
+        returns: (rows x names) returns, NaN where missing
+        weights: Per-row weights (equal weights = rolling window)
+        min_periods: Minimum overlapping rows for a pair
+    
+    Returns:
+        Dict with covariance and correlation arrays and pairwise
+        observation counts
+    """
+    present = ~np.isnan(returns)
+    x = np.where(present, returns, 0.0)
+    m = present.astype(float)
+    w = np.asarray(weights, dtype=float)[:, None]
+    xw, mw = x * w, m * w
+    
+    counts = m.T @ m
+    sum_w = mw.T @ m  # Total weight where both i and j are present
+    sum_w2 = (mw * w).T @ m
+    sum_x = xw.T @ m  # [i, j]: weighted sum of x_i over the overlap with j
+    sum_xx = (xw * x).T @ m
+    sum_xy = xw.T @ x
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = sum_x / sum_w
+        cov = sum_xy / sum_w - mean * mean.T
+        var = sum_xx / sum_w - mean ** 2
+        # Unbiased weighted estimate; n / (n - 1) for equal weights
+        correction = sum_w ** 2 / (sum_w ** 2 - sum_w2)
+        cov *= correction
+        var *= correction
+        corr = cov / np.sqrt(var * var.T)
+    
+    invalid = counts < max(min_periods, 2)
+    cov[invalid] = np.nan
+    corr[invalid] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+    diagonal = np.diag(cov) > 0
+    corr[np.diag_indices_from(corr)] = np.where(diagonal, 1.0, np.nan)
+    return {'covariance': cov, 'correlation': corr, 'counts': counts}
+
+
+def ledoit_wolf_intensity(returns: np.ndarray) -> float:
+    """
+    Ledoit-Wolf shrinkage intensity toward the identity for standardized returns.
+    
+    Args:
+        returns: (rows x names) returns, NaN where missing
+    
+    Returns:
+        Intensity in [0, 1] (weight on the identity target)
+    """
+    n, p = returns.shape
+    if n < 2 or p < 2:
+        return 0.0
+    z = returns - np.nanmean(returns, axis=0)
+    z = z / np.nanstd(z, axis=0)
+    z = np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0)
+    
+    sample = z.T @ z / n
+    mu = np.trace(sample) / p
+    d2 = np.sum((sample - mu * np.eye(p)) ** 2) / p
+    if d2 <= 0:
+        return 0.0
+    # sum_k ||z_k z_k' - S||^2 = sum_k ||z_k||^4 - n ||S||^2
+    b2 = (np.sum(np.sum(z ** 2, axis=1) ** 2) - n * np.sum(sample ** 2)) / (n ** 2 * p)
+    return float(np.clip(min(b2, d2) / d2, 0.0, 1.0))
+
+
+def correlation_matrix(
+    returns: pd.DataFrame,
+    method: str = 'rolling',
+    window: int = CORRELATION_WINDOW,
+    halflife: float = CORRELATION_HALFLIFE,
+    shrinkage: Union[None, float, str] = None,
+    min_periods: Optional[int] = None
+) -> Dict:
+    """
+    Correlation and covariance as of the last row of a returns panel.
+    
+    Args:
+        returns: Returns panel (see calculate_returns_panel)
+        method: 'rolling' (equal weights over the last window rows) or
+                'ewma' (exponential weights with the given half-life)
+        window: Rolling window length in rows
+        halflife: EWMA half-life in rows
+        shrinkage: None, a fixed intensity in [0, 1], or 'ledoit-wolf'
+        min_periods: Minimum observations per name and pair (default half
+                     the window, or the half-life for EWMA)
+    
+    Returns:
+        Dict with 'correlation' and 'covariance' DataFrames (daily units),
+        'shrinkage' intensity and 'observations' (rows used)
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'. Available: {', '.join(METHODS)}")
+    
+    if method == 'rolling':
+        frame = returns.iloc[-window:]
+        weights = np.ones(len(frame))
+        min_periods = min_periods or max(2, window // 2)
+    else:
+        frame = returns
+        decay = 0.5 ** (1.0 / halflife)
+        weights = decay ** np.arange(len(frame) - 1, -1, -1, dtype=float)
+        min_periods = min_periods or max(2, int(halflife))
+    
+    # Drop names without enough history in the window
+    frame = frame.loc[:, frame.notna().sum() >= min_periods]
+    values = frame.to_numpy(dtype=float)
+    result = pairwise_covariance(values, weights, min_periods)
+    corr, cov = result['correlation'], result['covariance']
+    
+    intensity = 0.0
+    if shrinkage == 'ledoit-wolf':
+        intensity = ledoit_wolf_intensity(values)
+    elif shrinkage is not None:
+        intensity = float(np.clip(shrinkage, 0.0, 1.0))
+    if intensity > 0:
+        # Shrink correlations toward zero and rebuild covariance from them
+        std = np.sqrt(np.diag(cov))
+        corr = (1.0 - intensity) * corr + intensity * np.eye(len(corr))
+        cov = corr * np.outer(std, std)
+    
+    tickers = list(frame.columns)
+    return {
+        'correlation': pd.DataFrame(corr, index=tickers, columns=tickers),
+        'covariance': pd.DataFrame(cov, index=tickers, columns=tickers),
+        'shrinkage': intensity,
+        'observations': len(frame)
+    }
+
+
+def average_linkage(corr: np.ndarray) -> np.ndarray:
+    """
+    Average-linkage agglomerative clustering on correlation distance.
+    
+    Distance is sqrt((1 - rho) / 2); missing correlations count as zero.
+    
+    Args:
+        corr: (n x n) correlation matrix
+    
+    Returns:
+        (n - 1) x 4 linkage array in scipy's layout: merged cluster ids,
+        merge distance and new cluster size (ids >= n are earlier merges)
+    """
+    n = len(corr)
+    dist = np.sqrt(np.clip(0.5 * (1.0 - np.nan_to_num(corr, nan=0.0)), 0.0, None))
+    np.fill_diagonal(dist, np.inf)
+    sizes = np.ones(n)
+    ids = np.arange(n)
+    linkage = np.zeros((max(n - 1, 0), 4))
+    
+    for step in range(n - 1):
+        i, j = divmod(int(np.argmin(dist)), n)
+        if i > j:
+            i, j = j, i
+        linkage[step] = (min(ids[i], ids[j]), max(ids[i], ids[j]), dist[i, j], sizes[i] + sizes[j])
+        
+        # Lance-Williams update for average linkage; row j is retired
+        merged = (sizes[i] * dist[i] + sizes[j] * dist[j]) / (sizes[i] + sizes[j])
+        dist[i, :] = merged
+        dist[:, i] = merged
+        dist[i, i] = np.inf
+        dist[j, :] = np.inf
+        dist[:, j] = np.inf
+        sizes[i] += sizes[j]
+        ids[i] = n + step
+    
+    return linkage
+
+
+def leaf_order(linkage: np.ndarray, n: int) -> List[int]:
+    """Left-to-right dendrogram leaf order (similar names end up adjacent)."""
+    if n <= 1:
+        return list(range(n))
+    order = []
+    stack = [2 * n - 2]
+    while stack:
+        node = stack.pop()
+        if node < n:
+            order.append(node)
+        else:
+            left, right = linkage[node - n, :2].astype(int)
+            stack.extend([right, left])
+    return order
+
+
+def cluster_labels(linkage: np.ndarray, n: int, n_clusters: int) -> np.ndarray:
+    """
+    Flat cluster labels from cutting the tree into n_clusters groups.
+    
+    Args:
+        linkage: Linkage array from average_linkage
+        n: Number of leaves
+        n_clusters: Number of clusters wanted
+    
+    Returns:
+        Label per leaf (1..n_clusters, numbered in leaf order)
+    """
+    parent = list(range(2 * n - 1))
+    
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+    
+    for step in range(max(0, n - max(1, n_clusters))):
+        left, right = linkage[step, :2].astype(int)
+        parent[find(left)] = n + step
+        parent[find(right)] = n + step
+    
+    roots = [find(leaf) for leaf in range(n)]
+    numbering: Dict[int, int] = {}
+    for leaf in leaf_order(linkage, n):
+        numbering.setdefault(roots[leaf], len(numbering) + 1)
+    return np.array([numbering[root] for root in roots])
+
+
+def pack_result(result: Dict) -> bytes:
+    """
+    Serialize a get_matrix result for the cache.
+    
+    The correlation and covariance matrices are stored as one float64 array
+    (plus the linkage) in an uncompressed .npz, with the ticker order and the
+    scalar fields as a JSON header, so a 500-name result is ~4MB of raw
+    floats instead of ~11MB of table-orient JSON.
+    
+    Args:
+        result: Dict returned by CorrelationService.get_matrix
+    
+    Returns:
+        Bytes for the cache backend
+    """
+    clusters = result['clusters']
+    header = {
+        k: result[k]
+        for k in ('universe', 'as_of', 'method', 'window', 'halflife', 'order', 'shrinkage', 'observations')
+    }
+    header['clusters'] = None if clusters is None else [int(c) for c in clusters]
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        matrices=np.stack([result['correlation'].to_numpy(float), result['covariance'].to_numpy(float)]),
+        linkage=np.asarray(result['linkage'], dtype=float),
+        header=np.frombuffer(json.dumps(header).encode('utf-8'), dtype=np.uint8)
+    )
+    return buffer.getvalue()
+
+
+def unpack_result(data: bytes) -> Dict:
+    """
+    Inverse of pack_result.
+    
+    Args:
+        data: Bytes from pack_result
+    
+    Returns:
+        Dict in the get_matrix format
+    """
+    with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+        matrices, linkage = arrays['matrices'], arrays['linkage']
+        header = json.loads(arrays['header'].tobytes().decode('utf-8'))
+    
+    order = header['order']
+    clusters = header.pop('clusters')
+    result = dict(header)
+    result.update({
+        'correlation': pd.DataFrame(matrices[0], index=order, columns=order),
+        'covariance': pd.DataFrame(matrices[1], index=order, columns=order),
+        'clusters': None if clusters is None else pd.Series(clusters, index=order),
+        'linkage': linkage
+    })
+    return result
+
+
+class CorrelationService:
+    """Computes and caches correlation matrices for named universes."""
+    
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        history_loader: Optional[Callable[[str, str], Optional[pd.DataFrame]]] = None
+    ):
+        """
+        Initialize the service.
+        
+        Args:
+            backend: Cache backend for results (default: shared backend)
+            history_loader: (ticker, period) -> price history (default:
+                            cached_data.get_historical_data)
+        """
+        self.backend = backend or get_cache_backend()
+        self.history_loader = history_loader
+    
+    def resolve_universe(self, universe: Union[str, List[str]]) -> Tuple[str, List[str]]:
+        """
+        Turn a universe spec into a name and ticker list.
+        
+        Args:
+            universe: Ticker list, default watchlist name, a stored watchlist
+                      name, or 'sector:<name>' (from the screener factor table)
+        
+        Returns:
+            Tuple of (universe name, sorted tickers)
+        """
+        if not isinstance(universe, str):
+            tickers = sorted({t.upper() for t in universe})
+            return 'custom', tickers
+        
+        if universe.lower().startswith('sector:'):
+            from src.analysis.screener import get_screener
+            sector = universe.split(':', 1)[1].strip()
+            frame = get_screener().screen([('sector', '==', sector)], columns=['ticker'])
+            return universe, sorted(frame['ticker'])
+        
+        if universe in DEFAULT_WATCHLISTS:
+            return universe, sorted(set(DEFAULT_WATCHLISTS[universe]))
+        
+        db = Database(DATABASE_PATH)
+        db.connect()
+        try:
+            rows = db.conn.execute("""
+                SELECT DISTINCT c.ticker
+                FROM Watchlists w
+                JOIN WatchlistItems i ON i.watchlist_id = w.watchlist_id
+                JOIN Companies c ON c.company_id = i.company_id
+                WHERE w.watchlist_name = ?
+            """, (universe,)).fetchall()
+        except Exception:
+            rows = []
+        finally:
+            db.close()
+        if not rows:
+            raise ValueError(f"Unknown universe '{universe}'")
+        return universe, sorted(row[0] for row in rows)
+    
+    def _load_history(self, ticker: str, period: str) -> Optional[pd.DataFrame]:
+        try:
+            if self.history_loader is not None:
+                return self.history_loader(ticker, period)
+            from src.api import cached_data
+            return cached_data.get_historical_data(ticker, period=period)
+        except Exception as e:
+            logger.error(f"Correlation history fetch failed for {ticker}: {e}")
+            return None
+    
+    def returns_panel(
+        self,
+        tickers: List[str],
+        period: str = CORRELATION_HISTORY_PERIOD,
+        as_of: Optional[date] = None,
+        log_returns: bool = False
+    ) -> pd.DataFrame:
+        """
+        Daily returns for every ticker, aligned on date.
+        
+        Args:
+            tickers: Ticker symbols
+            period: History period to fetch
+            as_of: Drop rows after this date
+            log_returns: Use log returns
+        
+        Returns:
+            Returns panel (date x ticker)
+        """
+        with ThreadPoolExecutor(max_workers=max(1, CORRELATION_FETCH_WORKERS)) as executor:
+            histories = dict(zip(tickers, executor.map(lambda t: self._load_history(t, period), tickers)))
+        prices = build_price_panel(histories)
+        if prices.empty:
+            return prices
+        if as_of is not None:
+            prices = prices[prices.index <= pd.Timestamp(as_of)]
+        return calculate_returns_panel(prices, log_returns=log_returns)
+    
+    def get_matrix(
+        self,
+        universe: Union[str, List[str]],
+        method: str = 'rolling',
+        window: int = CORRELATION_WINDOW,
+        halflife: float = CORRELATION_HALFLIFE,
+        shrinkage: Union[None, float, str] = None,
+        as_of: Optional[Union[str, date, datetime]] = None,
+        n_clusters: Optional[int] = None,
+        refresh: bool = False
+    ) -> Dict:
+        """
+        Cluster-ordered correlation/covariance matrices for a universe.
+        
+        Results are cached per (universe, tickers, method, window or
+        half-life, shrinkage, clusters, as-of date), so repeat requests -
+        e.g. re-rendering a 500-name heatmap - skip fetching and computing.
+        
+        Args:
+            universe: Universe spec (see resolve_universe)
+            method: 'rolling' or 'ewma'
+            window: Rolling window in trading days
+            halflife: EWMA half-life in trading days
+            shrinkage: None, fixed intensity in [0, 1], or 'ledoit-wolf'
+            as_of: Last date included (default today)
+            n_clusters: Also return flat cluster labels
+            refresh: Recompute even if cached
+        
+        Returns:
+            Dict with universe, as_of, method, 'correlation' and 'covariance'
+            DataFrames ordered by clustering, 'order', 'clusters' (Series or
+            None), 'linkage', 'shrinkage' and 'observations'
+        """
+        name, tickers = self.resolve_universe(universe)
+        as_of = pd.Timestamp(as_of or date.today()).date()
+        span = window if method == 'rolling' else halflife
+        key = make_cache_key('correlation', name, (
+            tuple(tickers), method, span, shrinkage, n_clusters, as_of.isoformat()
+        ))
+        if not refresh:
+            try:
+                data = self.backend.get_bytes(key)
+                result = unpack_result(data) if data is not None else None
+            except Exception as e:
+                logger.error(f"Correlation cache read failed: {e}")
+                result = None
+            if result is not None:
+                self.backend.hits += 1
+                return result
+            self.backend.misses += 1
+        
+        # Older as-of dates need more than the default history
+        recent = (date.today() - as_of).days < 180
+        returns = self.returns_panel(tickers, CORRELATION_HISTORY_PERIOD if recent else "max", as_of)
+        if returns.empty:
+            raise ValueError(f"No price history for universe '{name}'")
+        
+        matrices = correlation_matrix(returns, method, window, halflife, shrinkage)
+        corr = matrices['correlation']
+        n = len(corr)
+        linkage = average_linkage(corr.to_numpy())
+        order = [corr.index[i] for i in leaf_order(linkage, n)]
+        clusters = None
+        if n_clusters:
+            clusters = pd.Series(cluster_labels(linkage, n, n_clusters), index=corr.index).reindex(order)
+        
+        result = {
+            'universe': name,
+            'as_of': as_of.isoformat(),
+            'method': method,
+            'window': window if method == 'rolling' else None,
+            'halflife': halflife if method == 'ewma' else None,
+            'correlation': corr.loc[order, order],
+            'covariance': matrices['covariance'].loc[order, order],
+            'order': order,
+            'clusters': clusters,
+            'linkage': linkage,
+            'shrinkage': matrices['shrinkage'],
+            'observations': matrices['observations']
+        }
+        try:
+            data = pack_result(result)
+            if len(data) <= self.backend.max_item_bytes:
+                self.backend.set_bytes(key, data, CORRELATION_CACHE_TTL)
+        except Exception as e:
+            logger.error(f"Correlation cache write failed: {e}")
+        return result
+
+
+# Global instance
+_service = None
+_service_lock = threading.Lock()
+
+def get_correlation_service() -> CorrelationService:
+    """Get or create global correlation service instance."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = CorrelationService()
+    return _service
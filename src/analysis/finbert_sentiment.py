@@ -8,6 +8,9 @@ import logging
 from typing import List, Dict, Optional
 import streamlit as st
 
+from src.analysis.lexicon_sentiment import get_lexicon_scorer
+from config.settings import SENTIMENT_CASCADE_BAND, FINBERT_BATCH_SIZE
+
 logger = logging.getLogger(__name__)
 
 
@@ -91,6 +94,59 @@ class FinBERTAnalyzer:
             logger.error(f"Error in sentiment analysis: {e}")
             return []
     
+    def analyze_batch(
+        self,
+        texts: List[str],
+        threshold: float = 0.5,
+        batch_size: int = FINBERT_BATCH_SIZE
+    ) -> List[Optional[Dict]]:
+        """
+        Analyze texts with one padded forward pass per batch.
+        
+        Args:
+            texts: List of texts to analyze
+            threshold: Minimum confidence threshold
+            batch_size: Texts per forward pass
+        
+        Returns:
+            List aligned with texts; None where confidence was below threshold
+        """
+        if not texts or not self.ensure_model_loaded():
+            return [None] * len(texts)
+        
+        results: List[Optional[Dict]] = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            try:
+                inputs = self.tokenizer(
+                    batch,
+                    return_tensors="pt",
+                    truncation=True,
+                    padding=True,
+                    max_length=512
+                )
+                with torch.no_grad():
+                    outputs = self.model(**inputs)
+                    predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
+            except Exception as e:
+                logger.error(f"Error in batch sentiment analysis: {e}")
+                results.extend([None] * len(batch))
+                continue
+            
+            for scores in predictions.tolist():
+                top_idx = scores.index(max(scores))
+                if scores[top_idx] < threshold:
+                    results.append(None)  # Discard low-confidence predictions
+                    continue
+                results.append({
+                    "label": self.labels[top_idx],
+                    "confidence": scores[top_idx],
+                    "all_scores": {
+                        self.labels[i]: scores[i] for i in range(len(self.labels))
+                    }
+                })
+        return results
+    
     def analyze_multiple_texts(
         self, 
         texts: List[str], 
@@ -107,21 +163,84 @@ class FinBERTAnalyzer:
             List of sentiment results
         """
         results = []
-        for text in texts:
-            sentiment = self.analyze_financial_sentiment(text, threshold)
+        for text, sentiment in zip(texts, self.analyze_batch(texts, threshold)):
             if sentiment:
                 results.append({
                     'text': text[:100] + '...' if len(text) > 100 else text,
-                    'sentiment': sentiment[0]['label'],
-                    'confidence': sentiment[0]['confidence'],
-                    'all_scores': sentiment[0]['all_scores']
+                    'sentiment': sentiment['label'],
+                    'confidence': sentiment['confidence'],
+                    'all_scores': sentiment['all_scores'],
+                    'tier': 'finbert'
                 })
         return results
     
+    def analyze_cascade(
+        self,
+        texts: List[str],
+        threshold: float = 0.5,
+        band: float = SENTIMENT_CASCADE_BAND
+    ) -> List[Dict]:
+        """
+        Label texts with the lexicon scorer, sending only ambiguous ones to FinBERT.
+        
+        A text is ambiguous when its lexicon polarity lies inside (-band, band),
+        which includes texts with no lexicon words at all.
+        
+        Args:
+            texts: List of texts to analyze
+            threshold: Minimum FinBERT confidence threshold (0 keeps every
+                       text, so results align with texts)
+            band: Half-width of the lexicon uncertainty band
+        
+        Returns:
+            List of sentiment results in input order, each with a 'tier' of
+            'lexicon' or 'finbert' and a signed 'polarity'. Texts FinBERT
+            labels below threshold are left out.
+        """
+        if not texts:
+            return []
+        
+        scores = get_lexicon_scorer().score_texts(texts)
+        confident = (scores['polarity'].abs() >= band).to_numpy()
+        ambiguous = [t for t, c in zip(texts, confident) if not c]
+        finbert = iter(self.analyze_batch(ambiguous, threshold))
+        
+        results = []
+        for text, is_confident, polarity, label in zip(
+            texts, confident, scores['polarity'], scores['sentiment']
+        ):
+            if is_confident:
+                # Map |polarity| in [band, 1] onto a FinBERT-like confidence in [0.5, 1]
+                confidence = float(min(1.0, 0.5 + 0.5 * (abs(polarity) - band) / max(1.0 - band, 1e-9)))
+                all_scores = {label: confidence}
+                tier = 'lexicon'
+            else:
+                sentiment = next(finbert)
+                if not sentiment:
+                    continue
+                label, confidence, all_scores = (
+                    sentiment['label'], sentiment['confidence'], sentiment['all_scores']
+                )
+                polarity = all_scores.get('positive', 0.0) - all_scores.get('negative', 0.0)
+                tier = 'finbert'
+            results.append({
+                'text': text[:100] + '...' if len(text) > 100 else text,
+                'sentiment': label,
+                'confidence': confidence,
+                'all_scores': all_scores,
+                'polarity': float(polarity),
+                'tier': tier
+            })
+        
+        logger.info(f"Sentiment cascade: {len(texts) - len(ambiguous)} lexicon, "
+                    f"{len(ambiguous)} forwarded to FinBERT")
+        return results
+    
     def get_aggregate_sentiment(
         self, 
         texts: List[str], 
-        threshold: float = 0.5
+        threshold: float = 0.5,
+        mode: str = 'cascade'
     ) -> Dict:
         """
         Get aggregate sentiment from multiple texts.
@@ -129,12 +248,28 @@ class FinBERTAnalyzer:
         Args:
             texts: List of texts to analyze
             threshold: Minimum confidence threshold
+            mode: 'cascade' (lexicon first, FinBERT only for texts in the
+                  uncertainty band) or 'finbert' (every text)
             
         Returns:
             Dict with aggregate sentiment statistics
         """
-        results = self.analyze_multiple_texts(texts, threshold)
+        if mode == 'cascade':
+            results = self.analyze_cascade(texts, threshold)
+        else:
+            results = self.analyze_multiple_texts(texts, threshold)
+        return self.aggregate_results(results)
+    
+    def aggregate_results(self, results: List[Dict]) -> Dict:
+        """
+        Summarize per-text results from analyze_multiple_texts.
+        
+        Args:
+            results: List of per-text sentiment results
         
+        Returns:
+            Dict with aggregate sentiment statistics
+        """
         if not results:
             return {
                 'overall_sentiment': 'neutral',
@@ -145,7 +280,9 @@ class FinBERTAnalyzer:
                 'total_analyzed': 0,
                 'positive_percentage': 0.0,
                 'negative_percentage': 0.0,
-                'neutral_percentage': 0.0
+                'neutral_percentage': 0.0,
+                'tier_counts': {},
+                'detailed_results': []
             }
         
         # Count sentiments
@@ -170,6 +307,12 @@ class FinBERTAnalyzer:
         # Average confidence
         avg_confidence = sum(r['confidence'] for r in results) / total
         
+        # Which tier labelled each text (results stored before tiers are FinBERT)
+        tier_counts = {}
+        for r in results:
+            tier = r.get('tier', 'finbert')
+            tier_counts[tier] = tier_counts.get(tier, 0) + 1
+        
         return {
             'overall_sentiment': overall,
             'confidence': avg_confidence,
@@ -180,6 +323,7 @@ class FinBERTAnalyzer:
             'positive_percentage': positive_pct,
             'negative_percentage': negative_pct,
             'neutral_percentage': neutral_pct,
+            'tier_counts': tier_counts,
             'detailed_results': results
         }
 
@@ -202,10 +346,10 @@ def analyze_text(text: str, threshold: float = 0.5) -> List[Dict]:
     return analyzer.analyze_financial_sentiment(text, threshold)
 
 
-def analyze_news_batch(news_items: List[str], threshold: float = 0.5) -> Dict:
+def analyze_news_batch(news_items: List[str], threshold: float = 0.5, mode: str = 'cascade') -> Dict:
     """Analyze batch of news items and return aggregate"""
     analyzer = get_analyzer()
-    return analyzer.get_aggregate_sentiment(news_items, threshold)
+    return analyzer.get_aggregate_sentiment(news_items, threshold, mode=mode)
 
 
 def analyze_earnings_call(transcript: str, threshold: float = 0.5) -> Dict:
@@ -226,3 +226,49 @@ def compare_performance(
     return comparison.T
 
 
+def build_price_panel(
+    data: Dict[str, pd.DataFrame],
+    price_column: str = 'close'
+) -> pd.DataFrame:
+    """
+    Combine per-ticker price history into one wide panel.
+    
+    Args:
+        data: Mapping of ticker to DataFrame with 'date' and price columns
+              (as returned by DataFetcher.get_historical_data)
+        price_column: Column name for prices
+    
+    Returns:
+        DataFrame indexed by (naive, normalized) date with one column per ticker
+    """
+    series = {}
+    for ticker, df in data.items():
+        if df is None or df.empty or price_column not in df.columns:
+            continue
+        dates = pd.DatetimeIndex(pd.to_datetime(df['date'] if 'date' in df.columns else df.index))
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        s = pd.Series(df[price_column].to_numpy(), index=dates.normalize())
+        series[ticker] = s[~s.index.duplicated(keep='last')]
+    
+    if not series:
+        return pd.DataFrame()
+    return pd.DataFrame(series).sort_index()
+
+
+def calculate_returns_panel(prices: pd.DataFrame, log_returns: bool = False) -> pd.DataFrame:
+    """
+    Calculate daily returns for every column of a price panel.
+    
+    Args:
+        prices: Wide price panel (see build_price_panel)
+        log_returns: Return log returns instead of simple returns
+    
+    Returns:
+        DataFrame of returns (first row dropped)
+    """
+    if prices.empty:
+        return prices
+    if log_returns:
+        return np.log(prices / prices.shift(1)).iloc[1:]
+    return prices.pct_change(fill_method=None).iloc[1:]
@@ -0,0 +1,249 @@
+"""
+Fast lexicon-based sentiment scoring for batches of financial text.
+Uses Loughran-McDonald style word lists so thousands of headlines can be
+scored per call as a cheap first pass before FinBERT.
+"""
+import logging
+import threading
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from config.settings import SENTIMENT_LEXICON_PATH
+
+logger = logging.getLogger(__name__)
+
+# Compact built-in subset of the Loughran-McDonald categories most common in
+# headlines. Load the full master dictionary with load_lexicon() for coverage.
+POSITIVE_WORDS = {
+    'achieve', 'achieved', 'achievement', 'achievements', 'advance', 'advanced',
+    'advances', 'advancing', 'advantage', 'advantageous', 'attractive', 'beat',
+    'beats', 'benefit', 'benefited', 'benefits', 'best', 'better', 'boom',
+    'booming', 'boost', 'boosted', 'boosts', 'breakthrough', 'breakthroughs',
+    'bullish', 'confident', 'delighted', 'efficiencies', 'efficiency',
+    'efficient', 'enhance', 'enhanced', 'enhancement', 'enhances', 'excellent',
+    'exceed', 'exceeded', 'exceeding', 'exceeds', 'exceptional', 'favorable',
+    'gain', 'gained', 'gaining', 'gains', 'good', 'great', 'greater', 'growth',
+    'highest', 'impressive', 'improve', 'improved', 'improvement', 'improvements',
+    'improves', 'improving', 'innovative', 'jump', 'jumped', 'jumps', 'leadership',
+    'leading', 'opportunities', 'opportunity', 'optimistic', 'outpace',
+    'outperform', 'outperformed', 'outperforming', 'outperforms', 'pleased',
+    'positive', 'profitability', 'profitable', 'progress', 'rally', 'rallied',
+    'rallies', 'rebound', 'rebounded', 'rebounds', 'record', 'recover',
+    'recovered', 'recovery', 'resilient', 'rewarding', 'rise', 'rises', 'rising',
+    'robust', 'soar', 'soared', 'soaring', 'soars', 'solid', 'stable', 'strength',
+    'strengthen', 'strengthened', 'strengths', 'strong', 'stronger', 'strongest',
+    'succeed', 'succeeded', 'success', 'successes', 'successful', 'successfully',
+    'surge', 'surged', 'surges', 'surging', 'surpass', 'surpassed', 'surpasses',
+    'upgrade', 'upgraded', 'upgrades', 'upside', 'upturn', 'win', 'winning', 'wins'
+}
+
+NEGATIVE_WORDS = {
+    'abandon', 'abandoned', 'adverse', 'adversely', 'against', 'bankrupt',
+    'bankruptcy', 'bearish', 'breach', 'challenge', 'challenged', 'challenges',
+    'challenging', 'closure', 'closures', 'collapse', 'collapsed', 'concern',
+    'concerned', 'concerns', 'crash', 'crashed', 'crisis', 'cut', 'cuts',
+    'cutting', 'decline', 'declined', 'declines', 'declining', 'default',
+    'defaults', 'deficit', 'delay', 'delayed', 'delays', 'deteriorate',
+    'deteriorated', 'deterioration', 'difficult', 'difficulties', 'disappoint',
+    'disappointed', 'disappointing', 'disappoints', 'downgrade', 'downgraded',
+    'downgrades', 'downturn', 'drop', 'dropped', 'drops', 'erode', 'eroded',
+    'erosion', 'fail', 'failed', 'failure', 'failures', 'fall', 'fallen',
+    'falling', 'falls', 'fear', 'fears', 'fell', 'fined', 'fines',
+    'fraud', 'headwind', 'headwinds', 'impairment', 'impairments', 'investigation',
+    'lawsuit', 'lawsuits', 'layoff', 'layoffs', 'litigation', 'lose', 'loses',
+    'losing', 'loss', 'losses', 'lost', 'miss', 'missed', 'misses', 'negative',
+    'penalty', 'plunge', 'plunged', 'plunges', 'plunging', 'poor', 'probe',
+    'recall', 'recalls', 'recession', 'restructuring', 'scandal',
+    'selloff', 'shortfall', 'shortfalls', 'shrink', 'shrinking', 'sink', 'sinks',
+    'slow', 'slowdown', 'slowed', 'slowing', 'slump', 'slumped', 'slumps', 'sued',
+    'suspend', 'suspended', 'tumble', 'tumbled', 'tumbles', 'turmoil', 'unable',
+    'underperform', 'underperformed', 'unfavorable', 'warn', 'warned',
+    'warning', 'warnings', 'warns', 'weak', 'weaken', 'weakened', 'weaker',
+    'weakness', 'worse', 'worsen', 'worsened', 'worst', 'writedown', 'writedowns'
+}
+
+UNCERTAINTY_WORDS = {
+    'almost', 'anticipate', 'anticipated', 'appear', 'appears', 'approximately',
+    'assume', 'assumption', 'believe', 'believes', 'could', 'doubt', 'estimate',
+    'estimated', 'estimates', 'expect', 'expected', 'expects', 'fluctuate',
+    'fluctuations', 'likely', 'may', 'maybe', 'might', 'pending', 'perhaps',
+    'possible', 'possibly', 'predict', 'preliminary', 'probable', 'probably',
+    'risk', 'risks', 'roughly', 'rumor', 'rumors', 'seems', 'speculate', 'speculation',
+    'suggest', 'suggests', 'tentative', 'uncertain', 'uncertainties',
+    'uncertainty', 'unclear', 'unknown', 'unpredictable', 'variable', 'volatile',
+    'volatility'
+}
+
+# Loughran-McDonald negate positive words preceded by one of these within 3 words
+NEGATORS = {
+    'no', 'not', 'none', 'neither', 'never', 'nobody', "isn't", "wasn't",
+    "aren't", "weren't", "don't", "doesn't", "didn't", "won't", "can't",
+    'cannot', 'without', 'lack', 'lacks'
+}
+NEGATION_WINDOW = 3
+
+_TOKEN_PATTERN = r"[a-z]+(?:'[a-z]+)?"
+
+
+def load_lexicon(path: str) -> Dict[str, Set[str]]:
+    """
+    Load word lists from a Loughran-McDonald master dictionary CSV.
+    
+    A word belongs to a category when its column (Positive, Negative,
+    Uncertainty) is non-zero, as in the published dictionary.
+    
+    Args:
+        path: Path to the master dictionary CSV
+    
+    Returns:
+        Dict with 'positive', 'negative' and 'uncertainty' word sets
+    """
+    df = pd.read_csv(path, usecols=['Word', 'Positive', 'Negative', 'Uncertainty'])
+    words = df['Word'].astype(str).str.lower()
+    return {
+        category: set(words[df[category.capitalize()] != 0])
+        for category in ('positive', 'negative', 'uncertainty')
+    }
+
+
+class LexiconSentimentScorer:
+    """Vectorized word-list sentiment scorer with a single hashed lookup."""
+    
+    def __init__(
+        self,
+        lexicon: Optional[Dict[str, Set[str]]] = None,
+        neutral_band: float = 0.1
+    ):
+        """
+        Initialize the scorer.
+        
+        Args:
+            lexicon: Dict with 'positive', 'negative' and 'uncertainty' word sets
+                     (default: built-in word lists)
+            neutral_band: |polarity| at or below which a text is neutral
+        """
+        lexicon = lexicon or {
+            'positive': POSITIVE_WORDS,
+            'negative': NEGATIVE_WORDS,
+            'uncertainty': UNCERTAINTY_WORDS
+        }
+        self.neutral_band = neutral_band
+        
+        # One dict lookup per token: +1 positive, -1 negative, 0 uncertainty
+        self.weights: Dict[str, int] = {w: 0 for w in lexicon.get('uncertainty', ())}
+        self.weights.update({w: -1 for w in lexicon.get('negative', ())})
+        self.weights.update({w: 1 for w in lexicon.get('positive', ())})
+    
+    @classmethod
+    def from_csv(cls, path: str, **kwargs) -> 'LexiconSentimentScorer':
+        """Create a scorer from a Loughran-McDonald master dictionary CSV."""
+        return cls(load_lexicon(path), **kwargs)
+    
+    def score_texts(self, texts: List[str]) -> pd.DataFrame:
+        """
+        Score a batch of texts.
+        
+        Polarity is (positive - negative) / (positive + negative + 1), so one
+        sentiment word gives +/-0.5 and mixed texts move toward zero.
+        Subjectivity is the share of tokens found in any word list.
+        
+        Args:
+            texts: Texts to score
+        
+        Returns:
+            DataFrame (one row per text, same order) with polarity,
+            subjectivity, sentiment and hits (number of lexicon words)
+        """
+        n = len(texts)
+        if n == 0:
+            return pd.DataFrame(columns=['polarity', 'subjectivity', 'sentiment', 'hits'])
+        
+        tokens = (
+            pd.Series(texts, dtype=object).fillna('').astype(str)
+            .str.lower().str.findall(_TOKEN_PATTERN).explode().dropna()
+        )
+        doc = tokens.index.to_numpy()
+        weight = tokens.map(self.weights)
+        
+        # Flip positive words that follow a negator within the window
+        is_negator = tokens.isin(NEGATORS).to_numpy()
+        negated = np.zeros(len(tokens), dtype=bool)
+        for lag in range(1, NEGATION_WINDOW + 1):
+            negated[lag:] |= is_negator[:-lag] & (doc[lag:] == doc[:-lag])
+        signed = weight.fillna(0).to_numpy()
+        signed = np.where(negated & (signed > 0), -signed, signed)
+        
+        matched = weight.notna().to_numpy()
+        positive = np.bincount(doc, weights=signed > 0, minlength=n)
+        negative = np.bincount(doc, weights=signed < 0, minlength=n)
+        hits = np.bincount(doc, weights=matched, minlength=n)
+        token_counts = np.bincount(doc, minlength=n)
+        
+        polarity = (positive - negative) / (positive + negative + 1)
+        subjectivity = np.divide(hits, token_counts, out=np.zeros(n), where=token_counts > 0)
+        sentiment = np.select(
+            [polarity > self.neutral_band, polarity < -self.neutral_band],
+            ['positive', 'negative'],
+            default='neutral'
+        )
+        
+        return pd.DataFrame({
+            'polarity': polarity,
+            'subjectivity': subjectivity,
+            'sentiment': sentiment,
+            'hits': hits.astype(int)
+        })
+    
+    def analyze_news_batch(self, news_list: List[Dict]) -> pd.DataFrame:
+        """
+        Score a batch of news articles.
+        
+        Args:
+            news_list: List of dictionaries with 'title' and optional 'description'
+        
+        Returns:
+            DataFrame with the same columns as sentiment_analyzer.analyze_news_batch
+        """
+        if not news_list:
+            return pd.DataFrame()
+        
+        news = pd.DataFrame(news_list)
+        for col in ('title', 'description', 'source', 'url', 'publishedAt'):
+            if col not in news.columns:
+                news[col] = ''
+        news = news.fillna('')
+        
+        scores = self.score_texts((news['title'] + '. ' + news['description']).tolist())
+        
+        return pd.DataFrame({
+            'title': news['title'],
+            'description': news['description'],
+            'polarity': scores['polarity'],
+            'subjectivity': scores['subjectivity'],
+            'sentiment': scores['sentiment'],
+            'source': news['source'],
+            'url': news['url'],
+            'publish_date': news['publishedAt']
+        })
+
+
+# Global instance
+_scorer = None
+_scorer_lock = threading.Lock()
+
+def get_lexicon_scorer() -> LexiconSentimentScorer:
+    """Get or create global lexicon scorer (full dictionary if configured)."""
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            if SENTIMENT_LEXICON_PATH:
+                try:
+                    _scorer = LexiconSentimentScorer.from_csv(SENTIMENT_LEXICON_PATH)
+                    logger.info(f"Loaded sentiment lexicon from {SENTIMENT_LEXICON_PATH}")
+                except Exception as e:
+                    logger.error(f"Could not load sentiment lexicon, using built-in lists: {e}")
+            if _scorer is None:
+                _scorer = LexiconSentimentScorer()
+    return _scorer
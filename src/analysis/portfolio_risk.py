@@ -0,0 +1,334 @@
+"""
+Portfolio equity curve and risk analysis.
+Combines ledger transactions with price panels into daily holdings, a daily
+equity curve and time-weighted returns, then computes volatility, drawdown,
+beta, covariance-based VaR/CVaR and each position's contribution to risk.
+"""
+import logging
+from statistics import NormalDist
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.historical_analysis import (
+    build_price_panel, calculate_returns_panel, calculate_performance_metrics
+)
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+BENCHMARK = '^GSPC'
+
+
+def holdings_panel(
+    transactions: pd.DataFrame,
+    dates: pd.DatetimeIndex,
+    split_adjusted: bool = True
+) -> pd.DataFrame:
+    """
+    Shares held per ticker at the close of each date.
+    
+    Args:
+        transactions: Ledger rows with ticker, txn_type, trade_date, quantity
+                      (see TransactionLedger.get_transactions)
+        dates: Trading dates to report
+        split_adjusted: Express shares in today's split basis, matching
+                        split-adjusted price history (yfinance/Polygon default).
+                        Otherwise shares follow the raw share count.
+    
+    Returns:
+        DataFrame (dates x tickers) of share counts
+    """
+    trades = transactions[transactions['txn_type'].isin(['BUY', 'SELL', 'SPLIT'])]
+    if trades.empty:
+        return pd.DataFrame(index=dates)
+    
+    trades = trades.assign(trade_date=pd.to_datetime(trades['trade_date']).dt.normalize())
+    trades = trades.sort_values('trade_date', kind='stable')
+    is_split = (trades['txn_type'] == 'SPLIT').to_numpy()
+    sign = np.where(trades['txn_type'] == 'SELL', -1.0, 1.0)
+    delta = np.where(is_split, 0.0, trades['quantity'].to_numpy() * sign)
+    ratio = np.where(is_split, trades['quantity'].to_numpy(), 1.0)
+    
+    # Cumulative split factor per ticker, in trade order (splits apply to
+    # shares bought before them)
+    frame = pd.DataFrame({
+        'ticker': trades['ticker'].to_numpy(),
+        'date': trades['trade_date'].to_numpy(),
+        'delta': delta,
+        'ratio': ratio
+    })
+    frame['factor'] = frame.groupby('ticker')['ratio'].cumprod()
+    
+    if split_adjusted:
+        # Scale every trade by the splits after it: total factor / factor at trade
+        total = frame.groupby('ticker')['factor'].transform('last')
+        frame['scaled'] = frame['delta'] * total / frame['factor']
+        daily = frame.pivot_table(index='date', columns='ticker', values='scaled', aggfunc='sum')
+        shares = daily.reindex(daily.index.union(dates)).fillna(0.0).cumsum()
+    else:
+        # Raw count: shares(t) = factor(t) * cumsum(delta / factor at trade)
+        frame['scaled'] = frame['delta'] / frame['factor']
+        daily = frame.pivot_table(index='date', columns='ticker', values='scaled', aggfunc='sum')
+        factor = frame.pivot_table(index='date', columns='ticker', values='factor', aggfunc='last')
+        index = daily.index.union(dates)
+        factor = factor.reindex(index).ffill().fillna(1.0)
+        shares = daily.reindex(index).fillna(0.0).cumsum() * factor
+    
+    return shares.reindex(dates, method='ffill').fillna(0.0)
+
+
+def equity_curve(shares: pd.DataFrame, prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Daily market value and time-weighted returns.
+    
+    Returns use the previous close's holdings, so buys and sells change the
+    market value without counting as gains or losses.
+    
+    Args:
+        shares: Holdings panel (see holdings_panel)
+        prices: Price panel on the same dates
+    
+    Returns:
+        DataFrame with market_value, daily_return and equity (growth of 1.0)
+    """
+    prices = prices.reindex(index=shares.index, columns=shares.columns).ffill()
+    held = shares.to_numpy()
+    px = prices.to_numpy()
+    
+    values = np.nan_to_num(held * px)
+    market_value = values.sum(axis=1)
+    
+    # Yesterday's shares at today's and yesterday's prices
+    start_value = np.nan_to_num(held[:-1] * px[:-1]).sum(axis=1)
+    end_value = np.nan_to_num(held[:-1] * px[1:]).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily = np.where(start_value > 0, end_value / start_value - 1.0, np.nan)
+    daily_return = np.concatenate([[np.nan], daily])
+    
+    equity = np.cumprod(1.0 + np.nan_to_num(daily_return))
+    return pd.DataFrame({
+        'market_value': market_value,
+        'daily_return': daily_return,
+        'equity': equity
+    }, index=shares.index)
+
+
+def drawdown_series(equity: pd.Series) -> pd.Series:
+    """
+    Percentage drawdown from the running peak.
+    
+    Args:
+        equity: Equity curve
+    
+    Returns:
+        Series of drawdowns (<= 0) in percent
+    """
+    values = equity.to_numpy()
+    running_max = np.maximum.accumulate(values)
+    return pd.Series((values - running_max) / running_max * 100, index=equity.index)
+
+
+def calculate_beta(portfolio_returns: pd.Series, benchmark_returns: pd.Series) -> Dict:
+    """
+    Beta, correlation and annualized alpha against a benchmark.
+    
+    Args:
+        portfolio_returns: Daily portfolio returns
+        benchmark_returns: Daily benchmark returns
+    
+    Returns:
+        Dict with beta, correlation, alpha (annualized, %) and observations
+    """
+    joined = pd.concat([portfolio_returns, benchmark_returns], axis=1, join='inner').dropna()
+    if len(joined) < 2:
+        return {'beta': np.nan, 'correlation': np.nan, 'alpha': np.nan, 'observations': len(joined)}
+    
+    p, b = joined.iloc[:, 0].to_numpy(), joined.iloc[:, 1].to_numpy()
+    cov = np.cov(p, b)
+    beta = cov[0, 1] / cov[1, 1] if cov[1, 1] > 0 else np.nan
+    return {
+        'beta': beta,
+        'correlation': cov[0, 1] / np.sqrt(cov[0, 0] * cov[1, 1]) if cov[0, 0] * cov[1, 1] > 0 else np.nan,
+        'alpha': (p.mean() - beta * b.mean()) * TRADING_DAYS * 100,
+        'observations': len(joined)
+    }
+
+
+def risk_contributions(weights: pd.Series, returns: pd.DataFrame) -> pd.DataFrame:
+    """
+    Decompose portfolio volatility into per-position contributions.
+    
+    Args:
+        weights: Current position weights (sum to 1)
+        returns: Daily returns of the positions
+    
+    Returns:
+        DataFrame per ticker with weight, marginal_contribution,
+        component_contribution (annualized volatility, sums to portfolio
+        volatility) and pct_contribution
+    """
+    tickers = weights.index
+    cov = returns[tickers].cov().to_numpy() * TRADING_DAYS
+    w = weights.to_numpy()
+    cov_w = np.nan_to_num(cov) @ w
+    volatility = float(np.sqrt(w @ cov_w))
+    
+    marginal = cov_w / volatility if volatility > 0 else np.zeros_like(w)
+    component = w * marginal
+    return pd.DataFrame({
+        'weight': w,
+        'marginal_contribution': marginal,
+        'component_contribution': component,
+        'pct_contribution': component / volatility * 100 if volatility > 0 else np.zeros_like(w)
+    }, index=tickers).sort_values('component_contribution', ascending=False)
+
+
+def value_at_risk(
+    weights: pd.Series,
+    returns: pd.DataFrame,
+    portfolio_value: float,
+    confidence: float = 0.95,
+    horizon_days: int = 1
+) -> Dict:
+    """
+    Covariance (variance-covariance, normal) and historical VaR/CVaR.
+    
+    Args:
+        weights: Current position weights
+        returns: Daily returns of the positions
+        portfolio_value: Current market value
+        confidence: Confidence level (e.g. 0.95)
+        horizon_days: Horizon in trading days (square-root-of-time scaling)
+    
+    Returns:
+        Dict with parametric and historical VaR and CVaR, as positive losses
+        in currency and percent of portfolio value
+    """
+    tickers = weights.index
+    w = weights.to_numpy()
+    window = returns[tickers].dropna(how='all').fillna(0.0)
+    
+    mean = window.mean().to_numpy() @ w * horizon_days
+    sigma = float(np.sqrt(w @ window.cov().to_numpy() @ w * horizon_days))
+    normal = NormalDist()
+    z = normal.inv_cdf(confidence)
+    var_pct = max(0.0, z * sigma - mean)
+    cvar_pct = max(0.0, sigma * normal.pdf(z) / (1 - confidence) - mean)
+    
+    # Historical simulation on today's weights
+    simulated = window.to_numpy() @ w
+    if horizon_days > 1:
+        simulated = simulated * np.sqrt(horizon_days)
+    cutoff = np.quantile(simulated, 1 - confidence) if len(simulated) else np.nan
+    tail = simulated[simulated <= cutoff]
+    hist_var = max(0.0, -cutoff) if len(simulated) else np.nan
+    hist_cvar = max(0.0, -tail.mean()) if len(tail) else np.nan
+    
+    return {
+        'confidence': confidence,
+        'horizon_days': horizon_days,
+        'var': var_pct * portfolio_value,
+        'var_pct': var_pct * 100,
+        'cvar': cvar_pct * portfolio_value,
+        'cvar_pct': cvar_pct * 100,
+        'historical_var': hist_var * portfolio_value,
+        'historical_var_pct': hist_var * 100,
+        'historical_cvar': hist_cvar * portfolio_value,
+        'historical_cvar_pct': hist_cvar * 100
+    }
+
+
+def run_portfolio_risk(
+    transactions: pd.DataFrame,
+    price_data: Dict[str, pd.DataFrame],
+    benchmark_data: Optional[pd.DataFrame] = None,
+    confidence: float = 0.95,
+    horizon_days: int = 1,
+    lookback_days: int = TRADING_DAYS,
+    split_adjusted: bool = True
+) -> Dict:
+    """
+    Build the equity curve and risk metrics for a portfolio.
+    
+    Args:
+        transactions: Ledger transactions (see TransactionLedger.get_transactions)
+        price_data: Mapping of ticker to price history
+        benchmark_data: Benchmark price history (e.g. ^GSPC)
+        confidence: VaR/CVaR confidence level
+        horizon_days: VaR horizon in trading days
+        lookback_days: Return window for covariance, VaR and contributions
+        split_adjusted: Whether price_data is split-adjusted
+    
+    Returns:
+        Dict with 'equity_curve', 'drawdown', 'metrics', 'beta', 'var',
+        'contributions' and 'holdings'
+    """
+    prices = build_price_panel(price_data)
+    if prices.empty or transactions.empty:
+        return {}
+    
+    first_trade = pd.to_datetime(transactions['trade_date']).min().normalize()
+    prices = prices[prices.index >= first_trade]
+    shares = holdings_panel(transactions, prices.index, split_adjusted)
+    if shares.empty or not len(shares.columns):
+        return {}
+    
+    curve = equity_curve(shares, prices)
+    returns = calculate_returns_panel(prices)
+    
+    # Reuse the single-series metrics on the time-weighted equity index
+    metrics_frame = pd.DataFrame({'date': curve.index, 'equity': curve['equity'].to_numpy()})
+    metrics = calculate_performance_metrics(metrics_frame, price_column='equity')
+    metrics['market_value'] = float(curve['market_value'].iloc[-1])
+    
+    # Current weights from the last close
+    last_values = shares.iloc[-1] * prices.reindex(columns=shares.columns).ffill().iloc[-1]
+    last_values = last_values[last_values.abs() > 0].dropna()
+    result = {
+        'equity_curve': curve,
+        'drawdown': drawdown_series(curve['equity']),
+        'metrics': metrics,
+        'holdings': shares,
+        'beta': {},
+        'var': {},
+        'contributions': pd.DataFrame()
+    }
+    
+    if benchmark_data is not None and not benchmark_data.empty:
+        benchmark = calculate_returns_panel(build_price_panel({BENCHMARK: benchmark_data}))[BENCHMARK]
+        result['beta'] = calculate_beta(curve['daily_return'], benchmark)
+    
+    if not last_values.empty and last_values.sum() > 0:
+        weights = last_values / last_values.sum()
+        window = returns[weights.index].tail(lookback_days)
+        result['var'] = value_at_risk(weights, window, metrics['market_value'], confidence, horizon_days)
+        result['contributions'] = risk_contributions(weights, window)
+    
+    return result
+
+
+def load_portfolio_risk(portfolio_id: int, period: str = "2y", **kwargs) -> Dict:
+    """
+    Run run_portfolio_risk for a stored portfolio using cached price history.
+    
+    Args:
+        portfolio_id: Portfolio ID in the transaction ledger
+        period: History period to load per ticker (yfinance period string)
+        **kwargs: Passed to run_portfolio_risk
+    
+    Returns:
+        See run_portfolio_risk
+    """
+    from src.analysis.transaction_ledger import get_transaction_ledger
+    from src.api import cached_data
+    
+    transactions = get_transaction_ledger().get_transactions(portfolio_id)
+    if transactions.empty:
+        return {}
+    
+    tickers = sorted(transactions['ticker'].unique())
+    price_data = {ticker: cached_data.get_historical_data(ticker, period=period) for ticker in tickers}
+    benchmark = cached_data.get_historical_data(BENCHMARK, period=period)
+    return run_portfolio_risk(transactions, price_data, benchmark, **kwargs)
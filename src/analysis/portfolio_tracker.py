@@ -1,6 +1,7 @@
 """
 Portfolio tracking and performance analysis.
 """
+import numpy as np
 import pandas as pd
 from typing import Dict, List
 import logging
@@ -9,11 +10,71 @@ logger = logging.getLogger(__name__)
 
 
 class PortfolioTracker:
-    """Tracks and analyzes portfolio performance."""
+    """
+    Tracks and analyzes portfolio performance.
+    
+    Holdings live in parallel NumPy arrays (quantity, purchase price, current
+    price) with a ticker -> row index map, so a whole book is revalued in one
+    vectorized operation and portfolio totals are kept up to date incrementally.
+    """
     
-    def __init__(self):
-        """Initialize portfolio tracker."""
-        self.holdings = {}
+    def __init__(self, capacity: int = 64):
+        """
+        Initialize portfolio tracker.
+        
+        Args:
+            capacity: Initial number of rows allocated (grows as needed)
+        """
+        self._tickers: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._quantity = np.zeros(capacity)
+        self._purchase_price = np.zeros(capacity)
+        self._current_price = np.zeros(capacity)
+        self._size = 0
+        
+        # Running totals and a version counter for cached views
+        self._total_cost = 0.0
+        self._total_value = 0.0
+        self._version = 0
+        self._allocation_cache = None
+    
+    @property
+    def tickers(self) -> List[str]:
+        """Tickers in row order (the order update_prices expects)."""
+        return list(self._tickers)
+    
+    @property
+    def holdings(self) -> Dict[str, Dict]:
+        """Holdings as a dict of dicts keyed by ticker."""
+        return {ticker: self._holding(i) for i, ticker in enumerate(self._tickers)}
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _grow(self):
+        """Double the array capacity."""
+        capacity = max(1, len(self._quantity)) * 2
+        for name in ('_quantity', '_purchase_price', '_current_price'):
+            array = getattr(self, name)
+            grown = np.zeros(capacity)
+            grown[:self._size] = array[:self._size]
+            setattr(self, name, grown)
+    
+    def _holding(self, i: int) -> Dict:
+        """Derived fields for one row."""
+        quantity = float(self._quantity[i])
+        purchase_price = float(self._purchase_price[i])
+        current_price = float(self._current_price[i])
+        return {
+            'ticker': self._tickers[i],
+            'quantity': quantity,
+            'purchase_price': purchase_price,
+            'current_price': current_price,
+            'cost_basis': quantity * purchase_price,
+            'current_value': quantity * current_price,
+            'unrealized_gain_loss': (current_price - purchase_price) * quantity,
+            'unrealized_gain_loss_pct': ((current_price - purchase_price) / purchase_price) * 100
+        }
     
     def add_holding(
         self,
@@ -34,18 +95,26 @@ class PortfolioTracker:
         Returns:
             Dictionary with holding details
         """
-        self.holdings[ticker] = {
-            'ticker': ticker,
-            'quantity': quantity,
-            'purchase_price': purchase_price,
-            'current_price': current_price,
-            'cost_basis': quantity * purchase_price,
-            'current_value': quantity * current_price,
-            'unrealized_gain_loss': (current_price - purchase_price) * quantity,
-            'unrealized_gain_loss_pct': ((current_price - purchase_price) / purchase_price) * 100
-        }
+        i = self._index.get(ticker)
+        if i is None:
+            if self._size == len(self._quantity):
+                self._grow()
+            i = self._size
+            self._index[ticker] = i
+            self._tickers.append(ticker)
+            self._size += 1
+        else:
+            self._total_cost -= self._quantity[i] * self._purchase_price[i]
+            self._total_value -= self._quantity[i] * self._current_price[i]
         
-        return self.holdings[ticker]
+        self._quantity[i] = quantity
+        self._purchase_price[i] = purchase_price
+        self._current_price[i] = current_price
+        self._total_cost += quantity * purchase_price
+        self._total_value += quantity * current_price
+        self._version += 1
+        
+        return self._holding(i)
     
     def remove_holding(self, ticker: str) -> bool:
         """
@@ -57,10 +126,78 @@ class PortfolioTracker:
         Returns:
             True if removed, False if not found
         """
-        if ticker in self.holdings:
-            del self.holdings[ticker]
-            return True
-        return False
+        i = self._index.pop(ticker, None)
+        if i is None:
+            return False
+        
+        self._total_cost -= self._quantity[i] * self._purchase_price[i]
+        self._total_value -= self._quantity[i] * self._current_price[i]
+        
+        # Move the last row into the gap so the arrays stay dense
+        last = self._size - 1
+        if i != last:
+            moved = self._tickers[last]
+            self._tickers[i] = moved
+            self._index[moved] = i
+            for array in (self._quantity, self._purchase_price, self._current_price):
+                array[i] = array[last]
+        self._tickers.pop()
+        self._size -= 1
+        self._version += 1
+        
+        if not self._size:
+            self._total_cost = self._total_value = 0.0  # Drop accumulated rounding error
+        return True
+    
+    def update_price(self, ticker: str, price: float) -> bool:
+        """
+        Update the current price of one holding.
+        
+        Args:
+            ticker: Stock ticker symbol
+            price: New market price
+            
+        Returns:
+            True if updated, False if the ticker is not held
+        """
+        i = self._index.get(ticker)
+        if i is None:
+            return False
+        self._total_value += self._quantity[i] * (price - self._current_price[i])
+        self._current_price[i] = price
+        self._version += 1
+        return True
+    
+    def update_prices(self, prices) -> int:
+        """
+        Revalue all holdings at once.
+        
+        Args:
+            prices: Array of prices in `tickers` order, or a dict/Series of
+                    ticker -> price (unknown tickers ignored, missing ones kept)
+            
+        Returns:
+            Number of holdings repriced
+        """
+        n = self._size
+        if isinstance(prices, (dict, pd.Series)):
+            items = prices.items()
+            rows = np.fromiter((self._index.get(t, -1) for t, _ in items), dtype=np.int64)
+            values = np.fromiter((p for _, p in prices.items()), dtype=np.float64)
+            known = rows >= 0
+            rows, values = rows[known], values[known]
+            self._current_price[rows] = values
+            updated = len(rows)
+        else:
+            values = np.asarray(prices, dtype=np.float64)
+            if values.shape != (n,):
+                raise ValueError(f"Expected {n} prices in tickers order, got shape {values.shape}")
+            self._current_price[:n] = values
+            updated = n
+        
+        self._total_value = float(self._quantity[:n] @ self._current_price[:n])
+        self._version += 1
+        return updated
     
     def get_portfolio_summary(self) -> Dict:
         """
@@ -69,7 +206,7 @@ class PortfolioTracker:
         Returns:
             Dictionary with portfolio summary
         """
-        if not self.holdings:
+        if not self._size:
             return {
                 'total_value': 0,
                 'total_cost': 0,
@@ -78,8 +215,8 @@ class PortfolioTracker:
                 'num_holdings': 0
             }
         
-        total_value = sum(h['current_value'] for h in self.holdings.values())
-        total_cost = sum(h['cost_basis'] for h in self.holdings.values())
+        total_value = float(self._total_value)
+        total_cost = float(self._total_cost)
         total_gain_loss = total_value - total_cost
         total_gain_loss_pct = (total_gain_loss / total_cost) * 100 if total_cost > 0 else 0
         
@@ -88,7 +225,7 @@ class PortfolioTracker:
             'total_cost': total_cost,
             'total_gain_loss': total_gain_loss,
             'total_gain_loss_pct': total_gain_loss_pct,
-            'num_holdings': len(self.holdings)
+            'num_holdings': self._size
         }
     
     def get_holdings_dataframe(self) -> pd.DataFrame:
@@ -98,29 +235,50 @@ class PortfolioTracker:
         Returns:
             DataFrame with all holdings
         """
-        if not self.holdings:
+        if not self._size:
             return pd.DataFrame()
         
-        return pd.DataFrame(list(self.holdings.values()))
+        n = self._size
+        quantity = self._quantity[:n]
+        purchase_price = self._purchase_price[:n]
+        current_price = self._current_price[:n]
+        
+        return pd.DataFrame({
+            'ticker': self._tickers,
+            'quantity': quantity,
+            'purchase_price': purchase_price,
+            'current_price': current_price,
+            'cost_basis': quantity * purchase_price,
+            'current_value': quantity * current_price,
+            'unrealized_gain_loss': (current_price - purchase_price) * quantity,
+            'unrealized_gain_loss_pct': ((current_price - purchase_price) / purchase_price) * 100
+        })
     
     def get_allocation(self) -> pd.DataFrame:
         """
         Calculate portfolio allocation by value.
         
+        The result is cached until holdings or prices change.
+        
         Returns:
             DataFrame with allocation percentages
         """
-        if not self.holdings:
+        if not self._size:
             return pd.DataFrame()
         
-        df = self.get_holdings_dataframe()
-        total_value = df['current_value'].sum()
-        
-        df['allocation_pct'] = (df['current_value'] / total_value) * 100
+        cached = self._allocation_cache
+        if cached is None or cached[0] != self._version:
+            n = self._size
+            values = self._quantity[:n] * self._current_price[:n]
+            order = np.argsort(-values, kind='stable')
+            allocation = pd.DataFrame({
+                'ticker': np.asarray(self._tickers, dtype=object)[order],
+                'current_value': values[order],
+                'allocation_pct': values[order] / values.sum() * 100
+            }, index=order)
+            cached = self._allocation_cache = (self._version, allocation)
         
-        return df[['ticker', 'current_value', 'allocation_pct']].sort_values(
-            'allocation_pct', ascending=False
-        )
+        return cached[1].copy()
 
 
 def calculate_portfolio_metrics(
@@ -0,0 +1,532 @@
+"""
+Universe screener over a precomputed factor table.
+A nightly build computes returns over DATE_RANGES, volatility, RSI, distance
+from moving averages, news sentiment, market cap and sector for every ticker
+in the universe and stores one row per ticker in ScreenerFactors. Queries run
+against an in-memory columnar snapshot with presorted per-column indexes.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.backtester import FeaturePanel
+from src.utils.database import Database
+from config.settings import (
+    DATABASE_PATH, DATE_RANGES, SCREENER_UNIVERSE_PATH, SCREENER_HISTORY_PERIOD,
+    SCREENER_BATCH_SIZE, SCREENER_FETCH_WORKERS, SCREENER_SENTIMENT_DAYS, SCREENER_RELOAD_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+TEXT_COLUMNS = ['ticker', 'company_name', 'sector', 'industry']
+RETURN_COLUMNS = [f"return_{name.lower()}" for name in DATE_RANGES]
+NUMERIC_COLUMNS = ['market_cap', 'price', 'volume'] + RETURN_COLUMNS + [
+    'volatility_20d', 'volatility_1y', 'rsi', 'dist_ma_20', 'dist_ma_50', 'dist_ma_200',
+    'sentiment', 'sentiment_articles'
+]
+FACTOR_COLUMNS = TEXT_COLUMNS + ['as_of'] + NUMERIC_COLUMNS
+
+NUMERIC_OPS = ('>', '>=', '<', '<=', '==', '!=', 'between')
+TEXT_OPS = ('==', '!=', 'in', 'not in')
+
+# (column, operator, value); 'between' takes (low, high), 'in' takes a list
+Filter = Tuple[str, str, Any]
+
+
+def compute_factors(data: Dict[str, pd.DataFrame], as_of: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Compute price-based factors for a batch of tickers.
+    
+    Args:
+        data: Mapping of ticker to price history (DataFetcher.get_historical_data)
+        as_of: Reference date for return windows (None = latest date in data)
+    
+    Returns:
+        DataFrame indexed by ticker with as_of, price, volume, return_* (%),
+        volatility_20d/1y (annualized %), rsi and dist_ma_* (%)
+    """
+    panel = FeaturePanel.from_price_data(
+        data, features=['close', 'volume', 'rsi', 'ma_20', 'ma_50', 'ma_200', 'volatility_annualized']
+    )
+    close = panel.close
+    if as_of is not None:
+        close = close[close.index <= pd.Timestamp(as_of)]
+    filled = close.ffill()
+    dates = close.index
+    end = pd.Timestamp(as_of) if as_of is not None else dates[-1]
+    
+    def last(name: str) -> pd.Series:
+        return panel[name].reindex(dates).ffill().iloc[-1]
+    
+    price = filled.iloc[-1]
+    factors = pd.DataFrame(index=close.columns)
+    factors['as_of'] = close.apply(pd.Series.last_valid_index).dt.strftime('%Y-%m-%d')
+    factors['price'] = price
+    factors['volume'] = last('volume')
+    
+    for name, days in DATE_RANGES.items():
+        if days == 'max':
+            start = close.bfill().iloc[0]
+        else:
+            # Last close on or before the window start (prior year-end for YTD)
+            start_date = pd.Timestamp(end.year - 1, 12, 31) if days == 'ytd' else end - pd.Timedelta(days=days)
+            pos = dates.searchsorted(start_date, side='right') - 1
+            start = filled.iloc[pos] if pos >= 0 else pd.Series(np.nan, index=close.columns)
+        factors[f"return_{name.lower()}"] = (price / start - 1) * 100
+    
+    returns = close.pct_change(fill_method=None).iloc[-252:]
+    factors['volatility_20d'] = last('volatility_annualized') * 100
+    factors['volatility_1y'] = returns.std() * np.sqrt(252) * 100
+    factors['rsi'] = last('rsi')
+    for window in (20, 50, 200):
+        factors[f'dist_ma_{window}'] = (price / last(f'ma_{window}') - 1) * 100
+    
+    factors = factors.replace([np.inf, -np.inf], np.nan)
+    return factors[factors['price'].notna()]
+
+
+def screener_universe(db: Optional[Database] = None) -> List[str]:
+    """
+    Tickers to screen: the optional universe file, known companies and
+    every watchlist symbol, de-duplicated in order.
+    
+    Args:
+        db: Connected database (for the Companies table)
+    
+    Returns:
+        List of ticker symbols
+    """
+    from src.api.cache_warmer import watchlist_symbols
+    
+    tickers = []
+    if SCREENER_UNIVERSE_PATH and os.path.exists(SCREENER_UNIVERSE_PATH):
+        with open(SCREENER_UNIVERSE_PATH) as f:
+            for line in f:
+                symbol = line.split(',')[0].strip().upper()
+                if symbol and not symbol.startswith('#') and symbol != 'TICKER':
+                    tickers.append(symbol)
+    if db is not None:
+        tickers.extend(row[0] for row in db.conn.execute("SELECT ticker FROM Companies ORDER BY ticker"))
+    tickers.extend(watchlist_symbols())
+    return list(dict.fromkeys(tickers))
+
+
+class FactorSnapshot:
+    """Immutable columnar copy of the factor table with presorted indexes."""
+    
+    def __init__(self, frame: pd.DataFrame, version: Tuple = ()):
+        """
+        Build column arrays and indexes.
+        
+        Args:
+            frame: ScreenerFactors rows
+            version: Identifies the table state the snapshot was built from
+        """
+        self.version = version
+        self.size = len(frame)
+        self.columns = [c for c in FACTOR_COLUMNS if c in frame.columns]
+        
+        # Text columns: integer codes plus the categories they index
+        self.text: Dict[str, Tuple[np.ndarray, pd.Index]] = {}
+        self.values: Dict[str, np.ndarray] = {}
+        for column in self.columns:
+            if column in NUMERIC_COLUMNS:
+                self.values[column] = pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype=float)
+            else:
+                codes, categories = pd.factorize(frame[column], use_na_sentinel=True)
+                self.text[column] = (codes, categories)
+                self.values[column] = frame[column].to_numpy(dtype=object)
+        
+        # Numeric columns: ascending row order (NaN last) and the sorted values
+        self.order: Dict[str, np.ndarray] = {}
+        self.sorted: Dict[str, np.ndarray] = {}
+        self.valid: Dict[str, int] = {}
+        for column in self.columns:
+            if column in NUMERIC_COLUMNS:
+                order = np.argsort(self.values[column], kind='stable')
+                self.order[column] = order
+                self.sorted[column] = self.values[column][order]
+                self.valid[column] = int(np.count_nonzero(~np.isnan(self.values[column])))
+    
+    def _range_rows(self, column: str, low: float, high: float,
+                    low_inclusive: bool = True, high_inclusive: bool = True) -> np.ndarray:
+        """Row numbers with low <(=) value <(=) high, found by binary search."""
+        n = self.valid[column]
+        values = self.sorted[column][:n]
+        lo = 0 if low is None else np.searchsorted(values, low, side='left' if low_inclusive else 'right')
+        hi = n if high is None else np.searchsorted(values, high, side='right' if high_inclusive else 'left')
+        return self.order[column][lo:max(lo, hi)]
+    
+    def mask(self, filters: Sequence[Filter]) -> np.ndarray:
+        """
+        Evaluate filters (AND-ed) into a boolean row mask.
+        
+        Args:
+            filters: (column, operator, value) triples
+        
+        Returns:
+            Boolean array, True for matching rows
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for column, op, value in filters:
+            if column not in self.values:
+                raise ValueError(f"Unknown screener column '{column}'")
+            
+            if column in self.text:
+                if op not in TEXT_OPS:
+                    raise ValueError(f"Operator '{op}' not supported for '{column}' (use {', '.join(TEXT_OPS)})")
+                codes, categories = self.text[column]
+                wanted = [value] if op in ('==', '!=') else list(value)
+                match = np.isin(codes, categories.get_indexer(wanted))
+                mask &= ~match if op in ('!=', 'not in') else match
+                continue
+            
+            if op not in NUMERIC_OPS:
+                raise ValueError(f"Operator '{op}' not supported for '{column}' (use {', '.join(NUMERIC_OPS)})")
+            if op == 'between':
+                rows = self._range_rows(column, value[0], value[1])
+            elif op == '>':
+                rows = self._range_rows(column, value, None, low_inclusive=False)
+            elif op == '>=':
+                rows = self._range_rows(column, value, None)
+            elif op == '<':
+                rows = self._range_rows(column, None, value, high_inclusive=False)
+            elif op == '<=':
+                rows = self._range_rows(column, None, value)
+            else:
+                rows = self._range_rows(column, value, value)
+            
+            selected = np.zeros(self.size, dtype=bool)
+            selected[rows] = True
+            if op == '!=':
+                selected = ~selected & ~np.isnan(self.values[column])
+            mask &= selected
+        return mask
+    
+    def sorted_rows(self, column: str, ascending: bool = False) -> np.ndarray:
+        """All row numbers ordered by column (NaN last in either direction)."""
+        if column in self.order:
+            n = self.valid[column]
+            order = self.order[column]
+            return order if ascending else np.concatenate([order[:n][::-1], order[n:]])
+        if column in self.text:
+            codes, categories = self.text[column]
+            n = len(categories)
+            # Alphabetical rank per category; the NA code (-1) maps to rank n
+            ranks = np.full(n + 1, n, dtype=np.int64)
+            ranks[np.argsort(categories.astype(str), kind='stable')] = np.arange(n)
+            keys = ranks[codes]
+            if not ascending:
+                keys = np.where(codes >= 0, n - 1 - keys, n)
+            return np.argsort(keys, kind='stable')
+        raise ValueError(f"Unknown screener column '{column}'")
+    
+    def select(self, rows: np.ndarray, columns: Sequence[str]) -> pd.DataFrame:
+        """Materialize rows as a DataFrame."""
+        return pd.DataFrame({column: self.values[column][rows] for column in columns})
+
+
+class ScreenQuery:
+    """
+    Composable screen: filters, sort and top-k. Each call returns a new
+    query, so a base query can be shared and refined.
+    
+    Example:
+        get_screener().query().where('sector', '==', 'Technology') \\
+            .where('return_3m', '>', 10).sort('rsi', ascending=True).top(20).run()
+    """
+    
+    def __init__(
+        self,
+        screener: 'Screener',
+        filters: Tuple[Filter, ...] = (),
+        sort_by: Optional[str] = None,
+        ascending: bool = False,
+        limit: Optional[int] = None,
+        columns: Optional[Tuple[str, ...]] = None
+    ):
+        self.screener = screener
+        self.filters = filters
+        self.sort_by = sort_by
+        self.ascending = ascending
+        self.limit = limit
+        self.columns = columns
+    
+    def _replace(self, **changes) -> 'ScreenQuery':
+        fields = dict(filters=self.filters, sort_by=self.sort_by, ascending=self.ascending,
+                      limit=self.limit, columns=self.columns)
+        fields.update(changes)
+        return ScreenQuery(self.screener, **fields)
+    
+    def where(self, column: str, op: str, value: Any) -> 'ScreenQuery':
+        """Add a filter (all filters must match)."""
+        return self._replace(filters=self.filters + ((column, op, value),))
+    
+    def sort(self, column: str, ascending: bool = False) -> 'ScreenQuery':
+        """Sort results by column (descending by default)."""
+        return self._replace(sort_by=column, ascending=ascending)
+    
+    def top(self, k: int) -> 'ScreenQuery':
+        """Keep the first k results."""
+        return self._replace(limit=k)
+    
+    def select(self, *columns: str) -> 'ScreenQuery':
+        """Restrict the returned columns (ticker is always included)."""
+        return self._replace(columns=columns)
+    
+    def run(self) -> pd.DataFrame:
+        """Execute the query against the current snapshot."""
+        return self.screener.screen(
+            filters=list(self.filters), sort_by=self.sort_by, ascending=self.ascending,
+            limit=self.limit, columns=list(self.columns) if self.columns else None
+        )
+
+
+class Screener:
+    """Builds the nightly factor table and answers screens from memory."""
+    
+    def __init__(self, db_path: str = DATABASE_PATH):
+        """
+        Initialize the screener.
+        
+        Args:
+            db_path: SQLite database path
+        """
+        self._lock = threading.Lock()
+        self.db = Database(db_path)
+        self.db.connect()
+        self.db.initialize_schema()
+        self._snapshot: Optional[FactorSnapshot] = None
+        self._checked_at = 0.0
+    
+    def update(
+        self,
+        tickers: Optional[List[str]] = None,
+        history_loader: Optional[Callable[[str], Optional[pd.DataFrame]]] = None,
+        info_loader: Optional[Callable[[str], Optional[Dict]]] = None,
+        batch_size: int = SCREENER_BATCH_SIZE,
+        workers: int = SCREENER_FETCH_WORKERS
+    ) -> Dict:
+        """
+        Recompute factors for the universe and upsert them into ScreenerFactors.
+        
+        Tickers are processed in batches so the feature panels stay small;
+        company details come from the Companies table, falling back to
+        info_loader for tickers not stored there.
+        
+        Args:
+            tickers: Tickers to update (None = screener_universe())
+            history_loader: ticker -> price history (default: DataFetcher)
+            info_loader: ticker -> stock info dict (default: DataFetcher)
+            batch_size: Tickers per batch
+            workers: Concurrent downloads
+        
+        Returns:
+            Dict with updated, failed and seconds
+        """
+        start = time.time()
+        if tickers is None:
+            tickers = screener_universe(self.db)
+        tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        if history_loader is None or info_loader is None:
+            from src.api.data_fetcher import DataFetcher
+            fetcher = DataFetcher()
+            history_loader = history_loader or (
+                lambda t: fetcher.get_historical_data(t, period=SCREENER_HISTORY_PERIOD)
+            )
+            info_loader = info_loader or fetcher.get_stock_info
+        
+        companies = self._company_details(tickers)
+        sentiment = self._sentiment_factors(tickers)
+        updated, failed = 0, []
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for i in range(0, len(tickers), batch_size):
+                batch = tickers[i:i + batch_size]
+                histories = dict(zip(batch, executor.map(lambda t: self._safe(history_loader, t), batch)))
+                missing = [t for t in batch if t not in companies]
+                for ticker, info in zip(missing, executor.map(lambda t: self._safe(info_loader, t), missing)):
+                    if info:
+                        companies[ticker] = info
+                
+                data = {t: df for t, df in histories.items() if df is not None and not df.empty}
+                failed.extend(t for t in batch if t not in data)
+                if not data:
+                    continue
+                factors = compute_factors(data)
+                updated += self._store(factors, companies, sentiment)
+                logger.info(f"Screener factors: {min(i + batch_size, len(tickers))}/{len(tickers)} tickers")
+        
+        self._checked_at = 0.0  # Next screen picks up the new build
+        elapsed = time.time() - start
+        logger.info(f"Screener factors updated for {updated} tickers in {elapsed:.1f}s ({len(failed)} failed)")
+        return {'updated': updated, 'failed': failed, 'seconds': elapsed}
+    
+    @staticmethod
+    def _safe(loader: Callable[[str], Any], ticker: str) -> Any:
+        try:
+            return loader(ticker)
+        except Exception as e:
+            logger.error(f"Screener fetch failed for {ticker}: {e}")
+            return None
+    
+    def _company_details(self, tickers: List[str]) -> Dict[str, Dict]:
+        """Company name, sector, industry and market cap from the Companies table."""
+        with self._lock:
+            rows = self.db.conn.execute(
+                "SELECT ticker, company_name, sector, industry, market_cap FROM Companies"
+            ).fetchall()
+        wanted = set(tickers)
+        return {row['ticker']: dict(row) for row in rows if row['ticker'] in wanted}
+    
+    def _sentiment_factors(self, tickers: List[str]) -> pd.DataFrame:
+        """Article-weighted news sentiment over the last SCREENER_SENTIMENT_DAYS days."""
+        start_date = (datetime.now() - timedelta(days=SCREENER_SENTIMENT_DAYS)).strftime('%Y-%m-%d')
+        with self._lock:
+            frame = pd.read_sql_query("""
+                SELECT ticker,
+                       SUM(weighted_sentiment * article_count) / SUM(article_count) AS sentiment,
+                       SUM(article_count) AS sentiment_articles
+                FROM DailySentiment
+                WHERE day >= ?
+                GROUP BY ticker
+            """, self.db.conn, params=(start_date,))
+        return frame[frame['ticker'].isin(tickers)].set_index('ticker')
+    
+    def _store(self, factors: pd.DataFrame, companies: Dict[str, Dict], sentiment: pd.DataFrame) -> int:
+        """Upsert one batch of factor rows."""
+        frame = factors.join(sentiment, how='left')
+        details = pd.DataFrame.from_dict(
+            {t: companies.get(t, {}) for t in frame.index}, orient='index',
+            columns=['company_name', 'sector', 'industry', 'market_cap']
+        )
+        frame = frame.join(details).rename_axis('ticker').reset_index()
+        frame['sector'] = frame['sector'].replace('N/A', None)
+        frame['industry'] = frame['industry'].replace('N/A', None)
+        frame['updated_at'] = datetime.now().isoformat(sep=' ')
+        
+        columns = FACTOR_COLUMNS + ['updated_at']
+        rows = frame[columns].astype(object).where(frame[columns].notna(), None).itertuples(index=False, name=None)
+        with self._lock:
+            self.db.conn.executemany(
+                f"INSERT OR REPLACE INTO ScreenerFactors ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                list(rows)
+            )
+            self.db.conn.commit()
+        return len(frame)
+    
+    def snapshot(self, force: bool = False) -> FactorSnapshot:
+        """
+        Current columnar snapshot, reloaded when the table has changed.
+        
+        The table version is checked at most every SCREENER_RELOAD_SECONDS.
+        
+        Args:
+            force: Check the table version now
+        
+        Returns:
+            FactorSnapshot
+        """
+        now = time.monotonic()
+        if not force and self._snapshot is not None and now - self._checked_at < SCREENER_RELOAD_SECONDS:
+            return self._snapshot
+        with self._lock:
+            version = tuple(self.db.conn.execute(
+                "SELECT COUNT(*), MAX(updated_at) FROM ScreenerFactors"
+            ).fetchone())
+            if self._snapshot is None or self._snapshot.version != version:
+                frame = pd.read_sql_query(
+                    f"SELECT {', '.join(FACTOR_COLUMNS)} FROM ScreenerFactors ORDER BY ticker", self.db.conn
+                )
+                self._snapshot = FactorSnapshot(frame, version)
+                logger.info(f"Loaded screener snapshot with {len(frame)} tickers")
+            self._checked_at = now
+            return self._snapshot
+    
+    def query(self) -> ScreenQuery:
+        """Start a composable screen (see ScreenQuery)."""
+        return ScreenQuery(self)
+    
+    def screen(
+        self,
+        filters: Optional[Sequence[Filter]] = None,
+        sort_by: Optional[str] = None,
+        ascending: bool = False,
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Filter, sort and take the top rows of the factor table.
+        
+        Args:
+            filters: (column, operator, value) triples, all of which must match.
+                     Numeric operators: >, >=, <, <=, ==, !=, between (low, high).
+                     Text operators (ticker, company_name, sector, industry):
+                     ==, !=, in, not in.
+            sort_by: Column to sort by (None = table order)
+            ascending: Sort ascending instead of descending
+            limit: Maximum rows returned
+            columns: Columns to return (ticker is always included)
+        
+        Returns:
+            DataFrame of matching tickers
+        """
+        snap = self.snapshot()
+        mask = snap.mask(filters or [])
+        
+        if sort_by:
+            order = snap.sorted_rows(sort_by, ascending)
+            rows = order[mask[order]]
+        else:
+            rows = np.flatnonzero(mask)
+        if limit is not None:
+            rows = rows[:limit]
+        
+        columns = columns or snap.columns
+        if 'ticker' not in columns:
+            columns = ['ticker'] + list(columns)
+        return snap.select(rows, columns)
+    
+    def top(self, column: str, k: int = 5, ascending: bool = False,
+            filters: Optional[Sequence[Filter]] = None) -> pd.DataFrame:
+        """
+        Top k tickers by a factor (e.g. top('return_1d') for gainers).
+        
+        Args:
+            column: Factor to rank by
+            k: Number of rows
+            ascending: Rank smallest first (e.g. losers)
+            filters: Optional filters applied first
+        
+        Returns:
+            DataFrame of the top k rows
+        """
+        return self.screen(filters=filters, sort_by=column, ascending=ascending, limit=k)
+    
+    def sectors(self) -> List[str]:
+        """Sectors present in the snapshot."""
+        snap = self.snapshot()
+        if 'sector' not in snap.text:
+            return []
+        return sorted(str(s) for s in snap.text['sector'][1])
+
+
+# Global instance
+_screener = None
+_screener_lock = threading.Lock()
+
+def get_screener() -> Screener:
+    """Get or create global screener instance."""
+    global _screener
+    with _screener_lock:
+        if _screener is None:
+            _screener = Screener()
+    return _screener
@@ -5,6 +5,8 @@ from textblob import TextBlob
 from typing import List, Dict
 import pandas as pd
 
+from src.analysis.lexicon_sentiment import get_lexicon_scorer
+
 
 def analyze_sentiment(text: str) -> Dict:
     """
@@ -42,16 +44,20 @@ def analyze_sentiment(text: str) -> Dict:
     }
 
 
-def analyze_news_batch(news_list: List[Dict]) -> pd.DataFrame:
+def analyze_news_batch(news_list: List[Dict], method: str = 'textblob') -> pd.DataFrame:
     """
     Analyze sentiment for a batch of news articles.
     
     Args:
         news_list: List of dictionaries with 'title' and optional 'description'
+        method: 'textblob' (per-article) or 'lexicon' (fast vectorized word lists)
         
     Returns:
         DataFrame with news and sentiment scores
     """
+    if method == 'lexicon':
+        return get_lexicon_scorer().analyze_news_batch(news_list)
+    
     results = []
     
     for news in news_list:
@@ -0,0 +1,322 @@
+"""
+Background job queue for earnings transcript sentiment analysis.
+Runs the lexicon/FinBERT cascade off the Streamlit script thread so pages can
+poll for progress.
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.analysis.finbert_sentiment import get_analyzer
+from src.utils.database import Database
+from config.settings import (
+    DATABASE_PATH, SENTIMENT_JOB_WORKERS, SENTIMENT_JOB_BATCH_SIZE,
+    SENTIMENT_JOB_MAX_FINISHED
+)
+
+logger = logging.getLogger(__name__)
+
+JobKey = Tuple[str, Optional[int], Optional[int]]
+
+
+def make_job_key(ticker: str, year, quarter) -> JobKey:
+    """
+    Build the (ticker, year, quarter) key identifying an analysis job.
+    
+    Args:
+        ticker: Stock ticker symbol
+        year: Fiscal year (int or numeric string)
+        quarter: Quarter number, optionally prefixed with 'Q'
+    
+    Returns:
+        Normalized job key (year/quarter are None when they don't parse,
+        e.g. 'N/A', and such keys are never persisted)
+    """
+    year_str = str(year).strip()
+    quarter_str = str(quarter).strip().upper().replace('Q', '')
+    return (
+        ticker.strip().upper(),
+        int(year_str) if year_str.isdigit() else None,
+        int(quarter_str) if quarter_str.isdigit() else None
+    )
+
+
+def is_complete_key(key: JobKey) -> bool:
+    """Whether a job key identifies one transcript (year and quarter both known)."""
+    return key[1] is not None and key[2] is not None
+
+
+class SentimentJob:
+    """State of one transcript analysis job, shared between worker and pages."""
+    
+    def __init__(self, key: JobKey, total_segments: int):
+        """
+        Initialize job state.
+        
+        Args:
+            key: (ticker, year, quarter) job key
+            total_segments: Number of text segments to analyze
+        """
+        self.key = key
+        self.total_segments = total_segments
+        self.processed_segments = 0
+        self.status = 'queued'  # queued -> running -> completed | failed
+        self.partial: Dict = {}
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.submitted_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def done(self) -> bool:
+        """Whether the job has finished (successfully or not)."""
+        return self.status in ('completed', 'failed')
+    
+    def update(self, processed: int, partial: Dict):
+        """Record progress after a batch finishes."""
+        with self._lock:
+            self.status = 'running'
+            self.processed_segments = processed
+            self.partial = partial
+    
+    def complete(self, result: Dict):
+        """Mark the job as completed with its final aggregate."""
+        with self._lock:
+            self.status = 'completed'
+            self.processed_segments = self.total_segments
+            self.partial = result
+            self.result = result
+            self.finished_at = datetime.now()
+    
+    def fail(self, error: str):
+        """Mark the job as failed, keeping any partial aggregate."""
+        with self._lock:
+            self.status = 'failed'
+            self.error = error
+            self.finished_at = datetime.now()
+    
+    def snapshot(self) -> Dict:
+        """
+        Get a consistent copy of the job state for display.
+        
+        Returns:
+            Dict with status, progress and the latest (partial) aggregate
+        """
+        with self._lock:
+            progress = (
+                self.processed_segments / self.total_segments
+                if self.total_segments else 1.0
+            )
+            return {
+                'ticker': self.key[0],
+                'year': self.key[1],
+                'quarter': self.key[2],
+                'status': self.status,
+                'processed_segments': self.processed_segments,
+                'total_segments': self.total_segments,
+                'progress': progress,
+                'aggregate': self.result or self.partial,
+                'error': self.error
+            }
+
+
+class SentimentJobQueue:
+    """Thread pool that runs transcript sentiment jobs and persists results."""
+    
+    def __init__(
+        self,
+        max_workers: int = SENTIMENT_JOB_WORKERS,
+        batch_size: int = SENTIMENT_JOB_BATCH_SIZE,
+        threshold: float = 0.5,
+        db_path: str = DATABASE_PATH,
+        max_finished: int = SENTIMENT_JOB_MAX_FINISHED
+    ):
+        """
+        Initialize the job queue.
+        
+        Args:
+            max_workers: Number of worker threads
+            batch_size: Segments analyzed between progress updates
+            threshold: FinBERT confidence threshold
+            db_path: SQLite database used to persist final results
+            max_finished: Finished jobs kept in memory (least recently
+                          used first out); persisted results are not counted
+        """
+        self.batch_size = max(1, batch_size)
+        self.threshold = threshold
+        self.max_finished = max_finished
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='sentiment-job'
+        )
+        # Queued/running jobs and recently finished unpersisted ones, keyed by
+        # JobKey (plus a content digest for incomplete keys)
+        self.jobs: 'OrderedDict[Tuple, SentimentJob]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        
+        self.db = Database(db_path)
+        self.db.connect()
+        self.db.initialize_schema()
+    
+    def submit(
+        self,
+        ticker: str,
+        year,
+        quarter,
+        texts: List[str],
+        persist: bool = True
+    ) -> SentimentJob:
+        """
+        Submit an analysis job, reusing an identical in-flight or finished job.
+        
+        Transcripts without a parseable year/quarter are matched by content
+        instead and their results are kept in memory only.
+        
+        Args:
+            ticker: Stock ticker symbol
+            year: Fiscal year
+            quarter: Quarter number
+            texts: Transcript segments to analyze
+            persist: Whether to store the final result (False for sample data)
+        
+        Returns:
+            The job tracking this (ticker, year, quarter)
+        """
+        key = make_job_key(ticker, year, quarter)
+        if is_complete_key(key):
+            memo_key = key
+        else:
+            persist = False
+            digest = hashlib.sha1('\n'.join(texts).encode('utf-8')).hexdigest()
+            memo_key = key + (digest,)
+        
+        with self._lock:
+            job = self.jobs.get(memo_key)
+            if job is not None and job.status != 'failed':
+                self.jobs.move_to_end(memo_key)
+                return job
+            
+            stored = self._load_result(key) if persist else None
+            if stored is not None:
+                return self._stored_job(key, stored)
+            
+            job = SentimentJob(key, len(texts))
+            self.jobs[memo_key] = job
+        
+        logger.info(f"Queued sentiment job {key} ({len(texts)} segments)")
+        self.executor.submit(self._run, memo_key, job, list(texts), persist)
+        return job
+    
+    def get_job(self, ticker: str, year, quarter) -> Optional[SentimentJob]:
+        """
+        Look up a job (in memory or persisted) without submitting one.
+        
+        Args:
+            ticker: Stock ticker symbol
+            year: Fiscal year
+            quarter: Quarter number
+        
+        Returns:
+            Matching job or None (always None when year/quarter don't parse)
+        """
+        key = make_job_key(ticker, year, quarter)
+        if not is_complete_key(key):
+            return None
+        with self._lock:
+            job = self.jobs.get(key)
+            if job is None:
+                stored = self._load_result(key)
+                if stored is not None:
+                    job = self._stored_job(key, stored)
+        return job
+    
+    @staticmethod
+    def _stored_job(key: JobKey, stored: Dict) -> SentimentJob:
+        """Wrap a persisted result in a completed job (not kept in memory)."""
+        job = SentimentJob(key, stored.get('total_analyzed', 0))
+        job.complete(stored)
+        return job
+    
+    def _release(self, memo_key: Tuple, job: SentimentJob, persisted: bool):
+        """
+        Drop a finished job from memory once its result is persisted, and keep
+        at most max_finished other finished jobs.
+        """
+        with self._lock:
+            if self.jobs.get(memo_key) is not job:
+                return  # Replaced by a resubmission
+            if persisted:
+                del self.jobs[memo_key]
+                return
+            self.jobs.move_to_end(memo_key)
+            finished = [k for k, j in self.jobs.items() if j.done]
+            for stale in finished[:max(0, len(finished) - self.max_finished)]:
+                del self.jobs[stale]
+    
+    def _run(self, memo_key: Tuple, job: SentimentJob, texts: List[str], persist: bool = True):
+        """Analyze texts batch by batch, publishing partial aggregates."""
+        analyzer = get_analyzer()
+        results: List[Dict] = []
+        
+        try:
+            job.update(0, analyzer.aggregate_results(results))
+            
+            for start in range(0, len(texts), self.batch_size):
+                batch = texts[start:start + self.batch_size]
+                results.extend(analyzer.analyze_cascade(batch, self.threshold))
+                job.update(start + len(batch), analyzer.aggregate_results(results))
+            
+            final = analyzer.aggregate_results(results)
+            if persist:
+                self._save_result(job.key, final, len(texts))
+            job.complete(final)
+            logger.info(f"Sentiment job {job.key} completed")
+        except Exception as e:
+            logger.error(f"Sentiment job {job.key} failed: {e}")
+            job.fail(str(e))
+        self._release(memo_key, job, persisted=persist and job.status == 'completed')
+    
+    def _load_result(self, key: JobKey) -> Optional[Dict]:
+        """Load a persisted final result, if any."""
+        with self._db_lock:
+            row = self.db.conn.execute(
+                """
+                SELECT result_json FROM TranscriptSentiment
+                WHERE ticker = ? AND year = ? AND quarter = ?
+                """,
+                key
+            ).fetchone()
+        return json.loads(row['result_json']) if row else None
+    
+    def _save_result(self, key: JobKey, result: Dict, segments: int):
+        """Persist a final result so other sessions and restarts reuse it."""
+        with self._db_lock:
+            self.db.conn.execute(
+                """
+                INSERT OR REPLACE INTO TranscriptSentiment
+                (ticker, year, quarter, result_json, segments_analyzed, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (*key, json.dumps(result), segments, datetime.now())
+            )
+            self.db.conn.commit()
+
+
+# Global instance
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> SentimentJobQueue:
+    """Get or create global sentiment job queue (shared by all sessions)."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = SentimentJobQueue()
+    return _job_queue
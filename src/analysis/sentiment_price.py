@@ -0,0 +1,356 @@
+"""
+Price/sentiment relationship analysis.
+Aligns daily sentiment series with returns and computes lagged
+cross-correlations, rolling correlations and event-window abnormal returns,
+vectorized across tickers and lags.
+"""
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.historical_analysis import build_price_panel, calculate_returns_panel
+from src.analysis.sentiment_timeseries import get_sentiment_aggregator
+from src.utils.database import Database
+from config.settings import DATABASE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def build_sentiment_panel(
+    series: pd.DataFrame,
+    value_column: str = 'weighted_sentiment'
+) -> pd.DataFrame:
+    """
+    Pivot long daily sentiment rows into a wide panel.
+    
+    Args:
+        series: Rows with ticker, day and value_column
+                (see SentimentAggregator.get_ticker_series)
+        value_column: Sentiment measure to use
+    
+    Returns:
+        DataFrame indexed by day with one column per ticker
+    """
+    if series.empty:
+        return pd.DataFrame()
+    return series.pivot_table(index='day', columns='ticker', values=value_column).sort_index()
+
+
+def align_to_trading_days(sentiment: pd.DataFrame, trading_days: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    Move sentiment onto trading days.
+    
+    News from weekends and holidays is assigned to the next trading day and
+    averaged with that day's sentiment; days after the last session are dropped.
+    
+    Args:
+        sentiment: Wide sentiment panel indexed by calendar day
+        trading_days: Sorted trading-day index of the returns panel
+    
+    Returns:
+        Sentiment panel indexed by trading_days (NaN where there was no news)
+    """
+    if sentiment.empty or len(trading_days) == 0:
+        return pd.DataFrame(index=trading_days, columns=sentiment.columns, dtype=float)
+    
+    pos = trading_days.searchsorted(sentiment.index)
+    valid = pos < len(trading_days)
+    shifted = sentiment[valid].copy()
+    shifted.index = trading_days[pos[valid]]
+    return shifted.groupby(level=0).mean().reindex(trading_days)
+
+
+def _masked_corr(x: np.ndarray, y: np.ndarray, min_periods: int) -> np.ndarray:
+    """
+    Pearson correlation along axis -2, ignoring positions where either is NaN.
+    
+    Args:
+        x, y: Arrays of the same (broadcastable) shape (..., T, N)
+        min_periods: Minimum number of paired observations
+    
+    Returns:
+        Array of shape (..., N)
+    """
+    mask = np.isfinite(x) & np.isfinite(y)
+    n = mask.sum(axis=-2)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = x.sum(axis=-2) / n
+        mean_y = y.sum(axis=-2) / n
+        cov = (x * y).sum(axis=-2) / n - mean_x * mean_y
+        var_x = (x * x).sum(axis=-2) / n - mean_x ** 2
+        var_y = (y * y).sum(axis=-2) / n - mean_y ** 2
+        corr = cov / np.sqrt(var_x * var_y)
+    
+    corr[(n < min_periods) | ~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def lagged_cross_correlation(
+    returns: pd.DataFrame,
+    sentiment: pd.DataFrame,
+    lags: Iterable[int] = range(-5, 6),
+    min_periods: int = 20
+) -> pd.DataFrame:
+    """
+    Correlate sentiment on day t with returns on day t + lag for every ticker.
+    
+    Positive lags ask whether sentiment leads returns; negative lags whether
+    returns lead sentiment.
+    
+    Args:
+        returns: Wide returns panel
+        sentiment: Wide sentiment panel aligned to the same trading days
+        lags: Lags in trading days
+        min_periods: Minimum paired observations per correlation
+    
+    Returns:
+        DataFrame indexed by lag with one column per ticker
+    """
+    tickers = returns.columns.intersection(sentiment.columns)
+    lags = list(lags)
+    if len(tickers) == 0 or not lags:
+        return pd.DataFrame(index=pd.Index(lags, name='lag'))
+    
+    r = returns[tickers].to_numpy(dtype=float)
+    s = sentiment.reindex(index=returns.index, columns=tickers).to_numpy(dtype=float)
+    
+    # (lags, T, N) stack of shifted returns: shifted[k, t] = r[t + lag_k]
+    T = len(r)
+    shifted = np.full((len(lags), T, len(tickers)), np.nan)
+    for k, lag in enumerate(lags):
+        if lag >= 0:
+            shifted[k, :T - lag] = r[lag:]
+        else:
+            shifted[k, -lag:] = r[:T + lag]
+    
+    corr = _masked_corr(s[None, :, :], shifted, min_periods)
+    return pd.DataFrame(corr, index=pd.Index(lags, name='lag'), columns=tickers)
+
+
+def rolling_correlation(
+    returns: pd.DataFrame,
+    sentiment: pd.DataFrame,
+    window: int = 60,
+    lag: int = 0,
+    min_periods: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Rolling correlation of sentiment with (lagged) returns for every ticker.
+    
+    Args:
+        returns: Wide returns panel
+        sentiment: Wide sentiment panel aligned to the same trading days
+        window: Rolling window in trading days
+        lag: Correlate sentiment at t with returns at t + lag
+        min_periods: Minimum observations in a window (default window // 2)
+    
+    Returns:
+        DataFrame of rolling correlations, same shape as the returns panel
+    """
+    tickers = returns.columns.intersection(sentiment.columns)
+    aligned = sentiment.reindex(index=returns.index, columns=tickers)
+    return aligned.rolling(window, min_periods=min_periods or window // 2).corr(
+        returns[tickers].shift(-lag)
+    )
+
+
+def event_abnormal_returns(
+    returns: pd.DataFrame,
+    market_returns: pd.Series,
+    events: pd.DataFrame,
+    window: Tuple[int, int] = (-1, 5),
+    estimation_days: int = 120,
+    gap: int = 10
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Market-model abnormal returns around events (e.g. earnings calls).
+    
+    For each event, alpha and beta are estimated on the estimation_days
+    returns ending gap days before the event window, then
+    AR = r - (alpha + beta * r_market) over the window.
+    
+    Args:
+        returns: Wide returns panel
+        market_returns: Market (index) returns on the same trading days
+        events: Rows with 'ticker' and 'date' (any other columns are kept)
+        window: (first, last) offset in trading days around the event day
+        estimation_days: Length of the estimation period
+        gap: Trading days between the estimation period and the window
+    
+    Returns:
+        Tuple of (abnormal returns with one row per event and one column per
+        offset, event summary with alpha, beta, car and the event columns)
+    """
+    offsets = np.arange(window[0], window[1] + 1)
+    if events.empty or returns.empty:
+        return pd.DataFrame(columns=offsets), pd.DataFrame()
+    
+    dates = returns.index
+    market = market_returns.reindex(dates).to_numpy(dtype=float)
+    r = returns.to_numpy(dtype=float)
+    
+    col = returns.columns.get_indexer(events['ticker'].str.upper())
+    # Events on non-trading days (after-hours calls on a Friday etc.) use the next session
+    day = dates.searchsorted(pd.to_datetime(events['date']).dt.normalize())
+    
+    first_est = day + window[0] - gap - estimation_days
+    valid = (col >= 0) & (first_est >= 0) & (day + window[1] < len(dates))
+    if not valid.any():
+        logger.warning("No events with enough surrounding price history")
+        return pd.DataFrame(columns=offsets), pd.DataFrame()
+    
+    col, day, first_est = col[valid], day[valid], first_est[valid]
+    kept = events[valid].reset_index(drop=True)
+    
+    # Gather (events x estimation_days) and (events x window) blocks by fancy indexing
+    est_idx = first_est[:, None] + np.arange(estimation_days)[None, :]
+    win_idx = day[:, None] + offsets[None, :]
+    est_r, est_m = r[est_idx, col[:, None]], market[est_idx]
+    win_r, win_m = r[win_idx, col[:, None]], market[win_idx]
+    
+    mask = np.isfinite(est_r) & np.isfinite(est_m)
+    n = mask.sum(axis=1)
+    est_r, est_m = np.where(mask, est_r, 0.0), np.where(mask, est_m, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_r, mean_m = est_r.sum(axis=1) / n, est_m.sum(axis=1) / n
+        cov = (est_r * est_m).sum(axis=1) / n - mean_r * mean_m
+        var_m = (est_m * est_m).sum(axis=1) / n - mean_m ** 2
+        beta = cov / var_m
+    alpha = mean_r - beta * mean_m
+    
+    abnormal = win_r - (alpha[:, None] + beta[:, None] * win_m)
+    ar = pd.DataFrame(abnormal, columns=offsets)
+    
+    summary = kept.copy()
+    summary['event_day'] = dates[day]
+    summary['alpha'] = alpha
+    summary['beta'] = beta
+    summary['car'] = np.nansum(abnormal, axis=1)
+    return ar, summary
+
+
+def summarize_event_study(ar: pd.DataFrame, summary: pd.DataFrame, group_by: Optional[str] = None) -> pd.DataFrame:
+    """
+    Average abnormal returns and test whether the mean CAR differs from zero.
+    
+    Args:
+        ar: Abnormal returns from event_abnormal_returns
+        summary: Event summary from event_abnormal_returns
+        group_by: Optional summary column to split events by (e.g. 'sentiment')
+    
+    Returns:
+        DataFrame with event count, mean CAR, t-statistic and mean AR per offset
+    """
+    if summary.empty:
+        return pd.DataFrame()
+    
+    keys = summary[group_by].fillna('unknown') if group_by else pd.Series('all', index=summary.index)
+    rows = {}
+    for key, idx in summary.groupby(keys).groups.items():
+        car = summary.loc[idx, 'car']
+        n = car.count()
+        std = car.std()
+        row = {
+            'events': int(n),
+            'mean_car': car.mean(),
+            't_stat': car.mean() / (std / np.sqrt(n)) if n > 1 and std > 0 else np.nan
+        }
+        row.update({f'ar_{offset:+d}': value for offset, value in ar.loc[idx].mean().items()})
+        rows[key] = row
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def get_earnings_events(tickers: Optional[List[str]] = None, db_path: str = DATABASE_PATH) -> pd.DataFrame:
+    """
+    Load earnings call dates from the transcript catalog, with the call's
+    FinBERT sentiment where a background analysis has finished.
+    
+    Args:
+        tickers: Restrict to these tickers
+        db_path: SQLite database path
+    
+    Returns:
+        DataFrame with ticker, date, year, quarter and sentiment
+    """
+    db = Database(db_path)
+    db.connect()
+    db.initialize_schema()
+    try:
+        sql = """
+            SELECT c.symbol AS ticker, c.call_date AS date, c.year, c.quarter,
+                   s.result_json
+            FROM TranscriptCatalog c
+            LEFT JOIN TranscriptSentiment s
+              ON s.ticker = c.symbol AND s.year = c.year AND s.quarter = c.quarter
+            WHERE c.call_date IS NOT NULL
+        """
+        params: List = []
+        if tickers:
+            sql += f" AND c.symbol IN ({','.join('?' * len(tickers))})"
+            params = [t.upper() for t in tickers]
+        events = pd.read_sql_query(sql, db.conn, params=params)
+    finally:
+        db.close()
+    
+    events['date'] = pd.to_datetime(events['date'], errors='coerce')
+    events['sentiment'] = [
+        json.loads(r).get('overall_sentiment') if isinstance(r, str) else None
+        for r in events.pop('result_json')
+    ]
+    return events.dropna(subset=['date']).reset_index(drop=True)
+
+
+def run_sentiment_price_study(
+    price_data: Dict[str, pd.DataFrame],
+    market_data: Optional[pd.DataFrame] = None,
+    lags: Iterable[int] = range(-5, 6),
+    rolling_window: int = 60,
+    event_window: Tuple[int, int] = (-1, 5),
+    value_column: str = 'weighted_sentiment'
+) -> Dict:
+    """
+    Relate stored daily sentiment to returns across a universe of tickers.
+    
+    Args:
+        price_data: Mapping of ticker to price history (e.g. from
+                    DataFetcher.download_historical_bulk or a cache)
+        market_data: Market index price history for the event study (e.g. ^GSPC)
+        lags: Lags for the cross-correlation
+        rolling_window: Window for the rolling correlation
+        event_window: Offsets around earnings calls for abnormal returns
+        value_column: Daily sentiment measure to use
+    
+    Returns:
+        Dict with 'cross_correlation', 'rolling_correlation', 'abnormal_returns',
+        'events' and 'event_summary'
+    """
+    returns = calculate_returns_panel(build_price_panel(price_data))
+    if returns.empty:
+        return {}
+    
+    start = returns.index[0].strftime('%Y-%m-%d')
+    series = get_sentiment_aggregator().get_ticker_series(list(returns.columns), start_date=start)
+    sentiment = align_to_trading_days(build_sentiment_panel(series, value_column), returns.index)
+    
+    result = {
+        'cross_correlation': lagged_cross_correlation(returns, sentiment, lags),
+        'rolling_correlation': rolling_correlation(returns, sentiment, rolling_window),
+    }
+    
+    if market_data is not None and not market_data.empty:
+        market = calculate_returns_panel(build_price_panel({'market': market_data}))['market']
+        events = get_earnings_events(list(returns.columns))
+        ar, summary = event_abnormal_returns(returns, market, events, event_window)
+        result.update({
+            'abnormal_returns': ar,
+            'events': summary,
+            'event_summary': summarize_event_study(ar, summary, group_by='sentiment')
+        })
+    
+    return result
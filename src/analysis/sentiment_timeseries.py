@@ -0,0 +1,262 @@
+"""
+Daily news sentiment time series.
+Rolls scored NewsArticles rows into per-(ticker, day) DailySentiment rows and
+market-wide MarketSentiment rows, recomputing only days with new articles.
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from src.utils.database import Database
+from config.settings import DATABASE_PATH
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = 'daily_sentiment'
+MARKET_SOURCE = 'news'
+MARKET_CATEGORY = 'daily'
+
+
+def _summarize(articles: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    Aggregate scored articles per group in one vectorized pass.
+    
+    Args:
+        articles: Rows with ticker, day, score, weight and label
+        keys: Grouping columns
+    
+    Returns:
+        One row per group with counts, mean, confidence-weighted mean and
+        dispersion (population standard deviation) of the scores
+    """
+    frame = articles.assign(
+        weighted=articles['score'] * articles['weight'],
+        positive=(articles['label'] == 'positive').astype(int),
+        negative=(articles['label'] == 'negative').astype(int),
+        neutral=(articles['label'] == 'neutral').astype(int)
+    )
+    grouped = frame.groupby(keys)
+    summary = grouped.agg(
+        article_count=('score', 'size'),
+        mean_sentiment=('score', 'mean'),
+        weighted_total=('weighted', 'sum'),
+        weight_total=('weight', 'sum'),
+        positive_count=('positive', 'sum'),
+        negative_count=('negative', 'sum'),
+        neutral_count=('neutral', 'sum'),
+        ticker_count=('ticker', 'nunique')
+    )
+    summary['sentiment_dispersion'] = grouped['score'].std(ddof=0)
+    summary['weighted_sentiment'] = (
+        summary['weighted_total'] / summary['weight_total'].where(summary['weight_total'] > 0)
+    ).fillna(summary['mean_sentiment'])
+    return summary.drop(columns=['weighted_total', 'weight_total']).reset_index()
+
+
+class SentimentAggregator:
+    """Incrementally materializes daily ticker and market sentiment series."""
+    
+    def __init__(self, db_path: str = DATABASE_PATH):
+        """
+        Initialize the aggregator.
+        
+        Args:
+            db_path: SQLite database path
+        """
+        self._lock = threading.Lock()
+        self.db = Database(db_path)
+        self.db.connect()
+        self.db.initialize_schema()
+    
+    def update(self, full: bool = False) -> Dict:
+        """
+        Recompute series for every day that received articles since the last run.
+        
+        Args:
+            full: Recompute every day instead of only those with new articles
+        
+        Returns:
+            Dict with the number of ticker-days and market days updated
+        """
+        with self._lock:
+            conn = self.db.conn
+            row = conn.execute(
+                "SELECT last_row_id FROM AggregationState WHERE job_name = ?", (JOB_NAME,)
+            ).fetchone()
+            last_id = 0 if full or row is None else row['last_row_id']
+            
+            max_id = conn.execute("SELECT COALESCE(MAX(article_id), 0) FROM NewsArticles").fetchone()[0]
+            if max_id <= last_id:
+                return {'ticker_days': 0, 'market_days': 0}
+            
+            # (ticker, day) pairs touched by new articles
+            conn.execute("DROP TABLE IF EXISTS temp.DirtyDays")
+            conn.execute("""
+                CREATE TEMP TABLE DirtyDays AS
+                SELECT DISTINCT related_ticker AS ticker, date(publish_date) AS day
+                FROM NewsArticles
+                WHERE article_id > ? AND article_id <= ? AND related_ticker IS NOT NULL
+            """, (last_id, max_id))
+            
+            # Every article on a touched day, so market rows cover all tickers
+            articles = pd.read_sql_query("""
+                SELECT a.related_ticker AS ticker, date(a.publish_date) AS day,
+                       a.sentiment_score AS score,
+                       COALESCE(a.sentiment_confidence, 1.0) AS weight,
+                       a.sentiment_label AS label
+                FROM (SELECT DISTINCT day FROM temp.DirtyDays) d
+                JOIN NewsArticles a
+                  ON a.publish_date >= d.day AND a.publish_date < date(d.day, '+1 day')
+                WHERE a.sentiment_score IS NOT NULL AND a.article_id <= ?
+            """, conn, params=(max_id,))
+            dirty = pd.read_sql_query("SELECT ticker, day FROM temp.DirtyDays", conn)
+            conn.execute("DROP TABLE temp.DirtyDays")
+            
+            now = datetime.now()
+            ticker_rows = []
+            market_rows = []
+            if not articles.empty:
+                dirty_keys = set(zip(dirty['ticker'], dirty['day']))
+                in_dirty = [k in dirty_keys for k in zip(articles['ticker'], articles['day'])]
+                
+                daily = _summarize(articles[in_dirty], ['ticker', 'day'])
+                ticker_rows = [
+                    (r.ticker, r.day, int(r.article_count), r.mean_sentiment,
+                     r.weighted_sentiment, r.sentiment_dispersion, int(r.positive_count),
+                     int(r.negative_count), int(r.neutral_count), now)
+                    for r in daily.itertuples(index=False)
+                ]
+                
+                market = _summarize(articles, ['day'])
+                market_rows = [
+                    (f"{r.day} 00:00:00", r.mean_sentiment, MARKET_SOURCE, MARKET_CATEGORY,
+                     r.weighted_sentiment, r.sentiment_dispersion, int(r.article_count),
+                     int(r.ticker_count), now)
+                    for r in market.itertuples(index=False)
+                ]
+            
+            conn.executemany("""
+                INSERT INTO DailySentiment
+                (ticker, day, article_count, mean_sentiment, weighted_sentiment,
+                 sentiment_dispersion, positive_count, negative_count, neutral_count, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(ticker, day) DO UPDATE SET
+                    article_count = excluded.article_count,
+                    mean_sentiment = excluded.mean_sentiment,
+                    weighted_sentiment = excluded.weighted_sentiment,
+                    sentiment_dispersion = excluded.sentiment_dispersion,
+                    positive_count = excluded.positive_count,
+                    negative_count = excluded.negative_count,
+                    neutral_count = excluded.neutral_count,
+                    updated_at = excluded.updated_at
+            """, ticker_rows)
+            conn.executemany("""
+                INSERT INTO MarketSentiment
+                (timestamp, overall_market_sentiment, source, category, weighted_sentiment,
+                 sentiment_dispersion, article_count, ticker_count, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(timestamp) DO UPDATE SET
+                    overall_market_sentiment = excluded.overall_market_sentiment,
+                    source = excluded.source,
+                    category = excluded.category,
+                    weighted_sentiment = excluded.weighted_sentiment,
+                    sentiment_dispersion = excluded.sentiment_dispersion,
+                    article_count = excluded.article_count,
+                    ticker_count = excluded.ticker_count,
+                    updated_at = excluded.updated_at
+            """, market_rows)
+            conn.execute("""
+                INSERT INTO AggregationState (job_name, last_row_id, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(job_name) DO UPDATE SET
+                    last_row_id = excluded.last_row_id,
+                    updated_at = excluded.updated_at
+            """, (JOB_NAME, max_id, now))
+            conn.commit()
+        
+        logger.info(f"Sentiment series updated: {len(ticker_rows)} ticker-days, "
+                    f"{len(market_rows)} market days")
+        return {'ticker_days': len(ticker_rows), 'market_days': len(market_rows)}
+    
+    def get_ticker_series(
+        self,
+        tickers: Union[str, List[str]],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Read daily sentiment for one or more tickers.
+        
+        Args:
+            tickers: Ticker or list of tickers
+            start_date: First day (YYYY-MM-DD, inclusive)
+            end_date: Last day (YYYY-MM-DD, inclusive)
+        
+        Returns:
+            DataFrame with ticker, day and the daily sentiment columns
+        """
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        tickers = [t.upper() for t in tickers]
+        
+        sql = f"""
+            SELECT ticker, day, article_count, mean_sentiment, weighted_sentiment,
+                   sentiment_dispersion, positive_count, negative_count, neutral_count
+            FROM DailySentiment
+            WHERE ticker IN ({','.join('?' * len(tickers))})
+              AND day >= ? AND day <= ?
+            ORDER BY ticker, day
+        """
+        params = tickers + [start_date or '0000-01-01', end_date or '9999-12-31']
+        with self._lock:
+            df = pd.read_sql_query(sql, self.db.conn, params=params)
+        df['day'] = pd.to_datetime(df['day'])
+        return df
+    
+    def get_market_series(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Read the market-wide daily sentiment series.
+        
+        Args:
+            start_date: First day (YYYY-MM-DD, inclusive)
+            end_date: Last day (YYYY-MM-DD, inclusive)
+        
+        Returns:
+            DataFrame with day, mean/weighted sentiment, dispersion and counts
+        """
+        with self._lock:
+            df = pd.read_sql_query("""
+                SELECT date(timestamp) AS day,
+                       overall_market_sentiment AS mean_sentiment,
+                       weighted_sentiment, sentiment_dispersion,
+                       article_count, ticker_count
+                FROM MarketSentiment
+                WHERE source = ? AND category = ?
+                  AND timestamp >= ? AND timestamp <= ?
+                ORDER BY timestamp
+            """, self.db.conn, params=(
+                MARKET_SOURCE, MARKET_CATEGORY,
+                start_date or '0000-01-01', (end_date or '9999-12-31') + ' 23:59:59'
+            ))
+        df['day'] = pd.to_datetime(df['day'])
+        return df
+
+
+# Global instance
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+def get_sentiment_aggregator() -> SentimentAggregator:
+    """Get or create global sentiment aggregator instance."""
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            _aggregator = SentimentAggregator()
+    return _aggregator
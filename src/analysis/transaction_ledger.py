@@ -0,0 +1,526 @@
+"""
+Lot-level transaction ledger.
+Buys, sells, dividends and splits are appended to SQLite; open tax lots and
+running position totals (quantity, cost basis, realized P&L, dividends) are
+updated as each transaction is recorded, so positions load without replaying
+history. FIFO, LIFO and average-cost methods are supported per portfolio.
+"""
+import logging
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.utils.database import Database
+from config.settings import DATABASE_PATH
+
+logger = logging.getLogger(__name__)
+
+COST_BASIS_METHODS = ('FIFO', 'LIFO', 'AVERAGE')
+TXN_TYPES = ('BUY', 'SELL', 'DIVIDEND', 'SPLIT')
+QUANTITY_TOLERANCE = 1e-9
+
+DateLike = Union[str, date, datetime, None]
+
+
+def _date_str(value: DateLike) -> str:
+    """Normalize a trade date to 'YYYY-MM-DD' (default today)."""
+    if value is None:
+        return date.today().isoformat()
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+class LotBook:
+    """
+    Open lots and running totals for one (portfolio, ticker) position.
+    Applies one transaction at a time; used both for incremental updates and
+    for rebuilding a position from its history.
+    """
+    
+    def __init__(self, method: str, lots: Optional[List[Dict]] = None, state: Optional[Dict] = None):
+        """
+        Initialize the book.
+        
+        Args:
+            method: 'FIFO', 'LIFO' or 'AVERAGE'
+            lots: Open lots (open_txn_id, open_date, quantity, cost_per_share),
+                  oldest first
+            state: Running totals (realized_pl, dividends, fees)
+        """
+        self.method = method
+        self.lots = lots or []
+        state = state or {}
+        self.realized_pl = state.get('realized_pl', 0.0)
+        self.dividends = state.get('dividends', 0.0)
+        self.fees = state.get('fees', 0.0)
+    
+    @property
+    def quantity(self) -> float:
+        return sum(lot['quantity'] for lot in self.lots)
+    
+    @property
+    def cost_basis(self) -> float:
+        return sum(lot['quantity'] * lot['cost_per_share'] for lot in self.lots)
+    
+    def apply(self, txn: Dict) -> Optional[float]:
+        """
+        Apply one transaction.
+        
+        Args:
+            txn: Dict with txn_id, txn_type, trade_date, quantity, price,
+                 fees and amount
+        
+        Returns:
+            Realized P&L for sells, otherwise None
+        
+        Raises:
+            ValueError: If a sell exceeds the shares held
+        """
+        txn_type = txn['txn_type']
+        fees = txn.get('fees') or 0.0
+        self.fees += fees
+        
+        if txn_type == 'BUY':
+            quantity, price = txn['quantity'], txn['price']
+            cost_per_share = (quantity * price + fees) / quantity
+            if self.method == 'AVERAGE' and self.lots:
+                pooled = self.lots[0]
+                total = pooled['quantity'] + quantity
+                pooled['cost_per_share'] = (
+                    pooled['quantity'] * pooled['cost_per_share'] + quantity * cost_per_share
+                ) / total
+                pooled['quantity'] = total
+            else:
+                self.lots.append({
+                    'open_txn_id': txn.get('txn_id'),
+                    'open_date': txn['trade_date'],
+                    'quantity': quantity,
+                    'cost_per_share': cost_per_share
+                })
+            return None
+        
+        if txn_type == 'SELL':
+            quantity, price = txn['quantity'], txn['price']
+            if quantity > self.quantity + QUANTITY_TOLERANCE:
+                raise ValueError(f"Cannot sell {quantity} shares; only {self.quantity} held")
+            
+            order = range(len(self.lots) - 1, -1, -1) if self.method == 'LIFO' else range(len(self.lots))
+            remaining = quantity
+            consumed_cost = 0.0
+            for i in order:
+                if remaining <= QUANTITY_TOLERANCE:
+                    break
+                lot = self.lots[i]
+                take = min(lot['quantity'], remaining)
+                consumed_cost += take * lot['cost_per_share']
+                lot['quantity'] -= take
+                remaining -= take
+            self.lots = [lot for lot in self.lots if lot['quantity'] > QUANTITY_TOLERANCE]
+            
+            realized = quantity * price - fees - consumed_cost
+            self.realized_pl += realized
+            return realized
+        
+        if txn_type == 'DIVIDEND':
+            amount = txn.get('amount')
+            if amount is None:
+                amount = (txn.get('quantity') or 0.0) * (txn.get('price') or 0.0)
+            self.dividends += amount - fees
+            return None
+        
+        if txn_type == 'SPLIT':
+            ratio = txn['quantity']
+            for lot in self.lots:
+                lot['quantity'] *= ratio
+                lot['cost_per_share'] /= ratio
+            return None
+        
+        raise ValueError(f"Unknown transaction type '{txn_type}'")
+
+
+class TransactionLedger:
+    """Persists transactions and keeps lots and position totals current."""
+    
+    def __init__(self, db_path: str = DATABASE_PATH):
+        """
+        Initialize the ledger.
+        
+        Args:
+            db_path: SQLite database path
+        """
+        self._lock = threading.Lock()
+        self.db = Database(db_path)
+        self.db.connect()
+        self.db.initialize_schema()
+    
+    def get_cost_basis_method(self, portfolio_id: int) -> str:
+        """Get a portfolio's cost-basis method (FIFO if unset)."""
+        row = self.db.conn.execute(
+            "SELECT cost_basis_method FROM Portfolios WHERE portfolio_id = ?", (portfolio_id,)
+        ).fetchone()
+        return (row['cost_basis_method'] if row and row['cost_basis_method'] else 'FIFO').upper()
+    
+    def set_cost_basis_method(self, portfolio_id: int, method: str):
+        """
+        Change a portfolio's cost-basis method and rebuild its positions.
+        
+        Args:
+            portfolio_id: Portfolio ID
+            method: 'FIFO', 'LIFO' or 'AVERAGE'
+        """
+        method = method.upper()
+        if method not in COST_BASIS_METHODS:
+            raise ValueError(f"Unknown cost-basis method '{method}'; expected one of {COST_BASIS_METHODS}")
+        with self._lock:
+            with self.db.conn:
+                self.db.conn.execute(
+                    "UPDATE Portfolios SET cost_basis_method = ? WHERE portfolio_id = ?",
+                    (method, portfolio_id)
+                )
+        self.rebuild(portfolio_id)
+    
+    def _load_book(self, portfolio_id: int, ticker: str, method: str) -> LotBook:
+        conn = self.db.conn
+        lots = [dict(row) for row in conn.execute("""
+            SELECT open_txn_id, open_date, quantity, cost_per_share FROM TaxLots
+            WHERE portfolio_id = ? AND ticker = ?
+            ORDER BY open_date, lot_id
+        """, (portfolio_id, ticker))]
+        state = conn.execute("""
+            SELECT realized_pl, dividends, fees FROM PositionState
+            WHERE portfolio_id = ? AND ticker = ?
+        """, (portfolio_id, ticker)).fetchone()
+        return LotBook(method, lots, dict(state) if state else None)
+    
+    def _save_book(self, portfolio_id: int, ticker: str, book: LotBook, last_txn: Dict):
+        """Replace the position's open lots and totals (caller holds a transaction)."""
+        conn = self.db.conn
+        conn.execute("DELETE FROM TaxLots WHERE portfolio_id = ? AND ticker = ?", (portfolio_id, ticker))
+        conn.executemany("""
+            INSERT INTO TaxLots (portfolio_id, ticker, open_txn_id, open_date, quantity, cost_per_share)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (portfolio_id, ticker, lot['open_txn_id'], lot['open_date'], lot['quantity'], lot['cost_per_share'])
+            for lot in book.lots
+        ])
+        conn.execute("""
+            INSERT INTO PositionState (portfolio_id, ticker, quantity, cost_basis, realized_pl,
+                                       dividends, fees, last_trade_date, last_txn_id, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(portfolio_id, ticker) DO UPDATE SET
+                quantity = excluded.quantity,
+                cost_basis = excluded.cost_basis,
+                realized_pl = excluded.realized_pl,
+                dividends = excluded.dividends,
+                fees = excluded.fees,
+                last_trade_date = excluded.last_trade_date,
+                last_txn_id = excluded.last_txn_id,
+                updated_at = excluded.updated_at
+        """, (
+            portfolio_id, ticker, book.quantity, book.cost_basis, book.realized_pl,
+            book.dividends, book.fees, last_txn['trade_date'], last_txn['txn_id'], datetime.now()
+        ))
+    
+    def record(
+        self,
+        portfolio_id: int,
+        ticker: str,
+        txn_type: str,
+        quantity: Optional[float] = None,
+        price: Optional[float] = None,
+        trade_date: DateLike = None,
+        fees: float = 0.0,
+        amount: Optional[float] = None
+    ) -> Dict:
+        """
+        Append a transaction and update the position incrementally.
+        
+        Only the position's open lots are touched. A backdated transaction
+        (earlier than the position's last trade) rebuilds that one position
+        from its history.
+        
+        Args:
+            portfolio_id: Portfolio ID
+            ticker: Stock ticker symbol
+            txn_type: 'BUY', 'SELL', 'DIVIDEND' or 'SPLIT'
+            quantity: Shares (for SPLIT, new shares per old share)
+            price: Price per share (for DIVIDEND, optional per-share amount)
+            trade_date: Trade date (default today)
+            fees: Commissions and fees
+            amount: Cash amount (DIVIDEND)
+        
+        Returns:
+            Dict with txn_id and realized_pl (sells)
+        
+        Raises:
+            ValueError: If the transaction is invalid (e.g. overselling)
+        """
+        ticker = ticker.upper()
+        txn_type = txn_type.upper()
+        if txn_type not in TXN_TYPES:
+            raise ValueError(f"Unknown transaction type '{txn_type}'; expected one of {TXN_TYPES}")
+        if txn_type in ('BUY', 'SELL') and (not quantity or quantity <= 0 or price is None):
+            raise ValueError(f"{txn_type} needs a positive quantity and a price")
+        if txn_type == 'SPLIT' and (not quantity or quantity <= 0):
+            raise ValueError("SPLIT needs a positive ratio in quantity")
+        
+        txn = {
+            'txn_type': txn_type,
+            'trade_date': _date_str(trade_date),
+            'quantity': quantity,
+            'price': price,
+            'fees': fees or 0.0,
+            'amount': amount
+        }
+        
+        with self._lock:
+            conn = self.db.conn
+            method = self.get_cost_basis_method(portfolio_id)
+            state = conn.execute("""
+                SELECT last_trade_date FROM PositionState WHERE portfolio_id = ? AND ticker = ?
+            """, (portfolio_id, ticker)).fetchone()
+            backdated = state is not None and state['last_trade_date'] and txn['trade_date'] < state['last_trade_date']
+            
+            with conn:
+                book = self._load_book(portfolio_id, ticker, method)
+                if not backdated:
+                    # Validate before anything is written
+                    realized = book.apply(dict(txn, txn_id=None))
+                cursor = conn.execute("""
+                    INSERT INTO Transactions (portfolio_id, ticker, txn_type, trade_date,
+                                              quantity, price, fees, amount)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (portfolio_id, ticker, txn_type, txn['trade_date'], quantity, price, txn['fees'], amount))
+                txn['txn_id'] = cursor.lastrowid
+                
+                if backdated:
+                    realized = self._rebuild_position(portfolio_id, ticker, method).get(txn['txn_id'])
+                else:
+                    for lot in book.lots:
+                        if lot['open_txn_id'] is None:
+                            lot['open_txn_id'] = txn['txn_id']
+                    if realized is not None:
+                        conn.execute("UPDATE Transactions SET realized_pl = ? WHERE txn_id = ?",
+                                     (realized, txn['txn_id']))
+                    self._save_book(portfolio_id, ticker, book, txn)
+        
+        return {'txn_id': txn['txn_id'], 'realized_pl': realized}
+    
+    def buy(self, portfolio_id: int, ticker: str, quantity: float, price: float,
+            trade_date: DateLike = None, fees: float = 0.0) -> Dict:
+        """Record a purchase (see record)."""
+        return self.record(portfolio_id, ticker, 'BUY', quantity, price, trade_date, fees)
+    
+    def sell(self, portfolio_id: int, ticker: str, quantity: float, price: float,
+             trade_date: DateLike = None, fees: float = 0.0) -> Dict:
+        """Record a sale; the result includes its realized P&L (see record)."""
+        return self.record(portfolio_id, ticker, 'SELL', quantity, price, trade_date, fees)
+    
+    def dividend(self, portfolio_id: int, ticker: str, amount: float,
+                 trade_date: DateLike = None, fees: float = 0.0) -> Dict:
+        """Record a cash dividend (see record)."""
+        return self.record(portfolio_id, ticker, 'DIVIDEND', trade_date=trade_date, fees=fees, amount=amount)
+    
+    def split(self, portfolio_id: int, ticker: str, ratio: float, trade_date: DateLike = None) -> Dict:
+        """Record a stock split, e.g. ratio=4 for a 4-for-1 split (see record)."""
+        return self.record(portfolio_id, ticker, 'SPLIT', ratio, trade_date=trade_date)
+    
+    def _rebuild_position(self, portfolio_id: int, ticker: str, method: str) -> Dict[int, float]:
+        """
+        Replay one position's history (caller holds the lock and a transaction).
+        
+        Returns:
+            Realized P&L per sell txn_id
+        """
+        conn = self.db.conn
+        txns = [dict(row) for row in conn.execute("""
+            SELECT txn_id, txn_type, trade_date, quantity, price, fees, amount FROM Transactions
+            WHERE portfolio_id = ? AND ticker = ?
+            ORDER BY trade_date, txn_id
+        """, (portfolio_id, ticker))]
+        
+        book = LotBook(method)
+        realized_by_txn = {}
+        for txn in txns:
+            realized = book.apply(txn)
+            if realized is not None:
+                realized_by_txn[txn['txn_id']] = realized
+        conn.executemany("UPDATE Transactions SET realized_pl = ? WHERE txn_id = ?",
+                         [(value, txn_id) for txn_id, value in realized_by_txn.items()])
+        
+        if txns:
+            last = max(txns, key=lambda t: (t['trade_date'], t['txn_id']))
+            self._save_book(portfolio_id, ticker, book, last)
+        else:
+            conn.execute("DELETE FROM TaxLots WHERE portfolio_id = ? AND ticker = ?", (portfolio_id, ticker))
+            conn.execute("DELETE FROM PositionState WHERE portfolio_id = ? AND ticker = ?", (portfolio_id, ticker))
+        return realized_by_txn
+    
+    def rebuild(self, portfolio_id: int, ticker: Optional[str] = None):
+        """
+        Recompute lots and totals from the transaction history.
+        
+        Args:
+            portfolio_id: Portfolio ID
+            ticker: One position, or every position in the portfolio
+        """
+        with self._lock:
+            conn = self.db.conn
+            method = self.get_cost_basis_method(portfolio_id)
+            if ticker:
+                tickers = [ticker.upper()]
+            else:
+                tickers = [row[0] for row in conn.execute(
+                    "SELECT DISTINCT ticker FROM Transactions WHERE portfolio_id = ?", (portfolio_id,)
+                )]
+            with conn:
+                for symbol in tickers:
+                    self._rebuild_position(portfolio_id, symbol, method)
+    
+    def get_positions(self, portfolio_id: int, prices: Optional[Dict[str, float]] = None,
+                      include_closed: bool = False) -> pd.DataFrame:
+        """
+        Get position totals, optionally valued at market prices.
+        
+        Args:
+            portfolio_id: Portfolio ID
+            prices: Optional ticker -> current price for unrealized P&L
+            include_closed: Include fully sold positions (for realized P&L)
+        
+        Returns:
+            DataFrame with ticker, quantity, cost_basis, average_cost,
+            realized_pl, dividends and, with prices, current_price,
+            market_value and unrealized_pl
+        """
+        query = """
+            SELECT ticker, quantity, cost_basis, realized_pl, dividends, fees, last_trade_date
+            FROM PositionState WHERE portfolio_id = ?
+        """
+        if not include_closed:
+            query += f" AND quantity > {QUANTITY_TOLERANCE}"
+        positions = pd.read_sql_query(query + " ORDER BY ticker", self.db.conn, params=(portfolio_id,))
+        
+        quantity = positions['quantity'].to_numpy()
+        positions['average_cost'] = np.divide(
+            positions['cost_basis'].to_numpy(), quantity,
+            out=np.zeros(len(positions)), where=quantity > QUANTITY_TOLERANCE
+        )
+        if prices is not None:
+            positions['current_price'] = positions['ticker'].map(prices).astype(float)
+            positions['market_value'] = quantity * positions['current_price']
+            positions['unrealized_pl'] = positions['market_value'] - positions['cost_basis']
+        return positions
+    
+    def get_summary(self, portfolio_id: int, prices: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Portfolio-level totals.
+        
+        Args:
+            portfolio_id: Portfolio ID
+            prices: Optional ticker -> current price
+        
+        Returns:
+            Dict with cost_basis, realized_pl, dividends, num_positions and,
+            with prices, market_value, unrealized_pl and total_pl
+        """
+        positions = self.get_positions(portfolio_id, prices, include_closed=True)
+        open_positions = positions[positions['quantity'] > QUANTITY_TOLERANCE]
+        summary = {
+            'cost_basis': float(open_positions['cost_basis'].sum()),
+            'realized_pl': float(positions['realized_pl'].sum()),
+            'dividends': float(positions['dividends'].sum()),
+            'num_positions': len(open_positions)
+        }
+        if prices is not None:
+            summary['market_value'] = float(open_positions['market_value'].sum())
+            summary['unrealized_pl'] = float(open_positions['unrealized_pl'].sum())
+            summary['total_pl'] = summary['realized_pl'] + summary['unrealized_pl'] + summary['dividends']
+        return summary
+    
+    def get_lots(self, portfolio_id: int, ticker: Optional[str] = None) -> pd.DataFrame:
+        """
+        Get open tax lots.
+        
+        Args:
+            portfolio_id: Portfolio ID
+            ticker: Optional ticker filter
+        
+        Returns:
+            DataFrame with ticker, open_txn_id, open_date, quantity, cost_per_share
+        """
+        query = """
+            SELECT ticker, open_txn_id, open_date, quantity, cost_per_share FROM TaxLots
+            WHERE portfolio_id = ?
+        """
+        params: list = [portfolio_id]
+        if ticker:
+            query += " AND ticker = ?"
+            params.append(ticker.upper())
+        return pd.read_sql_query(query + " ORDER BY ticker, open_date, lot_id", self.db.conn, params=params)
+    
+    def get_transactions(
+        self,
+        portfolio_id: int,
+        ticker: Optional[str] = None,
+        start_date: DateLike = None,
+        end_date: DateLike = None
+    ) -> pd.DataFrame:
+        """
+        Get ledger entries, oldest first.
+        
+        Args:
+            portfolio_id: Portfolio ID
+            ticker: Optional ticker filter
+            start_date: Optional first trade date
+            end_date: Optional last trade date
+        
+        Returns:
+            DataFrame of transactions with realized_pl on sells
+        """
+        query = "SELECT * FROM Transactions WHERE portfolio_id = ?"
+        params: list = [portfolio_id]
+        if ticker:
+            query += " AND ticker = ?"
+            params.append(ticker.upper())
+        if start_date:
+            query += " AND trade_date >= ?"
+            params.append(_date_str(start_date))
+        if end_date:
+            query += " AND trade_date <= ?"
+            params.append(_date_str(end_date))
+        return pd.read_sql_query(query + " ORDER BY trade_date, txn_id", self.db.conn, params=params)
+    
+    def to_tracker(self, portfolio_id: int, prices: Dict[str, float]):
+        """
+        Build a PortfolioTracker from open positions at average cost.
+        
+        Args:
+            portfolio_id: Portfolio ID
+            prices: Ticker -> current price (positions without a price use cost)
+        
+        Returns:
+            PortfolioTracker
+        """
+        from src.analysis.portfolio_tracker import PortfolioTracker
+        
+        positions = self.get_positions(portfolio_id)
+        tracker = PortfolioTracker(capacity=max(1, len(positions)))
+        for row in positions.itertuples(index=False):
+            tracker.add_holding(row.ticker, row.quantity, row.average_cost,
+                                prices.get(row.ticker, row.average_cost))
+        return tracker
+
+
+# Global instance
+_ledger = None
+_ledger_lock = threading.Lock()
+
+def get_transaction_ledger() -> TransactionLedger:
+    """Get or create global transaction ledger instance."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = TransactionLedger()
+    return _ledger
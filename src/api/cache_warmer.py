@@ -0,0 +1,394 @@
+"""
+Scheduled cache pre-warming for the configured stocks, indices and watchlists.
+Re-fetches quotes, history, fundamentals and news shortly before their TTLs
+expire, within each provider's rate budget, so common pages are served warm.
+Opt-in (CACHE_WARM_ENABLED): run it in one process per deployment, since every
+warming process spends the full budget.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from src.api import cached_data
+from src.utils.swr_cache import get_swr_cache
+from config.settings import (
+    DEFAULT_STOCKS, DEFAULT_INDICES, CACHE_WARM_INTERVAL_SECONDS,
+    CACHE_WARM_LEAD_FRACTION, CACHE_WARM_NEWS_INTERVAL_SECONDS, CACHE_WARM_RATE_LIMITS,
+    ALERT_CHECK_INTERVAL_SECONDS, NEWS_SOURCE_DEADLINES
+)
+from config.watchlists import DEFAULT_WATCHLISTS
+
+# Load environment variables (POLYGON_API_KEY decides whether Polygon is warmed)
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+NEWS = 'news'  # Provider of the news tasks, which span every news source
+
+
+class TokenBucket:
+    """Token bucket limiting the request rate against one provider."""
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the bucket (full).
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        """Add the tokens earned since the last update (caller holds the lock)."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def try_acquire(self, cost: float = 1.0) -> bool:
+        """
+        Take cost tokens if they are available now, without waiting.
+        
+        Returns:
+            True if the tokens were taken
+        """
+        with self._lock:
+            self._refill()
+            if self.tokens >= cost:
+                self.tokens -= cost
+                return True
+            return False
+    
+    def acquire(self, cost: float = 1.0, stop: Optional[threading.Event] = None) -> bool:
+        """
+        Wait until cost tokens are available and take them.
+        
+        Args:
+            cost: Tokens needed (upstream requests the task makes)
+            stop: Event that aborts the wait
+        
+        Returns:
+            False if the wait was aborted
+        """
+        cost = min(cost, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    return True
+                wait = (cost - self.tokens) / self.rate
+            if stop is not None:
+                if stop.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+class WarmTask:
+    """One cache entry kept warm: how to tell it is due and how to load it."""
+    
+    def __init__(
+        self,
+        name: str,
+        provider: str,
+        is_due: Callable[[], bool],
+        run: Callable[[], None],
+        cost: float = 1.0
+    ):
+        self.name = name
+        self.provider = provider
+        self.is_due = is_due
+        self.run = run
+        self.cost = cost
+        self.runs = 0
+        self.failures = 0
+        self.last_run: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+def watchlist_symbols() -> List[str]:
+    """Default stocks plus every watchlist symbol, de-duplicated in order."""
+    symbols = list(DEFAULT_STOCKS)
+    for tickers in DEFAULT_WATCHLISTS.values():
+        symbols.extend(tickers)
+    return list(dict.fromkeys(symbols))
+
+
+class CacheWarmer:
+    """Background scheduler keeping the common cache entries warm."""
+    
+    def __init__(
+        self,
+        interval_seconds: float = CACHE_WARM_INTERVAL_SECONDS,
+        lead_fraction: float = CACHE_WARM_LEAD_FRACTION,
+        rate_limits: Optional[Dict[str, Tuple[float, float]]] = None
+    ):
+        """
+        Initialize the warmer.
+        
+        Args:
+            interval_seconds: Pause between scans for due entries
+            lead_fraction: Re-fetch once an entry is this far through its TTL
+            rate_limits: Per-provider (requests per second, burst)
+        """
+        self.interval_seconds = interval_seconds
+        self.lead_fraction = lead_fraction
+        rate_limits = rate_limits if rate_limits is not None else CACHE_WARM_RATE_LIMITS
+        self.buckets = {
+            provider: TokenBucket(rate, burst) for provider, (rate, burst) in rate_limits.items()
+        }
+        self.tasks = self.build_tasks()
+        self.cache = get_swr_cache()
+        
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._pending = set(self.providers())
+        self.warmed_at: Optional[float] = None
+        self._baseline: Optional[Dict] = None
+    
+    def _swr_task(self, name: str, provider: str, request: cached_data.CachedRequest, cost: float = 1.0) -> WarmTask:
+        key, loader, data_type = request
+        cache = get_swr_cache()
+        return WarmTask(
+            name, provider,
+            is_due=lambda: cache.is_due(key, data_type, self.lead_fraction),
+            run=lambda: cache.refresh(key, loader, data_type),
+            cost=cost
+        )
+    
+    def _news_task(self, symbol: str) -> WarmTask:
+        """
+        Incremental news fetch for one symbol.
+        
+        Each news source has its own bucket sized to its daily quota. A run
+        queries only the configured sources that have a token left, one token
+        each; the others keep their high-water marks and catch up later.
+        """
+        task = None
+        
+        def is_due():
+            return task.last_run is None or time.time() - task.last_run >= CACHE_WARM_NEWS_INTERVAL_SECONDS
+        
+        def run():
+            from src.api.news_store import get_news_store
+            store = get_news_store()
+            sources = [
+                name for name in store.fetcher.configured_sources()
+                if name in self.buckets and self.buckets[name].try_acquire()
+            ]
+            if not sources:
+                return
+            info = get_swr_cache().peek((cached_data.YFINANCE, 'fundamentals', symbol)) or {}
+            store.fetch_incremental(symbol, info.get('company_name', symbol), sources=sources)
+        
+        # Charged per source inside run, so the 'news' thread has no bucket of its own
+        task = WarmTask(f"news:{symbol}", NEWS, is_due, run, cost=0)
+        return task
+    
+    def _alert_task(self) -> WarmTask:
+        """
+        Check alerts against fresh quotes, one yfinance request per symbol.
+        
+        Each round walks every alerted symbol in chunks no larger than the
+        bucket's burst, one chunk per warm pass, so large alert books are
+        spread across passes instead of bypassing the rate budget. A new
+        round starts ALERT_CHECK_INTERVAL_SECONDS after the previous one.
+        """
+        bucket = self.buckets.get('yfinance')
+        chunk_size = max(1, int(bucket.capacity)) if bucket else 1
+        task = None
+        state = {'pending': [], 'round_started': None}
+        
+        def is_due():
+            if not state['pending']:
+                started = state['round_started']
+                if started is not None and time.time() - started < ALERT_CHECK_INTERVAL_SECONDS:
+                    return False
+                from src.analysis.alert_engine import get_alert_engine
+                state['pending'] = get_alert_engine().symbols()
+                state['round_started'] = time.time()
+                if not state['pending']:
+                    return False
+            task.cost = min(chunk_size, len(state['pending']))
+            return True
+        
+        def run():
+            from src.analysis.alert_engine import get_alert_engine
+            from src.api.data_fetcher import DataFetcher
+            chunk = state['pending'][:chunk_size]
+            del state['pending'][:chunk_size]
+            get_alert_engine().evaluate(DataFetcher().get_multiple_tickers(chunk))
+        
+        task = WarmTask('alerts', 'yfinance', is_due, run)
+        return task
+    
+    def build_tasks(self) -> List[WarmTask]:
+        """
+        Build warm tasks for the market overview pages, alert checks and
+        every watchlist symbol.
+        
+        Returns:
+            Tasks in priority order (page-level quotes first)
+        """
+        stocks = list(DEFAULT_STOCKS)
+        tasks = [
+            self._swr_task('indices', 'yfinance',
+                           cached_data.market_indices_request(list(DEFAULT_INDICES.keys())),
+                           cost=len(DEFAULT_INDICES)),
+            self._swr_task('gainers_losers', 'yfinance',
+                           cached_data.gainers_losers_request(stocks), cost=len(stocks)),
+            self._swr_task('sectors', 'yfinance',
+                           cached_data.sector_performance_request(stocks), cost=len(stocks)),
+            self._swr_task('history:^GSPC', 'yfinance', cached_data.history_delta_request("^GSPC", period="1mo")),
+        ]
+        tasks.append(self._alert_task())
+        if os.getenv('POLYGON_API_KEY'):
+            tasks.append(self._swr_task('polygon_quotes', 'polygon',
+                                        cached_data.polygon_quotes_request(stocks[:4]), cost=4))
+        
+        for symbol in watchlist_symbols():
+            tasks.append(self._swr_task(f"history:{symbol}", 'yfinance', cached_data.history_delta_request(symbol)))
+            tasks.append(self._swr_task(f"fundamentals:{symbol}", 'yfinance', cached_data.stock_info_request(symbol)))
+            tasks.append(self._news_task(symbol))
+        
+        news_budgeted = any(name in self.buckets for name in NEWS_SOURCE_DEADLINES)
+        return [
+            task for task in tasks
+            if task.provider in self.buckets or (task.provider == NEWS and news_budgeted)
+        ]
+    
+    def providers(self) -> List[str]:
+        """Providers with tasks, one warm thread each."""
+        return list(dict.fromkeys(task.provider for task in self.tasks))
+    
+    def run_pending(self, provider: str) -> int:
+        """
+        Run every due task for one provider, waiting for rate budget as needed.
+        
+        Args:
+            provider: Provider whose tasks to run
+        
+        Returns:
+            Number of tasks run
+        """
+        bucket = self.buckets.get(provider)  # None for tasks charging their own buckets
+        count = 0
+        for task in self.tasks:
+            if task.provider != provider or self._stop.is_set():
+                continue
+            try:
+                if not task.is_due():
+                    continue
+            except Exception as e:
+                logger.error(f"Cache warm check '{task.name}' failed: {e}")
+                continue
+            if bucket is not None and not bucket.acquire(task.cost, self._stop):
+                break
+            try:
+                task.run()
+                task.last_error = None
+            except Exception as e:
+                task.failures += 1
+                task.last_error = str(e)
+                logger.error(f"Cache warm task '{task.name}' failed: {e}")
+            task.runs += 1
+            task.last_run = time.time()
+            count += 1
+        return count
+    
+    def _provider_loop(self, provider: str):
+        """Scan one provider's tasks until stopped (one thread per provider)."""
+        while not self._stop.is_set():
+            start = time.time()
+            count = self.run_pending(provider)
+            if count:
+                logger.info(f"Warmed {count} '{provider}' cache entries in {time.time() - start:.1f}s")
+            self._mark_pass_done(provider)
+            self._stop.wait(self.interval_seconds)
+    
+    def _mark_pass_done(self, provider: str):
+        """Record the end of warm-up once every provider finished a first pass."""
+        with self._lock:
+            if self.warmed_at is not None:
+                return
+            self._pending.discard(provider)
+            if not self._pending:
+                self.warmed_at = time.time()
+                self._baseline = self.cache.stats()
+                logger.info("Cache warm-up complete")
+    
+    def start(self):
+        """Start the provider threads (no-op if already running)."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for provider in self.providers():
+                thread = threading.Thread(
+                    target=self._provider_loop, args=(provider,),
+                    name=f"cache-warmer-{provider}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"Cache warmer started with {len(self.tasks)} tasks")
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the provider threads."""
+        self._stop.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+    
+    def stats(self) -> Dict:
+        """
+        Get warm-up progress and the page hit rate since warm-up.
+        
+        Returns:
+            Dict with warmed_at, tasks, runs, failures and, after warm-up,
+            hit_rate (fresh hits / all page reads since warm-up)
+        """
+        stats = {
+            'warmed_at': self.warmed_at,
+            'tasks': len(self.tasks),
+            'runs': sum(task.runs for task in self.tasks),
+            'failures': sum(task.failures for task in self.tasks),
+            'hit_rate': None
+        }
+        if self._baseline is not None:
+            current = self.cache.stats()
+            deltas = {k: current[k] - self._baseline[k] for k in ('hits', 'stale_hits', 'misses')}
+            reads = sum(deltas.values())
+            stats.update(deltas)
+            stats['hit_rate'] = deltas['hits'] / reads if reads else None
+        return stats
+
+
+# Global instance
+_warmer = None
+_warmer_lock = threading.Lock()
+
+def get_cache_warmer() -> CacheWarmer:
+    """Get or create global cache warmer instance."""
+    global _warmer
+    with _warmer_lock:
+        if _warmer is None:
+            _warmer = CacheWarmer()
+    return _warmer
+
+
+def start_cache_warmer() -> CacheWarmer:
+    """Start the global cache warmer once per process (safe on every rerun)."""
+    warmer = get_cache_warmer()
+    warmer.start()
+    return warmer
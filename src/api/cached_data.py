@@ -0,0 +1,201 @@
+"""
+Cached market data accessors for the Streamlit pages.
+Each accessor reads through the stale-while-revalidate cache with a TTL
+chosen by data type, so pages render immediately from the last good value.
+The *_request helpers expose the same keys and loaders to the cache warmer.
+Loaders read through the fetchers' shared backend cache, so replicas share one
+fetch per TTL; only keys passed to invalidate() bypass it on their next load.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from src.api.data_fetcher import DataFetcher
+from src.utils.swr_cache import get_swr_cache
+
+YFINANCE = 'yfinance'
+POLYGON = 'polygon'
+
+HISTORY_DELTA_PERIOD = "5d"  # Window re-fetched when topping up cached history
+
+# (cache key, loader, data type)
+CachedRequest = Tuple[Hashable, Callable[[], Any], str]
+
+_forced: Set[Hashable] = set()  # Keys invalidated since their last load
+_forced_lock = threading.Lock()
+
+
+def _take_forced(key: Hashable) -> bool:
+    """Whether key was invalidated since its last load (clears the flag)."""
+    with _forced_lock:
+        if key in _forced:
+            _forced.discard(key)
+            return True
+        return False
+
+
+def _read(request: CachedRequest) -> Any:
+    key, loader, data_type = request
+    return get_swr_cache().get(key, loader, data_type=data_type)
+
+
+def market_indices_request(indices: List[str]) -> CachedRequest:
+    key = (YFINANCE, 'quotes', 'indices', tuple(indices))
+    return (
+        key,
+        lambda: DataFetcher().get_market_indices(indices, refresh=_take_forced(key)),
+        'quotes'
+    )
+
+
+def gainers_losers_request(tickers: List[str]) -> CachedRequest:
+    key = (YFINANCE, 'quotes', 'gainers_losers', tuple(tickers))
+    return (
+        key,
+        lambda: DataFetcher().get_top_gainers_losers(tickers, refresh=_take_forced(key)),
+        'quotes'
+    )
+
+
+def sector_performance_request(tickers: List[str]) -> CachedRequest:
+    key = (YFINANCE, 'sectors', tuple(tickers))
+    return (
+        key,
+        lambda: DataFetcher().get_sector_performance(tickers, refresh=_take_forced(key)),
+        'sectors'
+    )
+
+
+def historical_data_request(ticker: str, period: str = "1y", interval: str = "1d") -> CachedRequest:
+    key = (YFINANCE, 'history', ticker, period, interval)
+    return (
+        key,
+        lambda: DataFetcher().get_historical_data(
+            ticker, period=period, interval=interval, refresh=_take_forced(key)
+        ),
+        'history'
+    )
+
+
+def history_delta_request(ticker: str, period: str = "1y", interval: str = "1d") -> CachedRequest:
+    """
+    Like historical_data_request, but when history is already cached only the
+    last few days are fetched and merged into it.
+    """
+    key, full_loader, data_type = historical_data_request(ticker, period, interval)
+    
+    def loader():
+        cached = get_swr_cache().peek(key)
+        if cached is None or cached.empty:
+            return full_loader()
+        recent = DataFetcher().get_historical_data(
+            ticker, period=HISTORY_DELTA_PERIOD, interval=interval, refresh=_take_forced(key)
+        )
+        if recent is None or recent.empty:
+            return cached
+        # Histories carry a RangeIndex and a 'date' column; recent rows replace
+        # cached rows for the same bars (today's bar changes intraday)
+        merged = (
+            pd.concat([cached, recent], ignore_index=True)
+            .drop_duplicates('date', keep='last')
+            .sort_values('date')
+        )
+        start = merged['date'].max() - (cached['date'].max() - cached['date'].min())
+        return merged[merged['date'] >= start].reset_index(drop=True)
+    
+    return key, loader, data_type
+
+
+def stock_info_request(ticker: str) -> CachedRequest:
+    key = (YFINANCE, 'fundamentals', ticker)
+    return (
+        key,
+        lambda: DataFetcher().get_stock_info(ticker, refresh=_take_forced(key)),
+        'fundamentals'
+    )
+
+
+def polygon_quotes_request(tickers: List[str], max_tickers: int = 4) -> CachedRequest:
+    key = (POLYGON, 'quotes', tuple(tickers[:max_tickers]))
+    
+    def loader():
+        from src.api.polygon_fetcher import PolygonDataFetcher  # Needs POLYGON_API_KEY
+        return PolygonDataFetcher().get_multiple_tickers(
+            tickers, max_tickers=max_tickers, refresh=_take_forced(key)
+        )
+    
+    return key, loader, 'quotes'
+
+
+def get_market_indices(indices: List[str]) -> pd.DataFrame:
+    """Quotes for market indices (data type 'quotes')."""
+    return _read(market_indices_request(indices))
+
+
+def get_top_gainers_losers(tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """Top gainers and losers among tickers (data type 'quotes')."""
+    return _read(gainers_losers_request(tickers))
+
+
+def get_sector_performance(tickers: List[str]) -> pd.DataFrame:
+    """Average change by sector (data type 'sectors')."""
+    return _read(sector_performance_request(tickers))
+
+
+def get_historical_data(ticker: str, period: str = "1y", interval: str = "1d") -> Optional[pd.DataFrame]:
+    """Price history for a ticker (data type 'history')."""
+    return _read(historical_data_request(ticker, period, interval))
+
+
+def get_stock_info(ticker: str) -> Optional[Dict]:
+    """Company profile and fundamentals (data type 'fundamentals')."""
+    return _read(stock_info_request(ticker))
+
+
+def get_polygon_quotes(tickers: List[str], max_tickers: int = 4) -> pd.DataFrame:
+    """Latest daily quotes from Polygon.io (data type 'quotes')."""
+    return _read(polygon_quotes_request(tickers, max_tickers))
+
+
+def invalidate(provider: str, data_type: Optional[str] = None) -> int:
+    """
+    Mark cached values stale for one provider (and optionally one data type).
+    
+    Readers keep getting the old values while they are refreshed in the
+    background, and the refresh bypasses the shared backend cache; nothing
+    else in the app is cleared.
+    
+    Args:
+        provider: 'yfinance' or 'polygon'
+        data_type: Restrict to 'quotes', 'history', 'sectors' or 'fundamentals'
+    
+    Returns:
+        Number of keys invalidated
+    """
+    def matches(key: Hashable) -> bool:
+        return key[0] == provider and (data_type is None or key[1] == data_type)
+    
+    cache = get_swr_cache()
+    with _forced_lock:
+        _forced.update(k for k in cache.keys() if matches(k))
+    return cache.invalidate_where(matches)
+
+
+def cache_status(provider: str) -> Tuple[Optional[pd.Timestamp], bool]:
+    """
+    Oldest fetch time among a provider's cached values and whether any of
+    them is stale or being refreshed.
+    
+    Args:
+        provider: 'yfinance' or 'polygon'
+    
+    Returns:
+        Tuple of (oldest fetch time or None, refreshing flag)
+    """
+    cache = get_swr_cache()
+    infos = [cache.info(k) for k in cache.keys() if k[0] == provider]
+    infos = [i for i in infos if i]
+    if not infos:
+        return None, False
+    return min(i['fetched_at'] for i in infos), any(i['refreshing'] or i['stale'] for i in infos)
@@ -8,6 +8,10 @@ from datetime import datetime, timedelta
 from typing import Optional, List, Dict
 import logging
 
+from src.utils.cache_backend import cached
+from src.utils.single_flight import single_flight
+from config.settings import CACHE_TTL, SWR_TTLS
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,6 +24,8 @@ class DataFetcher:
         """Initialize the data fetcher."""
         pass
     
+    @cached("yfinance", ttl=CACHE_TTL)
+    @single_flight("yfinance")
     def get_stock_info(self, ticker: str) -> Optional[Dict]:
         """
         Fetch basic information about a stock.
@@ -53,6 +59,8 @@ class DataFetcher:
             logger.error(f"Error fetching info for {ticker}: {e}")
             return None
     
+    @cached("yfinance", ttl=CACHE_TTL)
+    @single_flight("yfinance")
     def get_historical_data(
         self, 
         ticker: str, 
@@ -89,6 +97,7 @@ class DataFetcher:
             logger.error(f"Error fetching historical data for {ticker}: {e}")
             return None
     
+    @single_flight("yfinance")
     def get_current_price(self, ticker: str) -> Optional[Dict]:
         """
         Get current/latest price information for a stock.
@@ -111,6 +120,7 @@ class DataFetcher:
                 'day_high': info.get('dayHigh', 0),
                 'day_low': info.get('dayLow', 0),
                 'volume': info.get('volume', 0),
+                'avg_volume': info.get('averageVolume', 0),
                 'market_cap': info.get('marketCap', 0),
                 'change': info.get('regularMarketChange', 0),
                 'change_percent': info.get('regularMarketChangePercent', 0)
@@ -141,6 +151,7 @@ class DataFetcher:
             logger.error(f"Error fetching multiple tickers: {e}")
             return pd.DataFrame()
     
+    @cached("yfinance", ttl=SWR_TTLS["quotes"])
     def get_market_indices(self, indices: List[str]) -> pd.DataFrame:
         """
         Fetch data for major market indices.
@@ -153,6 +164,7 @@ class DataFetcher:
         """
         return self.get_multiple_tickers(indices)
     
+    @cached("yfinance", ttl=SWR_TTLS["quotes"])
     def get_top_gainers_losers(self, tickers: List[str]) -> Dict[str, pd.DataFrame]:
         """
         Identify top gainers and losers from a list of tickers.
@@ -184,6 +196,7 @@ class DataFetcher:
             logger.error(f"Error identifying gainers/losers: {e}")
             return {'gainers': pd.DataFrame(), 'losers': pd.DataFrame()}
     
+    @cached("yfinance", ttl=SWR_TTLS["sectors"])
     def get_sector_performance(self, tickers: List[str]) -> pd.DataFrame:
         """
         Calculate sector performance based on provided tickers.
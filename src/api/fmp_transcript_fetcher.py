@@ -1,11 +1,15 @@
 """
 FMP Transcript Fetcher - Get earnings call transcripts from Financial Modeling Prep
 """
-import requests
-import streamlit as st
 from datetime import datetime
 import time
 
+from src.api.http_client import get_http_client
+from src.api.transcript_store import get_transcript_store, make_transcript_key
+from src.utils.cache_backend import cached
+from src.utils.search_index import get_search_index
+from config.settings import CACHE_TTL
+
 
 class FMPTranscriptFetcher:
     """Fetcher for FMP earnings transcripts"""
@@ -19,11 +23,25 @@ class FMPTranscriptFetcher:
         """
         self.api_key = api_key
         self.base_url = 'https://financialmodelingprep.com'
+        self.store = get_transcript_store()
         
     def _rate_limit_wait(self, wait_time: float = 0.5):
         """Wait between API calls to avoid rate limits"""
         time.sleep(wait_time)
     
+    def _index_transcript(self, transcript: dict):
+        """Add fetched transcript content to the full-text search index"""
+        try:
+            get_search_index().index_transcript(
+                transcript.get('symbol'),
+                transcript.get('year'),
+                transcript.get('quarter'),
+                transcript.get('content'),
+                call_date=transcript.get('date')
+            )
+        except Exception as e:
+            print(f"Could not index transcript: {e}")
+    
     def get_available_transcripts(self, limit: int = 100):
         """
         Get list of available earnings transcripts
@@ -41,11 +59,12 @@ class FMPTranscriptFetcher:
                 'limit': limit
             }
             
-            response = requests.get(url, params=params, timeout=15)
+            response = get_http_client().get(url, params=params, timeout=15)
             
             if response.status_code == 200:
                 data = response.json()
                 if isinstance(data, list):
+                    self.store.update_catalog(data)
                     return data
                 else:
                     print(f"FMP API returned unexpected format: {data}")
@@ -58,15 +77,53 @@ class FMPTranscriptFetcher:
             print(f"Error fetching available transcripts: {e}")
             return []
     
-    @st.cache_data(ttl=3600)
+    def _fetch_content(self, symbol: str, year: int, quarter: int):
+        """
+        Request transcript content for one quarter, trying each endpoint in turn
+        
+        Returns:
+            Transcript dict with content, or None if no endpoint returned it
+        """
+        endpoints_to_try = [
+            f'/api/v3/earning_call_transcript/{symbol}?year={year}&quarter={quarter}',
+            f'/api/v4/batch_earning_call_transcript/{symbol}?year={year}&quarter={quarter}',
+        ]
+        
+        for endpoint_url in endpoints_to_try:
+            try:
+                url = f'{self.base_url}{endpoint_url}&apikey={self.api_key}'
+                print(f"Trying: {endpoint_url}")
+                
+                response = get_http_client().get(url, timeout=15)
+                
+                if response.status_code == 200:
+                    data = response.json()
+                    
+                    # Check if we got actual content
+                    if isinstance(data, list) and len(data) > 0:
+                        if data[0].get('content'):
+                            return data[0]
+                    elif isinstance(data, dict) and data.get('content'):
+                        return data
+                
+                self._rate_limit_wait()
+            
+            except Exception as e:
+                print(f"Endpoint failed: {e}")
+                continue
+        
+        return None
+    
+    @cached('fmp', ttl=CACHE_TTL)
     def get_transcript(_self, symbol: str, year: int = None, quarter: int = None):
         """
         Get earnings call transcript for a specific company
         
         Strategy:
-        1. First get the list of available transcripts
-        2. Find the most recent one for this symbol
-        3. Then fetch the specific transcript with year/quarter
+        1. Resolve (symbol, year, quarter) from the local transcript catalog,
+           refreshing the catalog from FMP only when it is stale
+        2. Return stored content from disk if this transcript was fetched before
+        3. Otherwise fetch the content from FMP and store it compressed
         
         Args:
             symbol: Stock ticker symbol
@@ -77,68 +134,47 @@ class FMPTranscriptFetcher:
             Dict with transcript data or None on error
         """
         try:
-            # Step 1: Get list of available transcripts to find the right one
-            print(f"Fetching available transcripts for {symbol}...")
-            available = _self.get_available_transcripts(limit=100)
+            store = _self.store
             
-            if not available:
-                print(f"No transcripts available from API")
-                return None
-            
-            # Step 2: Find transcripts for this symbol
-            symbol_transcripts = [t for t in available if t.get('symbol', '').upper() == symbol.upper()]
+            # Step 1: Find the transcript in the catalog
+            key = make_transcript_key(symbol, year, quarter)
+            if key is None:
+                if store.is_stale():
+                    print(f"Refreshing transcript catalog...")
+                    _self.get_available_transcripts(limit=100)
+                key = store.latest_key(symbol)
             
-            if not symbol_transcripts:
-                print(f"No transcript found for {symbol} in available list")
+            if key is None:
+                print(f"No transcript found for {symbol} in catalog")
                 return None
             
-            # Get the most recent one
-            latest = symbol_transcripts[0]
-            transcript_year = latest.get('fiscalYear') or latest.get('year')
-            transcript_quarter = latest.get('period', 'Q1').replace('Q', '')
-            
+            symbol, transcript_year, transcript_quarter = key
             print(f"Found transcript: {symbol} Q{transcript_quarter} {transcript_year}")
             
-            # Step 3: Try to fetch the actual transcript content
-            # Method 1: Try with year and quarter
-            endpoints_to_try = [
-                f'/api/v3/earning_call_transcript/{symbol}?year={transcript_year}&quarter={transcript_quarter}',
-                f'/api/v4/batch_earning_call_transcript/{symbol}?year={transcript_year}&quarter={transcript_quarter}',
-            ]
+            # Step 2: Stored content needs no network call
+            stored = store.get(key)
+            if stored is not None:
+                print(f"✅ Loaded stored transcript content")
+                return stored
             
-            for endpoint_url in endpoints_to_try:
-                try:
-                    url = f'{_self.base_url}{endpoint_url}&apikey={_self.api_key}'
-                    print(f"Trying: {endpoint_url}")
-                    
-                    response = requests.get(url, timeout=15)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        # Check if we got actual content
-                        if isinstance(data, list) and len(data) > 0:
-                            transcript = data[0]
-                            if transcript.get('content'):
-                                print(f"✅ Successfully fetched transcript content!")
-                                return transcript
-                        elif isinstance(data, dict) and data.get('content'):
-                            print(f"✅ Successfully fetched transcript content!")
-                            return data
-                    
-                    _self._rate_limit_wait()
-                    
-                except Exception as e:
-                    print(f"Endpoint failed: {e}")
-                    continue
+            # Step 3: Try to fetch the actual transcript content
+            if store.should_attempt(key):
+                transcript = _self._fetch_content(symbol, transcript_year, transcript_quarter)
+                if transcript is not None:
+                    print(f"✅ Successfully fetched transcript content!")
+                    store.save(key, transcript)
+                    _self._index_transcript(transcript)
+                    return transcript
+                store.record_attempt(key)
             
             # If we couldn't get the content, return the metadata at least
+            entry = store.get_entry(key) or {}
             print(f"⚠️ Could only get transcript metadata, not full content")
             return {
-                'symbol': latest.get('symbol'),
+                'symbol': symbol,
                 'quarter': transcript_quarter,
                 'year': transcript_year,
-                'date': latest.get('date', 'Unknown'),
+                'date': entry.get('call_date') or 'Unknown',
                 'content': None  # Will trigger fallback to sample data
             }
                 
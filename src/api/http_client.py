@@ -0,0 +1,215 @@
+"""
+Shared HTTP client for the REST fetchers.
+Keeps a keep-alive connection pool per host, retries 429/5xx responses with
+backoff (honoring Retry-After), caps concurrent requests per host and offers
+an asyncio API for fanning out requests.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    HTTP_MAX_RETRIES, HTTP_BACKOFF_SECONDS, HTTP_MAX_BACKOFF_SECONDS,
+    HTTP_POOL_SIZE, HTTP_MAX_CONCURRENCY_PER_HOST, HTTP_HOST_CONCURRENCY
+)
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+    
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+    
+    Returns:
+        Seconds to wait, or None if absent/unparseable
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HttpClient:
+    """Pooled, retrying HTTP client with per-host concurrency limits."""
+    
+    def __init__(
+        self,
+        max_retries: int = HTTP_MAX_RETRIES,
+        backoff_seconds: float = HTTP_BACKOFF_SECONDS,
+        max_backoff_seconds: float = HTTP_MAX_BACKOFF_SECONDS,
+        pool_size: int = HTTP_POOL_SIZE,
+        max_per_host: int = HTTP_MAX_CONCURRENCY_PER_HOST,
+        host_limits: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize the client.
+        
+        Args:
+            max_retries: Retries after the first attempt for 429/5xx and connection errors
+            backoff_seconds: Base delay for exponential backoff
+            max_backoff_seconds: Upper bound on any single wait (including Retry-After)
+            pool_size: Keep-alive connections kept per host
+            max_per_host: Default cap on concurrent requests per host
+            host_limits: Per-host overrides of max_per_host
+        """
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.pool_size = pool_size
+        self.max_per_host = max_per_host
+        self.host_limits = host_limits if host_limits is not None else HTTP_HOST_CONCURRENCY
+        
+        self._sessions: Dict[str, requests.Session] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+    
+    def _host_state(self, host: str):
+        """Get (creating on first use) the session and semaphore for a host."""
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+                self._semaphores[host] = threading.BoundedSemaphore(
+                    self.host_limits.get(host, self.max_per_host)
+                )
+            return session, self._semaphores[host]
+    
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Delay before the next attempt."""
+        delay = None
+        if response is not None:
+            delay = parse_retry_after(response.headers.get('Retry-After'))
+        if delay is None:
+            # Exponential backoff with jitter so concurrent callers spread out
+            delay = self.backoff_seconds * (2 ** attempt) * (0.5 + random.random())
+        return min(delay, self.max_backoff_seconds)
+    
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: float = 15,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Send a request, retrying transient failures.
+        
+        A 429/5xx response that survives all retries is returned (not raised),
+        so callers keep checking status_code as before.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            params: Query parameters
+            headers: Request headers
+            timeout: Timeout in seconds per attempt
+            **kwargs: Passed through to requests.Session.request
+        
+        Returns:
+            Final response
+        
+        Raises:
+            requests.RequestException: If the last attempt failed to connect
+        """
+        host = urlsplit(url).netloc
+        session, semaphore = self._host_state(host)
+        
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                with semaphore:
+                    response = session.request(
+                        method, url, params=params, headers=headers, timeout=timeout, **kwargs
+                    )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"{method} {host} failed ({e}); retrying")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+                logger.warning(f"{method} {host} returned {response.status_code}; retrying")
+            
+            time.sleep(self._backoff(attempt, response))
+        
+        return response
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request (see request)."""
+        return self.request('GET', url, **kwargs)
+    
+    async def arequest(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request without blocking the event loop (see request)."""
+        return await asyncio.to_thread(self.request, method, url, **kwargs)
+    
+    async def aget(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request without blocking the event loop."""
+        return await self.arequest('GET', url, **kwargs)
+    
+    async def gather_get(self, calls: List[Dict]) -> List:
+        """
+        Run several GET requests concurrently (still bounded per host).
+        
+        Args:
+            calls: List of dicts with 'url' and optional request keyword arguments
+        
+        Returns:
+            Responses (or the exception raised) in the same order as calls
+        """
+        return await asyncio.gather(
+            *(self.aget(**call) for call in calls),
+            return_exceptions=True
+        )
+    
+    def get_many(self, calls: List[Dict]) -> List:
+        """
+        Synchronous wrapper around gather_get for code outside an event loop.
+        
+        Args:
+            calls: List of dicts with 'url' and optional request keyword arguments
+        
+        Returns:
+            Responses (or the exception raised) in the same order as calls
+        """
+        return asyncio.run(self.gather_get(calls))
+
+
+# Global instance
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """Get or create global HTTP client instance (shared connection pools)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+    return _client
@@ -0,0 +1,343 @@
+"""
+Multi-source news aggregation.
+Queries every configured news source concurrently with per-source deadlines,
+normalizes articles to one schema and collapses syndicated near-duplicates.
+"""
+import logging
+import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A source takes (ticker, company_name, days_back, since) and returns raw
+# article dicts; since is None or the datetime of the newest article already seen
+NewsSource = Callable[[str, str, int, Optional[datetime]], List[Dict]]
+
+DEFAULT_SOURCE_DEADLINE = 8.0  # seconds
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def parse_published_at(value) -> Optional[datetime]:
+    """
+    Parse a provider timestamp into a naive UTC datetime.
+    
+    Args:
+        value: ISO string, 'YYYY-MM-DD HH:MM:SS' string or datetime
+    
+    Returns:
+        Parsed datetime, or None if it cannot be parsed
+    """
+    if not value:
+        return None
+    try:
+        ts = pd.Timestamp(value)
+    except (ValueError, TypeError):
+        return None
+    if pd.isna(ts):
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts.to_pydatetime()
+
+
+def normalize_article(raw: Dict, provider: str, ticker: str) -> Optional[Dict]:
+    """
+    Map a provider-specific article dict onto the shared article schema.
+    
+    Args:
+        raw: Article as returned by the provider
+        provider: Source name (e.g. 'newsapi', 'fmp', 'newsdata')
+        ticker: Ticker the article was fetched for
+    
+    Returns:
+        Normalized article dict, or None if it has no title
+    """
+    title = (raw.get('title') or '').strip()
+    if not title:
+        return None
+    
+    source = raw.get('source')
+    if isinstance(source, dict):  # NewsAPI nests the outlet name
+        source = source.get('name')
+    
+    published = parse_published_at(
+        raw.get('published_at') or raw.get('publishedAt')
+        or raw.get('publishedDate') or raw.get('pubDate')
+    )
+    
+    return {
+        'title': title,
+        'description': (raw.get('description') or raw.get('text') or '').strip(),
+        'url': raw.get('url') or raw.get('link') or '',
+        'source': source or raw.get('site') or raw.get('source_id') or provider,
+        'provider': provider,
+        'published_at': published.strftime('%Y-%m-%d %H:%M:%S') if published else '',
+        'ticker': ticker.upper(),
+    }
+
+
+class MinHashDeduplicator:
+    """Near-duplicate detection with shingled MinHash and LSH banding."""
+    
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        threshold: float = 0.6,
+        seed: int = 42
+    ):
+        """
+        Initialize the deduplicator.
+        
+        Args:
+            num_perm: Number of MinHash permutations (signature length)
+            bands: LSH bands; num_perm must be divisible by bands
+            shingle_size: Character shingle length
+            threshold: Estimated Jaccard similarity above which texts are duplicates
+            seed: Random seed for the permutation coefficients
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+    
+    def _shingles(self, text: str) -> np.ndarray:
+        """Hash the character shingles of normalized text."""
+        text = re.sub(r'[^a-z0-9 ]+', '', text.lower())
+        text = re.sub(r'\s+', ' ', text).strip()
+        k = self.shingle_size
+        if len(text) <= k:
+            grams = {text}
+        else:
+            grams = {text[i:i + k] for i in range(len(text) - k + 1)}
+        return np.fromiter(
+            (zlib.crc32(g.encode('utf-8')) for g in grams),
+            dtype=np.uint64,
+            count=len(grams)
+        )
+    
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a text.
+        
+        Args:
+            text: Input text
+        
+        Returns:
+            Array of num_perm minimum hash values
+        """
+        hashes = self._shingles(text)
+        # (num_perm x shingles) universal hashes, min over shingles
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1)
+    
+    def similarity(self, sig1: np.ndarray, sig2: np.ndarray) -> float:
+        """Estimate Jaccard similarity from two signatures."""
+        return float(np.mean(sig1 == sig2))
+    
+    def deduplicate(self, texts: List[str]) -> List[int]:
+        """
+        Find the representative for each text.
+        
+        Args:
+            texts: Texts in priority order (earlier texts win)
+        
+        Returns:
+            List where entry i is the index of the text that i duplicates
+            (i itself if it is unique)
+        """
+        buckets: Dict[tuple, List[int]] = {}
+        signatures = []
+        representative = []
+        
+        for i, text in enumerate(texts):
+            sig = self.signature(text)
+            signatures.append(sig)
+            
+            band_keys = [
+                (b, sig[b * self.rows:(b + 1) * self.rows].tobytes())
+                for b in range(self.bands)
+            ]
+            
+            match = i
+            candidates = {j for key in band_keys for j in buckets.get(key, [])}
+            for j in sorted(candidates):
+                if self.similarity(sig, signatures[j]) >= self.threshold:
+                    match = j
+                    break
+            
+            representative.append(match)
+            if match == i:
+                for key in band_keys:
+                    buckets.setdefault(key, []).append(i)
+        
+        return representative
+
+
+class NewsAggregator:
+    """Fetches from several news sources in parallel and merges the results."""
+    
+    def __init__(
+        self,
+        sources: Dict[str, NewsSource],
+        deadlines: Optional[Dict[str, float]] = None,
+        deduplicator: Optional[MinHashDeduplicator] = None
+    ):
+        """
+        Initialize the aggregator.
+        
+        Args:
+            sources: Mapping of source name to fetch callable, in priority order
+            deadlines: Per-source deadline in seconds (default 8s)
+            deduplicator: Near-duplicate detector (default MinHashDeduplicator)
+        """
+        self.sources = sources
+        self.deadlines = deadlines or {}
+        self.deduplicator = deduplicator or MinHashDeduplicator()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, len(sources)) * 2,
+            thread_name_prefix='news-source'
+        )
+    
+    def _collect(
+        self,
+        ticker: str,
+        company_name: str,
+        days_back: int,
+        since: Dict[str, Optional[datetime]],
+        sources: Optional[Iterable[str]] = None
+    ) -> Dict[str, List[Dict]]:
+        """Run the sources (default all) concurrently, keeping those that finish in time."""
+        start = time.time()
+        names = set(self.sources if sources is None else sources)
+        futures = {
+            name: self.executor.submit(fetch, ticker, company_name, days_back, since.get(name))
+            for name, fetch in self.sources.items()
+            if name in names
+        }
+        
+        results = {}
+        # Wait in deadline order so total latency is bounded by the largest deadline
+        for name in sorted(futures, key=lambda n: self.deadlines.get(n, DEFAULT_SOURCE_DEADLINE)):
+            deadline = self.deadlines.get(name, DEFAULT_SOURCE_DEADLINE)
+            remaining = max(0.0, deadline - (time.time() - start))
+            try:
+                results[name] = futures[name].result(timeout=remaining) or []
+            except FutureTimeoutError:
+                futures[name].cancel()
+                logger.warning(f"News source '{name}' missed its {deadline:.1f}s deadline for {ticker}")
+            except Exception as e:
+                logger.error(f"News source '{name}' failed for {ticker}: {e}")
+        
+        logger.info(f"Collected news for {ticker} from {len(results)}/{len(futures)} sources "
+                    f"in {time.time() - start:.2f}s")
+        return results
+    
+    def fetch(
+        self,
+        ticker: str,
+        company_name: str,
+        days_back: int = 7,
+        max_articles: int = 10,
+        since: Optional[Dict[str, Optional[datetime]]] = None
+    ) -> List[Dict]:
+        """
+        Fetch, normalize and deduplicate articles from all sources.
+        
+        Args:
+            ticker: Stock ticker symbol
+            company_name: Company name for search
+            days_back: How many days back to search
+            max_articles: Maximum number of articles to return
+            since: Optional per-source high-water marks; only newer articles are kept
+        
+        Returns:
+            List of normalized articles, newest first. Each article carries a
+            'duplicates' count of syndicated copies that were collapsed into it.
+        """
+        articles, _ = self.fetch_with_marks(ticker, company_name, days_back, max_articles, since)
+        return articles
+    
+    def fetch_with_marks(
+        self,
+        ticker: str,
+        company_name: str,
+        days_back: int = 7,
+        max_articles: Optional[int] = 10,
+        since: Optional[Dict[str, Optional[datetime]]] = None,
+        sources: Optional[Iterable[str]] = None
+    ) -> Tuple[List[Dict], Dict[str, datetime]]:
+        """
+        Like fetch, but also report the newest publish time seen per source.
+        
+        Marks include articles collapsed as duplicates, so a source does not
+        re-fetch copies that lost to another provider. They also cover
+        articles cut by max_articles; callers that persist articles and
+        advance marks should pass max_articles=None. sources restricts the
+        call to a subset of the sources (e.g. those with rate budget left).
+        
+        Returns:
+            Tuple of (articles, {source: newest published_at})
+        """
+        since = since or {}
+        collected = self._collect(ticker, company_name, days_back, since, sources)
+        
+        articles = []
+        marks: Dict[str, datetime] = {}
+        for name in self.sources:  # Priority order decides which copy survives
+            mark = since.get(name)
+            for raw in collected.get(name, []):
+                article = normalize_article(raw, name, ticker)
+                if not article:
+                    continue
+                published = parse_published_at(article['published_at'])
+                if mark and published and published <= mark:
+                    continue
+                if published and (name not in marks or published > marks[name]):
+                    marks[name] = published
+                articles.append(article)
+        
+        if not articles:
+            return [], marks
+        
+        # Exact URL matches first, then near-duplicate titles
+        seen_urls = {}
+        unique = []
+        for article in articles:
+            url = article['url']
+            if url and url in seen_urls:
+                seen_urls[url]['duplicates'] += 1
+                continue
+            article['duplicates'] = 0
+            if url:
+                seen_urls[url] = article
+            unique.append(article)
+        
+        representative = self.deduplicator.deduplicate([a['title'] for a in unique])
+        merged = []
+        for i, rep in enumerate(representative):
+            if rep == i:
+                merged.append(unique[i])
+            else:
+                unique[rep]['duplicates'] += 1 + unique[i]['duplicates']
+        
+        merged.sort(key=lambda a: a['published_at'], reverse=True)
+        return merged[:max_articles], marks
@@ -3,7 +3,6 @@ Real News and Earnings Call Data Fetcher
 Integrates NewsAPI and Financial Modeling Prep (FMP) APIs
 """
 import os
-import requests
 from newsapi import NewsApiClient
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict
@@ -11,6 +10,11 @@ import logging
 from dotenv import load_dotenv
 import time
 
+from src.api.http_client import get_http_client
+from src.api.news_aggregator import NewsAggregator, parse_published_at
+from src.api.newsdata_fetcher import NewsDataFetcher as NewsDataIOFetcher
+from config.settings import NEWS_SOURCE_DEADLINES
+
 # Load environment variables
 load_dotenv()
 
@@ -24,6 +28,7 @@ class NewsDataFetcher:
         """Initialize with API keys from environment variables."""
         self.news_api_key = os.getenv('NEWS_API_KEY')
         self.fmp_api_key = os.getenv('FMP_API_KEY')
+        self.newsdata_api_key = os.getenv('NEWSDATA_API_KEY')
         
         # Initialize NewsAPI client
         self.newsapi_client = None
@@ -34,11 +39,35 @@ class NewsDataFetcher:
             except Exception as e:
                 logger.error(f"Failed to initialize NewsAPI: {e}")
         
+        # newsdata.io client (optional third source)
+        self.newsdata_fetcher = None
+        if self.newsdata_api_key:
+            self.newsdata_fetcher = NewsDataIOFetcher(self.newsdata_api_key)
+        
         # Rate limiting
         self.last_news_call = 0
         self.last_fmp_call = 0
         self.news_call_interval = 1  # 1 second between calls
         self.fmp_call_interval = 0.5  # 0.5 seconds between calls
+        
+        # All sources are queried concurrently; dict order is merge priority
+        self.aggregator = NewsAggregator(
+            sources={
+                'newsapi': self.fetch_articles_from_newsapi,
+                'fmp': self.fetch_articles_from_fmp,
+                'newsdata': self.fetch_articles_from_newsdata,
+            },
+            deadlines=NEWS_SOURCE_DEADLINES
+        )
+    
+    def configured_sources(self) -> List[str]:
+        """Aggregator sources that have credentials (the others return nothing)."""
+        configured = {
+            'newsapi': self.newsapi_client is not None,
+            'fmp': bool(self.fmp_api_key),
+            'newsdata': self.newsdata_fetcher is not None,
+        }
+        return [name for name in self.aggregator.sources if configured.get(name)]
     
     def _rate_limit_wait(self, api_type: str = 'news'):
         """Ensure API calls respect rate limits."""
@@ -53,22 +82,24 @@ class NewsDataFetcher:
                 time.sleep(self.fmp_call_interval - elapsed)
             self.last_fmp_call = time.time()
     
-    def fetch_news_from_newsapi(
+    def fetch_articles_from_newsapi(
         self, 
         ticker: str, 
         company_name: str, 
-        days_back: int = 7
-    ) -> List[str]:
+        days_back: int = 7,
+        since: Optional[datetime] = None
+    ) -> List[Dict]:
         """
-        Fetch news headlines from NewsAPI.
+        Fetch news articles from NewsAPI.
         
         Args:
             ticker: Stock ticker symbol
             company_name: Company name for search
             days_back: How many days back to search
+            since: Only request articles published after this time
             
         Returns:
-            List of news headlines
+            List of raw NewsAPI article dicts
         """
         if not self.newsapi_client or not self.news_api_key:
             logger.warning("NewsAPI not configured")
@@ -77,8 +108,11 @@ class NewsDataFetcher:
         try:
             self._rate_limit_wait('news')
             
-            # Calculate date range
-            from_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+            # Calculate date range (NewsAPI accepts full ISO timestamps)
+            if since:
+                from_date = since.strftime('%Y-%m-%dT%H:%M:%S')
+            else:
+                from_date = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
             
             # Search for company news
             articles = self.newsapi_client.get_everything(
@@ -90,26 +124,53 @@ class NewsDataFetcher:
             )
             
             if articles and articles.get('articles'):
-                headlines = [article['title'] for article in articles['articles']]
-                logger.info(f"Fetched {len(headlines)} headlines from NewsAPI for {ticker}")
-                return headlines
+                logger.info(f"Fetched {len(articles['articles'])} articles from NewsAPI for {ticker}")
+                return articles['articles']
             
         except Exception as e:
             logger.error(f"NewsAPI fetch error for {ticker}: {e}")
         
         return []
     
-    def fetch_news_from_fmp(self, ticker: str, days_back: int = 7) -> List[str]:
+    def fetch_news_from_newsapi(
+        self, 
+        ticker: str, 
+        company_name: str, 
+        days_back: int = 7
+    ) -> List[str]:
         """
-        Fetch news from Financial Modeling Prep API.
+        Fetch news headlines from NewsAPI.
         
         Args:
             ticker: Stock ticker symbol
+            company_name: Company name for search
             days_back: How many days back to search
             
         Returns:
             List of news headlines
         """
+        articles = self.fetch_articles_from_newsapi(ticker, company_name, days_back)
+        return [article['title'] for article in articles]
+    
+    def fetch_articles_from_fmp(
+        self, 
+        ticker: str, 
+        company_name: str = '', 
+        days_back: int = 7,
+        since: Optional[datetime] = None
+    ) -> List[Dict]:
+        """
+        Fetch news articles from Financial Modeling Prep API.
+        
+        Args:
+            ticker: Stock ticker symbol
+            company_name: Unused, accepted for a uniform source signature
+            days_back: How many days back to search
+            since: Only return articles published after this time
+        
+        Returns:
+            List of raw FMP article dicts
+        """
         if not self.fmp_api_key:
             logger.warning("FMP API not configured")
             return []
@@ -124,30 +185,82 @@ class NewsDataFetcher:
                 'limit': 10,
                 'apikey': self.fmp_api_key
             }
+            if since:
+                params['from'] = since.strftime('%Y-%m-%d')
             
-            response = requests.get(url, params=params, timeout=10)
+            response = get_http_client().get(url, params=params, timeout=10)
             response.raise_for_status()
             
             data = response.json()
             
             if data and isinstance(data, list):
-                # Filter by date
+                # Filter by date ('from' is day-granular, so re-check against since)
                 cutoff_date = datetime.now() - timedelta(days=days_back)
-                headlines = []
+                articles = []
                 
                 for article in data:
-                    pub_date = datetime.strptime(article['publishedDate'][:10], '%Y-%m-%d')
-                    if pub_date >= cutoff_date:
-                        headlines.append(article['title'])
+                    published = parse_published_at(article.get('publishedDate'))
+                    if published is None:
+                        continue
+                    if since and published <= since:
+                        continue
+                    if published.date() >= cutoff_date.date():
+                        articles.append(article)
                 
-                logger.info(f"Fetched {len(headlines)} headlines from FMP for {ticker}")
-                return headlines
+                logger.info(f"Fetched {len(articles)} articles from FMP for {ticker}")
+                return articles
             
         except Exception as e:
             logger.error(f"FMP news fetch error for {ticker}: {e}")
         
         return []
     
+    def fetch_news_from_fmp(self, ticker: str, days_back: int = 7) -> List[str]:
+        """
+        Fetch news from Financial Modeling Prep API.
+        
+        Args:
+            ticker: Stock ticker symbol
+            days_back: How many days back to search
+        
+        Returns:
+            List of news headlines
+        """
+        articles = self.fetch_articles_from_fmp(ticker, days_back=days_back)
+        return [article['title'] for article in articles]
+    
+    def fetch_articles_from_newsdata(
+        self, 
+        ticker: str, 
+        company_name: str, 
+        days_back: int = 7,
+        since: Optional[datetime] = None
+    ) -> List[Dict]:
+        """
+        Fetch news articles from newsdata.io.
+        
+        Args:
+            ticker: Stock ticker symbol
+            company_name: Company name for search
+            days_back: How many days back to search
+            since: Only return articles published after this time (filtered
+                   client-side; the latest-news endpoint has no date parameter)
+        
+        Returns:
+            List of newsdata.io article dicts
+        """
+        if not self.newsdata_fetcher:
+            logger.warning("newsdata.io not configured")
+            return []
+        
+        articles = self.newsdata_fetcher.get_news(ticker, company_name, days_back)
+        if since:
+            articles = [
+                article for article in articles
+                if (parse_published_at(article.get('published_at')) or since) > since
+            ]
+        return articles
+    
     def fetch_earnings_transcript(self, ticker: str, quarter: Optional[int] = None, 
                                   year: Optional[int] = None) -> Optional[str]:
         """
@@ -176,7 +289,7 @@ class NewsDataFetcher:
                 params['quarter'] = quarter
                 params['year'] = year
             
-            response = requests.get(url, params=params, timeout=15)
+            response = get_http_client().get(url, params=params, timeout=15)
             response.raise_for_status()
             
             data = response.json()
@@ -193,53 +306,57 @@ class NewsDataFetcher:
         
         return None
     
-    def fetch_company_news(
+    def fetch_company_articles(
         self, 
         ticker: str, 
         company_name: str, 
         days_back: int = 7,
-        max_articles: int = 10
-    ) -> List[str]:
+        max_articles: int = 10,
+        since: Optional[Dict[str, Optional[datetime]]] = None
+    ) -> List[Dict]:
         """
-        Fetch news from all available sources with fallback.
+        Fetch normalized articles from all configured sources concurrently.
         
         Args:
             ticker: Stock ticker symbol
             company_name: Company name
             days_back: Days to look back
             max_articles: Maximum number of articles to return
+            since: Optional per-source high-water marks
             
         Returns:
-            List of news headlines
+            List of normalized, near-deduplicated articles (newest first)
         """
-        all_headlines = []
-        
-        # Try NewsAPI first (better quality for general news)
-        newsapi_headlines = self.fetch_news_from_newsapi(ticker, company_name, days_back)
-        all_headlines.extend(newsapi_headlines)
-        
-        # If we don't have enough, try FMP
-        if len(all_headlines) < 5:
-            fmp_headlines = self.fetch_news_from_fmp(ticker, days_back)
-            all_headlines.extend(fmp_headlines)
+        articles = self.aggregator.fetch(ticker, company_name, days_back, max_articles, since)
         
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_headlines = []
-        for headline in all_headlines:
-            if headline.lower() not in seen:
-                seen.add(headline.lower())
-                unique_headlines.append(headline)
-        
-        # Return up to max_articles
-        result = unique_headlines[:max_articles]
-        
-        if result:
-            logger.info(f"Fetched total {len(result)} unique headlines for {ticker}")
+        if articles:
+            logger.info(f"Fetched total {len(articles)} unique articles for {ticker}")
         else:
             logger.warning(f"No headlines found for {ticker}, may need to use sample data")
         
-        return result
+        return articles
+    
+    def fetch_company_news(
+        self, 
+        ticker: str, 
+        company_name: str, 
+        days_back: int = 7,
+        max_articles: int = 10
+    ) -> List[str]:
+        """
+        Fetch news headlines from all available sources.
+        
+        Args:
+            ticker: Stock ticker symbol
+            company_name: Company name
+            days_back: Days to look back
+            max_articles: Maximum number of articles to return
+        
+        Returns:
+            List of news headlines
+        """
+        articles = self.fetch_company_articles(ticker, company_name, days_back, max_articles)
+        return [article['title'] for article in articles]
 
 
 # Global instance
@@ -0,0 +1,271 @@
+"""
+Persistent news article store with incremental (since-last-seen) fetching.
+Articles are written to the NewsArticles table together with their sentiment,
+and a per-(ticker, source) high-water mark limits later API calls to new items.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from src.api.news_aggregator import parse_published_at
+from src.api.news_fetcher import NewsDataFetcher, get_news_fetcher
+from src.analysis.lexicon_sentiment import get_lexicon_scorer
+from src.utils.database import Database
+from config.settings import DATABASE_PATH
+
+logger = logging.getLogger(__name__)
+
+# A scorer takes a batch of article texts and returns a DataFrame aligned with
+# them, with 'polarity' and 'sentiment' columns and optionally 'confidence'
+SentimentScorer = Callable[[List[str]], pd.DataFrame]
+
+
+def lexicon_scores(texts: List[str]) -> pd.DataFrame:
+    """Score texts with the shared lexicon scorer (see lexicon_sentiment)."""
+    return get_lexicon_scorer().score_texts(texts)
+
+
+def cascade_scores(texts: List[str]) -> pd.DataFrame:
+    """
+    Score texts with the lexicon/FinBERT cascade (see
+    FinBERTAnalyzer.analyze_cascade), falling back to the lexicon alone when
+    FinBERT cannot label every ambiguous text.
+    
+    Args:
+        texts: Article texts
+    
+    Returns:
+        DataFrame aligned with texts: polarity, sentiment, confidence
+    """
+    from src.analysis.finbert_sentiment import get_analyzer  # Imports torch
+    
+    results = get_analyzer().analyze_cascade(texts, threshold=0.0)
+    if len(results) != len(texts):
+        logger.warning("FinBERT unavailable; scoring news with the lexicon only")
+        return lexicon_scores(texts)
+    return pd.DataFrame(results, columns=['polarity', 'sentiment', 'confidence'])
+
+
+class NewsStore:
+    """Stores fetched news in SQLite and fetches only what is new."""
+    
+    def __init__(
+        self,
+        db_path: str = DATABASE_PATH,
+        fetcher: Optional[NewsDataFetcher] = None,
+        scorer: SentimentScorer = cascade_scores
+    ):
+        """
+        Initialize the news store.
+        
+        Args:
+            db_path: SQLite database path
+            fetcher: Multi-source news fetcher (default: global fetcher)
+            scorer: Batch sentiment function applied to new articles
+        """
+        self.fetcher = fetcher or get_news_fetcher()
+        self.scorer = scorer
+        self._lock = threading.Lock()
+        
+        self.db = Database(db_path)
+        self.db.connect()
+        self.db.initialize_schema()
+    
+    def get_high_water_marks(self, ticker: str) -> Dict[str, datetime]:
+        """
+        Get the newest stored publish time per source for a ticker.
+        
+        Args:
+            ticker: Stock ticker symbol
+        
+        Returns:
+            Mapping of source name to high-water mark
+        """
+        with self._lock:
+            rows = self.db.conn.execute(
+                "SELECT source, last_published_at FROM NewsFetchState WHERE ticker = ?",
+                (ticker.upper(),)
+            ).fetchall()
+        
+        marks = {}
+        for row in rows:
+            mark = parse_published_at(row['last_published_at'])
+            if mark:
+                marks[row['source']] = mark
+        return marks
+    
+    def save_articles(self, articles: List[Dict]) -> int:
+        """
+        Score (in one batch) and insert articles, skipping URLs already stored
+        for the same ticker.
+        
+        Args:
+            articles: Normalized articles (see news_aggregator.normalize_article)
+        
+        Returns:
+            Number of newly inserted articles
+        """
+        if not articles:
+            return 0
+        
+        fetched_at = datetime.now()
+        scores = self.scorer([
+            f"{article['title']}. {article.get('description', '')}" for article in articles
+        ])
+        if 'confidence' in scores:
+            confidences = scores['confidence'].astype(float).tolist()
+        else:
+            confidences = [None] * len(articles)  # Scorer without confidences
+        
+        rows = []
+        for article, polarity, label, confidence in zip(
+            articles, scores['polarity'].astype(float), scores['sentiment'], confidences
+        ):
+            rows.append((
+                article['title'],
+                article.get('description', ''),
+                article.get('published_at') or fetched_at.strftime('%Y-%m-%d %H:%M:%S'),
+                article.get('source', ''),
+                article.get('url') or None,  # NULL urls never collide on UNIQUE
+                article['ticker'],
+                polarity,
+                article.get('provider', ''),
+                label,
+                fetched_at,
+                confidence
+            ))
+        
+        with self._lock:
+            cursor = self.db.conn.cursor()
+            cursor.executemany("""
+                INSERT OR IGNORE INTO NewsArticles
+                (title, summary, publish_date, source, url, related_ticker,
+                 sentiment_score, provider, sentiment_label, fetched_at,
+                 sentiment_confidence)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            inserted = cursor.rowcount  # Excludes the FTS trigger writes
+            self.db.conn.commit()
+        
+        return inserted
+    
+    def _update_marks(self, ticker: str, marks: Dict[str, datetime], sources: List[str]):
+        """Advance high-water marks and record the fetch time for the queried sources."""
+        now = datetime.now()
+        rows = [(ticker.upper(), source, marks.get(source), now) for source in sources]
+        with self._lock:
+            self.db.conn.executemany("""
+                INSERT INTO NewsFetchState (ticker, source, last_published_at, last_fetched_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(ticker, source) DO UPDATE SET
+                    last_published_at = MAX(
+                        COALESCE(last_published_at, excluded.last_published_at),
+                        COALESCE(excluded.last_published_at, last_published_at)
+                    ),
+                    last_fetched_at = excluded.last_fetched_at
+            """, [
+                (t, s, m.strftime('%Y-%m-%d %H:%M:%S') if m else None, f)
+                for t, s, m, f in rows
+            ])
+            self.db.conn.commit()
+    
+    def fetch_incremental(
+        self,
+        ticker: str,
+        company_name: str,
+        days_back: int = 7,
+        max_articles: int = 50,
+        sources: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Fetch articles newer than each source's high-water mark, store them and
+        return the stored articles for the requested window.
+        
+        Args:
+            ticker: Stock ticker symbol
+            company_name: Company name for search
+            days_back: Lookback window for the returned articles
+            max_articles: Maximum number of articles to return
+            sources: Sources to query (default all); the others keep their
+                     marks and catch up on a later call
+        
+        Returns:
+            Stored articles for the window, newest first, with sentiment
+        """
+        window_start = datetime.now() - timedelta(days=days_back)
+        marks = self.get_high_water_marks(ticker)
+        # Marks older than the window are no help; fall back to the window itself
+        since = {source: mark for source, mark in marks.items() if mark > window_start}
+        
+        # Store everything fetched: the marks cover every article seen, so an
+        # article left out here would never be requested again
+        sources = list(self.fetcher.aggregator.sources if sources is None else sources)
+        new_articles, new_marks = self.fetcher.aggregator.fetch_with_marks(
+            ticker, company_name, days_back, None, since, sources
+        )
+        inserted = self.save_articles(new_articles)
+        self._update_marks(ticker, new_marks, sources)
+        logger.info(f"Stored {inserted} new articles for {ticker} "
+                    f"({len(set(since) & set(sources))}/{len(sources)} sources incremental)")
+        
+        return self.get_articles(ticker, days_back, max_articles)
+    
+    def get_articles(
+        self,
+        ticker: str,
+        days_back: int = 7,
+        limit: int = 50
+    ) -> List[Dict]:
+        """
+        Read stored articles for a ticker.
+        
+        Args:
+            ticker: Stock ticker symbol
+            days_back: Lookback window
+            limit: Maximum number of articles to return
+        
+        Returns:
+            List of article dicts, newest first
+        """
+        cutoff = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            rows = self.db.conn.execute("""
+                SELECT article_id, title, summary, publish_date, source, url,
+                       related_ticker, sentiment_score, provider, sentiment_label
+                FROM NewsArticles
+                WHERE related_ticker = ? AND publish_date >= ?
+                ORDER BY publish_date DESC
+                LIMIT ?
+            """, (ticker.upper(), cutoff, limit)).fetchall()
+        
+        return [
+            {
+                'article_id': row['article_id'],
+                'title': row['title'],
+                'description': row['summary'],
+                'published_at': row['publish_date'],
+                'source': row['source'],
+                'url': row['url'] or '',
+                'ticker': row['related_ticker'],
+                'provider': row['provider'],
+                'sentiment_score': row['sentiment_score'],
+                'sentiment': row['sentiment_label'],
+            }
+            for row in rows
+        ]
+
+
+# Global instance
+_store = None
+_store_lock = threading.Lock()
+
+def get_news_store() -> NewsStore:
+    """Get or create global news store instance."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NewsStore()
+    return _store
@@ -2,11 +2,13 @@
 NewsData Fetcher - Simplified version focusing only on newsdata.io
 No FMP endpoints (may not work on free tier)
 """
-import requests
-import streamlit as st
 from datetime import datetime, timedelta
 import time
 
+from src.api.http_client import get_http_client
+from src.utils.cache_backend import cached
+from config.settings import CACHE_TTL
+
 
 class NewsDataFetcher:
     """Fetcher for newsdata.io API only"""
@@ -25,7 +27,7 @@ class NewsDataFetcher:
         """Wait between API calls to avoid rate limits"""
         time.sleep(wait_time)
     
-    @st.cache_data(ttl=3600)
+    @cached('newsdata', ttl=CACHE_TTL)
     def get_news(_self, ticker: str, company_name: str = None, days_back: int = 7, max_results: int = 10):
         """
         Fetch news from newsdata.io
@@ -52,7 +54,7 @@ class NewsDataFetcher:
                 'category': 'business'
             }
             
-            response = requests.get(_self.newsdata_base_url, params=params, timeout=10)
+            response = get_http_client().get(_self.newsdata_base_url, params=params, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -11,6 +11,10 @@ import logging
 import time
 from dotenv import load_dotenv
 
+from src.utils.cache_backend import cached
+from src.utils.single_flight import single_flight
+from config.settings import CACHE_TTL, SWR_TTLS
+
 # Load environment variables
 load_dotenv()
 
@@ -47,6 +51,8 @@ class PolygonDataFetcher:
             time.sleep(sleep_time)
         self.last_call_time = time.time()
     
+    @cached("polygon", ttl=CACHE_TTL)
+    @single_flight("polygon")
     def get_stock_info(self, ticker: str) -> Optional[Dict]:
         """Get basic stock information."""
         try:
@@ -68,6 +74,8 @@ class PolygonDataFetcher:
             logger.error(f"Error fetching info for {ticker}: {e}")
             return None
     
+    @cached("polygon", ttl=CACHE_TTL)
+    @single_flight("polygon")
     def get_historical_data(
         self,
         ticker: str,
@@ -119,6 +127,7 @@ class PolygonDataFetcher:
             logger.error(f"Error fetching historical data for {ticker}: {e}")
             return None
     
+    @single_flight("polygon")
     def get_current_price(self, ticker: str) -> Optional[Dict]:
         """Get current/latest price."""
         try:
@@ -162,6 +171,7 @@ class PolygonDataFetcher:
             logger.error(f"Error fetching current price for {ticker}: {e}")
             return None
     
+    @cached("polygon", ttl=SWR_TTLS["quotes"])
     def get_multiple_tickers(self, tickers: List[str], max_tickers: int = 4) -> pd.DataFrame:
         """
         Get data for multiple tickers with rate limiting.
@@ -0,0 +1,523 @@
+"""
+Realtime quote streaming.
+Consumes a trade/quote feed (Polygon.io websocket, or a local replay for
+tests and demos), aggregates ticks into rolling 1-minute bars and last-quote
+state per symbol, and exposes that state to the pages without REST calls.
+"""
+import asyncio
+import csv
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from config.settings import (
+    QUOTE_STREAM_ENABLED, QUOTE_STREAM_BAR_CAPACITY, QUOTE_STREAM_FRESH_SECONDS, QUOTE_STREAM_FEED,
+    QUOTE_STREAM_RECONNECT_SECONDS, QUOTE_STREAM_MAX_BACKOFF_SECONDS
+)
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BAR_SECONDS = 60
+
+
+class BarRingBuffer:
+    """Fixed-size ring of 1-minute OHLCV bars stored in numpy arrays."""
+    
+    def __init__(self, capacity: int = QUOTE_STREAM_BAR_CAPACITY):
+        """
+        Initialize the buffer.
+        
+        Args:
+            capacity: Number of bars kept (390 = one regular trading session)
+        """
+        self.capacity = capacity
+        self.start = np.zeros(capacity, dtype=np.int64)  # Bar start, epoch seconds
+        self.ohlc = np.zeros((capacity, 4), dtype=np.float64)
+        self.volume = np.zeros(capacity, dtype=np.float64)
+        self.head = -1  # Slot of the newest bar
+        self.count = 0
+    
+    def add_trade(self, timestamp: float, price: float, size: float = 0.0) -> bool:
+        """
+        Fold one trade into its minute bar.
+        
+        Args:
+            timestamp: Trade time in epoch seconds
+            price: Trade price
+            size: Trade size in shares
+        
+        Returns:
+            False if the trade was older than the buffer and dropped
+        """
+        minute = int(timestamp) // BAR_SECONDS * BAR_SECONDS
+        
+        if self.count and minute < self.start[self.head]:
+            # Late trade: update its bar if still buffered (minutes without trades have no bar)
+            slots = self._order()
+            i = np.searchsorted(self.start[slots], minute)
+            if i == len(slots) or self.start[slots[i]] != minute:
+                return False
+            self._update(slots[i], price, size)
+            return True
+        
+        if not self.count or minute > self.start[self.head]:
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.start[self.head] = minute
+            self.ohlc[self.head] = price
+            self.volume[self.head] = size
+            return True
+        
+        self._update(self.head, price, size)
+        return True
+    
+    def _update(self, slot: int, price: float, size: float):
+        bar = self.ohlc[slot]
+        if price > bar[1]:
+            bar[1] = price
+        if price < bar[2]:
+            bar[2] = price
+        if slot == self.head:
+            bar[3] = price
+        self.volume[slot] += size
+    
+    def _order(self, minutes: Optional[int] = None) -> np.ndarray:
+        """Slots from oldest to newest."""
+        n = self.count if minutes is None else min(minutes, self.count)
+        return (self.head - np.arange(n)[::-1]) % self.capacity
+    
+    def to_frame(self, minutes: Optional[int] = None) -> pd.DataFrame:
+        """
+        Get buffered bars as a DataFrame.
+        
+        Args:
+            minutes: Only the most recent N bars (default all)
+        
+        Returns:
+            DataFrame with date, open, high, low, close, volume, oldest first
+        """
+        slots = self._order(minutes)
+        ohlc = self.ohlc[slots]
+        return pd.DataFrame({
+            'date': pd.to_datetime(self.start[slots], unit='s'),
+            'open': ohlc[:, 0],
+            'high': ohlc[:, 1],
+            'low': ohlc[:, 2],
+            'close': ohlc[:, 3],
+            'volume': self.volume[slots]
+        })
+    
+    def session_range(self) -> Optional[tuple]:
+        """(high, low, volume) across buffered bars, or None if empty."""
+        if not self.count:
+            return None
+        slots = self._order()
+        return self.ohlc[slots, 1].max(), self.ohlc[slots, 2].min(), self.volume[slots].sum()
+
+
+class QuoteAggregator:
+    """Last-quote state and minute bars for every streamed symbol."""
+    
+    def __init__(self, bar_capacity: int = QUOTE_STREAM_BAR_CAPACITY, delayed: bool = False):
+        """
+        Initialize the aggregator.
+        
+        Args:
+            bar_capacity: Minute bars kept per symbol
+            delayed: Whether the feed is delayed (trade times lag the clock)
+        """
+        self.bar_capacity = bar_capacity
+        self.delayed = delayed
+        self._bars: Dict[str, BarRingBuffer] = {}
+        self._quotes: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.trades = 0
+        self.dropped = 0
+    
+    def on_trade(self, symbol: str, timestamp: float, price: float, size: float = 0.0):
+        """
+        Record a trade.
+        
+        Args:
+            symbol: Ticker symbol
+            timestamp: Trade time in epoch seconds
+            price: Trade price
+            size: Trade size
+        """
+        with self._lock:
+            bars = self._bars.get(symbol)
+            if bars is None:
+                bars = self._bars[symbol] = BarRingBuffer(self.bar_capacity)
+            if not bars.add_trade(timestamp, price, size):
+                self.dropped += 1
+                return
+            self.trades += 1
+            quote = self._quotes.setdefault(symbol, {'symbol': symbol})
+            quote['received_at'] = time.time()
+            if timestamp >= quote.get('timestamp', 0):
+                quote['price'] = price
+                quote['size'] = size
+                quote['timestamp'] = timestamp
+    
+    def on_quote(self, symbol: str, timestamp: float, bid: float, ask: float):
+        """
+        Record a bid/ask update.
+        
+        Args:
+            symbol: Ticker symbol
+            timestamp: Quote time in epoch seconds
+            bid: Bid price
+            ask: Ask price
+        """
+        with self._lock:
+            quote = self._quotes.setdefault(symbol, {'symbol': symbol})
+            quote['bid'] = bid
+            quote['ask'] = ask
+            quote['quote_timestamp'] = timestamp
+    
+    def last_quote(self, symbol: str) -> Optional[Dict]:
+        """
+        Get the latest trade/quote state for a symbol.
+        
+        Returns:
+            Dict with price, size, timestamp, age_seconds (since the trade),
+            idle_seconds (since the last trade arrived) and (if streamed)
+            bid/ask, or None if nothing was received
+        """
+        with self._lock:
+            quote = self._quotes.get(symbol)
+            if quote is None or 'price' not in quote:
+                return None
+            quote = dict(quote)
+        now = time.time()
+        quote['age_seconds'] = now - quote['timestamp']
+        quote['idle_seconds'] = now - quote['received_at']
+        return quote
+    
+    def bars(self, symbol: str, minutes: Optional[int] = None) -> pd.DataFrame:
+        """
+        Get recent minute bars for a symbol.
+        
+        Args:
+            symbol: Ticker symbol
+            minutes: Only the most recent N bars (default all buffered)
+        
+        Returns:
+            DataFrame with date, open, high, low, close, volume (empty if none)
+        """
+        with self._lock:
+            bars = self._bars.get(symbol)
+            if bars is None:
+                return pd.DataFrame(columns=['date', 'open', 'high', 'low', 'close', 'volume'])
+            return bars.to_frame(minutes)
+    
+    def apply_to_price(self, symbol: str, price: Dict, max_age: float = QUOTE_STREAM_FRESH_SECONDS) -> Dict:
+        """
+        Overlay streamed state on a REST price dict (as returned by
+        get_current_price) when the stream is fresh.
+        
+        Freshness is measured from when the last trade arrived, not from its
+        trade time, so a delayed feed (trades ~15 minutes old) still counts
+        as fresh while it keeps delivering.
+        
+        Args:
+            symbol: Ticker symbol
+            price: Price dict with current_price, previous_close, day_high, ...
+            max_age: Seconds without a new trade after which streamed state is ignored
+        
+        Returns:
+            Updated copy of price, with 'source' set to 'stream' or 'rest'
+            and, for streamed prices, 'delayed' set from the feed
+        """
+        price = dict(price)
+        price['source'] = 'rest'
+        quote = self.last_quote(symbol)
+        if quote is None or quote['idle_seconds'] > max_age:
+            return price
+        
+        price['current_price'] = quote['price']
+        price['as_of'] = pd.Timestamp(quote['timestamp'], unit='s')
+        price['source'] = 'stream'
+        price['delayed'] = self.delayed
+        if price.get('previous_close'):
+            price['change'] = quote['price'] - price['previous_close']
+            price['change_percent'] = price['change'] / price['previous_close'] * 100
+        with self._lock:
+            session = self._bars[symbol].session_range() if symbol in self._bars else None
+        if session is not None:
+            high, low, _ = session
+            price['day_high'] = max(price.get('day_high') or high, high)
+            price['day_low'] = min(price.get('day_low') or low, low)
+        return price
+    
+    def symbols(self) -> List[str]:
+        """Symbols with streamed state."""
+        with self._lock:
+            return sorted(self._quotes)
+
+
+# Callbacks a source drives: on_trade(symbol, ts, price, size), on_quote(symbol, ts, bid, ask)
+class StreamSource(ABC):
+    """Feed of trades and quotes pushed into an aggregator."""
+    
+    @abstractmethod
+    def run(self, aggregator: QuoteAggregator, stop: threading.Event):
+        """Push events into aggregator until stop is set or the feed ends."""
+    
+    @abstractmethod
+    def subscribe(self, symbols: List[str]):
+        """Add symbols to the feed."""
+    
+    def is_fatal(self, error: Exception) -> bool:
+        """Whether an error from run() means reconnecting cannot succeed."""
+        return False
+    
+    def close(self):
+        pass
+
+
+class ReplaySource(StreamSource):
+    """
+    Replays recorded ticks (local stand-in for the live feed in tests and demos).
+    Each event is a dict with symbol, timestamp (epoch seconds) and either
+    price/size (trade) or bid/ask (quote).
+    """
+    
+    def __init__(self, events: Iterable[Dict], speed: float = 0.0, shift_to_now: bool = False):
+        """
+        Initialize the replay.
+        
+        Args:
+            events: Events in timestamp order
+            speed: Playback speed (1.0 = real time, 0 = as fast as possible)
+            shift_to_now: Shift timestamps so the first event happens now
+        """
+        self.events = events
+        self.speed = speed
+        self.shift_to_now = shift_to_now
+        self.symbols: Optional[set] = None
+    
+    @classmethod
+    def from_csv(cls, path: str, **kwargs) -> 'ReplaySource':
+        """
+        Load events from a CSV with columns symbol, timestamp and price/size
+        and/or bid/ask.
+        """
+        with open(path, newline='') as f:
+            events = []
+            for row in csv.DictReader(f):
+                event = {'symbol': row['symbol'].upper(), 'timestamp': float(row['timestamp'])}
+                for field in ('price', 'size', 'bid', 'ask'):
+                    if row.get(field) not in (None, ''):
+                        event[field] = float(row[field])
+                events.append(event)
+        return cls(events, **kwargs)
+    
+    def subscribe(self, symbols: List[str]):
+        self.symbols = (self.symbols or set()) | {s.upper() for s in symbols}
+    
+    def run(self, aggregator: QuoteAggregator, stop: threading.Event):
+        offset = None
+        wall_start = time.time()
+        first = None
+        for event in self.events:
+            if stop.is_set():
+                return
+            if self.symbols is not None and event['symbol'] not in self.symbols:
+                continue
+            if first is None:
+                first = event['timestamp']
+                offset = wall_start - first if self.shift_to_now else 0.0
+            if self.speed > 0:
+                delay = (event['timestamp'] - first) / self.speed - (time.time() - wall_start)
+                if delay > 0 and stop.wait(delay):
+                    return
+            timestamp = event['timestamp'] + offset
+            if 'price' in event:
+                aggregator.on_trade(event['symbol'], timestamp, event['price'], event.get('size', 0.0))
+            if 'bid' in event and 'ask' in event:
+                aggregator.on_quote(event['symbol'], timestamp, event['bid'], event['ask'])
+
+
+class PolygonStreamSource(StreamSource):
+    """Polygon.io stocks websocket (trades 'T.*' and quotes 'Q.*')."""
+    
+    def __init__(self, api_key: Optional[str] = None, feed: str = QUOTE_STREAM_FEED):
+        """
+        Initialize the source.
+        
+        Args:
+            api_key: Polygon.io API key (defaults to POLYGON_API_KEY env var)
+            feed: 'realtime' or 'delayed'
+        """
+        from polygon import WebSocketClient
+        from polygon.websocket.models import Feed, Market
+        
+        self.api_key = api_key or os.getenv('POLYGON_API_KEY')
+        if not self.api_key:
+            raise ValueError("Polygon API key not found. Set POLYGON_API_KEY environment variable.")
+        self.client = WebSocketClient(
+            api_key=self.api_key,
+            feed=Feed.RealTime if feed == 'realtime' else Feed.Delayed,
+            market=Market.Stocks
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def subscribe(self, symbols: List[str]):
+        for symbol in symbols:
+            self.client.subscribe(f"T.{symbol.upper()}", f"Q.{symbol.upper()}")
+    
+    def run(self, aggregator: QuoteAggregator, stop: threading.Event):
+        from polygon.websocket.models import EquityQuote, EquityTrade
+        
+        def handle(messages):
+            for msg in messages:
+                if isinstance(msg, EquityTrade) and msg.price is not None:
+                    aggregator.on_trade(msg.symbol, msg.timestamp / 1000, msg.price, msg.size or 0)
+                elif isinstance(msg, EquityQuote) and msg.bid_price is not None:
+                    aggregator.on_quote(msg.symbol, msg.timestamp / 1000, msg.bid_price, msg.ask_price)
+        
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self.client.connect(handle))
+        finally:
+            self._loop.close()
+            self._loop = None
+    
+    def is_fatal(self, error: Exception) -> bool:
+        # Rejected keys and plans without websocket access both fail auth
+        from polygon.exceptions import AuthError
+        return isinstance(error, AuthError)
+    
+    def close(self):
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.client.close(), self._loop)
+
+
+class QuoteStream:
+    """
+    Runs a stream source on a background thread, reconnecting with exponential
+    backoff on errors and stopping on errors the source reports as fatal.
+    """
+    
+    def __init__(
+        self,
+        source_factory: Callable[[], StreamSource],
+        aggregator: Optional[QuoteAggregator] = None,
+        reconnect_seconds: float = QUOTE_STREAM_RECONNECT_SECONDS,
+        max_backoff_seconds: float = QUOTE_STREAM_MAX_BACKOFF_SECONDS
+    ):
+        """
+        Initialize the stream.
+        
+        Args:
+            source_factory: Creates a fresh source (called again on reconnect)
+            aggregator: Aggregator receiving ticks (default a new one)
+            reconnect_seconds: Pause before the first reconnect; doubled after
+                               each consecutive failure
+            max_backoff_seconds: Upper bound on the pause. A connection that
+                                 stays up this long resets the backoff.
+        """
+        self.source_factory = source_factory
+        self.aggregator = aggregator or QuoteAggregator()
+        self.reconnect_seconds = reconnect_seconds
+        self.max_backoff_seconds = max(max_backoff_seconds, reconnect_seconds)
+        self.error: Optional[str] = None  # Set when the stream gave up
+        self.source: Optional[StreamSource] = None
+        self._symbols: set = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def subscribe(self, symbols: List[str]):
+        """Add symbols to the stream (idempotent)."""
+        new = [s.upper() for s in symbols if s.upper() not in self._symbols]
+        if not new:
+            return
+        with self._lock:
+            self._symbols.update(new)
+            if self.source is not None:
+                self.source.subscribe(new)
+    
+    def _run(self):
+        delay = self.reconnect_seconds
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                with self._lock:
+                    self.source = self.source_factory()
+                    if self._symbols:
+                        self.source.subscribe(sorted(self._symbols))
+                self.source.run(self.aggregator, self._stop)
+                if isinstance(self.source, ReplaySource):
+                    return  # A replay ends when its events run out
+            except Exception as e:
+                if self.source is not None and self.source.is_fatal(e):
+                    self.error = str(e)
+                    logger.error(f"Quote stream stopped: {e}")
+                    return
+                logger.warning(f"Quote stream error: {e}; reconnecting in {delay:.0f}s")
+            
+            if time.monotonic() - started >= self.max_backoff_seconds:
+                delay = self.reconnect_seconds  # Connection was healthy for a while
+            if self._stop.wait(delay):
+                return
+            delay = min(delay * 2, self.max_backoff_seconds)
+    
+    def start(self):
+        """Start the background thread (no-op if running)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='quote-stream', daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Stop streaming."""
+        self._stop.set()
+        with self._lock:
+            source, thread = self.source, self._thread
+        if source is not None:
+            source.close()
+        if thread is not None:
+            thread.join(timeout)
+    
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+# Global instance
+_stream = None
+_stream_lock = threading.Lock()
+
+def get_quote_stream() -> Optional[QuoteStream]:
+    """
+    Get or create global quote stream instance (Polygon websocket).
+    
+    The stream is started on first use and pages subscribe to their symbols.
+    
+    Returns:
+        The stream, or None if streaming is disabled or POLYGON_API_KEY is unset
+    """
+    global _stream
+    if not QUOTE_STREAM_ENABLED or not os.getenv('POLYGON_API_KEY'):
+        return None
+    with _stream_lock:
+        if _stream is None:
+            _stream = QuoteStream(
+                PolygonStreamSource,
+                QuoteAggregator(delayed=QUOTE_STREAM_FEED != 'realtime')
+            )
+            _stream.start()
+    return _stream
@@ -0,0 +1,331 @@
+"""
+Local catalog and compressed on-disk store for earnings call transcripts.
+Transcripts are keyed by (symbol, year, quarter); the catalog is kept in
+SQLite and mirrored in memory so lookups never need a network call.
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.database import Database
+from config.settings import (
+    DATABASE_PATH, TRANSCRIPT_STORAGE_PATH, TRANSCRIPT_CATALOG_REFRESH_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+TranscriptKey = Tuple[str, int, int]
+
+
+def make_transcript_key(symbol: str, year, quarter) -> Optional[TranscriptKey]:
+    """
+    Build the (symbol, year, quarter) key for a transcript.
+    
+    Args:
+        symbol: Stock ticker symbol
+        year: Fiscal year (int or numeric string)
+        quarter: Quarter number, optionally prefixed with 'Q'
+    
+    Returns:
+        Normalized key, or None if year/quarter are not numeric
+    """
+    year_str = str(year or '').strip()
+    quarter_str = str(quarter or '').strip().upper().replace('Q', '')
+    if not (symbol and year_str.isdigit() and quarter_str.isdigit()):
+        return None
+    return (symbol.strip().upper(), int(year_str), int(quarter_str))
+
+
+class TranscriptStore:
+    """Catalog of known transcripts with gzip-compressed content on disk."""
+    
+    def __init__(
+        self,
+        db_path: str = DATABASE_PATH,
+        storage_dir: str = TRANSCRIPT_STORAGE_PATH,
+        refresh_seconds: float = TRANSCRIPT_CATALOG_REFRESH_SECONDS
+    ):
+        """
+        Initialize the store and load the catalog into memory.
+        
+        Args:
+            db_path: SQLite database path
+            storage_dir: Directory for compressed transcript files
+            refresh_seconds: Age after which the catalog listing is stale
+        """
+        self.storage_dir = storage_dir
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        
+        self.db = Database(db_path)
+        self.db.connect()
+        self.db.initialize_schema()
+        
+        # symbol -> {(year, quarter): entry}; the per-symbol dict keeps
+        # "latest transcript for a symbol" as cheap as an exact lookup
+        self._catalog: Dict[str, Dict[Tuple[int, int], Dict]] = {}
+        self._last_listed: Optional[datetime] = None
+        self._load_catalog()
+    
+    def _load_catalog(self):
+        """Read the persisted catalog into memory."""
+        rows = self.db.conn.execute("""
+            SELECT symbol, year, quarter, call_date, content_path,
+                   listed_at, fetched_at, last_attempt_at
+            FROM TranscriptCatalog
+        """).fetchall()
+        
+        for row in rows:
+            entry = dict(row)
+            self._catalog.setdefault(entry['symbol'], {})[(entry['year'], entry['quarter'])] = entry
+            listed = self._parse_time(entry['listed_at'])
+            if listed and (self._last_listed is None or listed > self._last_listed):
+                self._last_listed = listed
+        
+        logger.info(f"Loaded transcript catalog with {len(rows)} entries")
+    
+    @staticmethod
+    def _parse_time(value) -> Optional[datetime]:
+        """Parse a stored timestamp."""
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+    
+    def _entry(self, key: TranscriptKey) -> Optional[Dict]:
+        """Look up a catalog entry."""
+        return self._catalog.get(key[0], {}).get(key[1:])
+    
+    def get_entry(self, key: TranscriptKey) -> Optional[Dict]:
+        """
+        Get catalog metadata for a transcript.
+        
+        Args:
+            key: (symbol, year, quarter)
+        
+        Returns:
+            Copy of the catalog entry, or None if unknown
+        """
+        entry = self._entry(key)
+        return dict(entry) if entry else None
+    
+    def is_stale(self) -> bool:
+        """Whether the available-transcripts listing should be refreshed."""
+        if self._last_listed is None:
+            return True
+        return (datetime.now() - self._last_listed).total_seconds() > self.refresh_seconds
+    
+    def update_catalog(self, available: List[Dict]) -> int:
+        """
+        Merge an FMP available-transcripts listing into the catalog.
+        
+        Entries already in the catalog keep their stored content; new
+        (symbol, year, quarter) keys are added and the listing time advances.
+        
+        Args:
+            available: Items from the FMP 'earning-call-transcript-latest' endpoint
+        
+        Returns:
+            Number of newly cataloged transcripts
+        """
+        now = datetime.now()
+        listed = []
+        new_count = 0
+        
+        with self._lock:
+            for item in available:
+                key = make_transcript_key(
+                    item.get('symbol', ''),
+                    item.get('fiscalYear') or item.get('year'),
+                    item.get('period') or item.get('quarter')
+                )
+                if key is None:
+                    continue
+                entry = self._entry(key)
+                if entry is None:
+                    entry = {
+                        'symbol': key[0], 'year': key[1], 'quarter': key[2],
+                        'call_date': item.get('date'), 'content_path': None,
+                        'listed_at': None, 'fetched_at': None, 'last_attempt_at': None
+                    }
+                    self._catalog.setdefault(key[0], {})[key[1:]] = entry
+                    new_count += 1
+                entry['listed_at'] = now
+                entry['call_date'] = entry['call_date'] or item.get('date')
+                listed.append((*key, entry['call_date'], now))
+            
+            self.db.conn.executemany("""
+                INSERT INTO TranscriptCatalog (symbol, year, quarter, call_date, listed_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(symbol, year, quarter) DO UPDATE SET
+                    call_date = COALESCE(call_date, excluded.call_date),
+                    listed_at = excluded.listed_at
+            """, listed)
+            self.db.conn.commit()
+            self._last_listed = now
+        
+        logger.info(f"Transcript catalog refreshed: {new_count} new of {len(available)} listed")
+        return new_count
+    
+    def latest_key(self, symbol: str) -> Optional[TranscriptKey]:
+        """
+        Get the most recent cataloged transcript for a symbol.
+        
+        Args:
+            symbol: Stock ticker symbol
+        
+        Returns:
+            (symbol, year, quarter) or None if the symbol is unknown
+        """
+        symbol = symbol.strip().upper()
+        periods = self._catalog.get(symbol)
+        if not periods:
+            return None
+        return (symbol, *max(periods))
+    
+    def list_transcripts(self, symbol: Optional[str] = None) -> List[Dict]:
+        """
+        List cataloged transcripts, newest first.
+        
+        Args:
+            symbol: Restrict to this symbol
+        
+        Returns:
+            Catalog entries with a 'has_content' flag
+        """
+        with self._lock:
+            if symbol:
+                groups = [self._catalog.get(symbol.strip().upper(), {})]
+            else:
+                groups = list(self._catalog.values())
+            entries = [dict(e, has_content=bool(e['content_path'])) for g in groups for e in g.values()]
+        
+        entries.sort(key=lambda e: (e['year'], e['quarter'], e['symbol']), reverse=True)
+        return entries
+    
+    def get(self, key: TranscriptKey) -> Optional[Dict]:
+        """
+        Load stored transcript content without any network access.
+        
+        Args:
+            key: (symbol, year, quarter)
+        
+        Returns:
+            Transcript dict, or None if its content has not been stored
+        """
+        entry = self._entry(key)
+        if not entry or not entry['content_path']:
+            return None
+        try:
+            with gzip.open(entry['content_path'], 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Stored transcript {key} is unreadable: {e}")
+            return None
+    
+    def should_attempt(self, key: TranscriptKey) -> bool:
+        """
+        Whether content for a key is worth requesting from the API.
+        
+        Keys whose content could not be fetched are retried only once the
+        refresh interval has passed.
+        """
+        entry = self._entry(key)
+        if entry is None:
+            return True
+        if entry['content_path']:
+            return False
+        last_attempt = self._parse_time(entry['last_attempt_at'])
+        return (
+            last_attempt is None
+            or (datetime.now() - last_attempt).total_seconds() > self.refresh_seconds
+        )
+    
+    def record_attempt(self, key: TranscriptKey, call_date: Optional[str] = None):
+        """Remember a failed content fetch so it is not retried immediately."""
+        now = datetime.now()
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None:
+                entry = {
+                    'symbol': key[0], 'year': key[1], 'quarter': key[2],
+                    'call_date': call_date, 'content_path': None,
+                    'listed_at': None, 'fetched_at': None, 'last_attempt_at': None
+                }
+                self._catalog.setdefault(key[0], {})[key[1:]] = entry
+            entry['last_attempt_at'] = now
+            self.db.conn.execute("""
+                INSERT INTO TranscriptCatalog (symbol, year, quarter, call_date, last_attempt_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(symbol, year, quarter) DO UPDATE SET
+                    last_attempt_at = excluded.last_attempt_at
+            """, (*key, entry['call_date'], now))
+            self.db.conn.commit()
+    
+    def save(self, key: TranscriptKey, transcript: Dict) -> str:
+        """
+        Compress a fetched transcript to disk and mark it in the catalog.
+        
+        Args:
+            key: (symbol, year, quarter)
+            transcript: Transcript dict including 'content'
+        
+        Returns:
+            Path of the stored file
+        """
+        directory = os.path.join(self.storage_dir, key[0])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{key[1]}_Q{key[2]}.json.gz")
+        
+        # Write then rename so readers never see a partial file
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(transcript, f)
+        os.replace(tmp_path, path)
+        
+        now = datetime.now()
+        call_date = transcript.get('date')
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None:
+                entry = {
+                    'symbol': key[0], 'year': key[1], 'quarter': key[2],
+                    'listed_at': None, 'last_attempt_at': None
+                }
+                self._catalog.setdefault(key[0], {})[key[1:]] = entry
+            entry.update({
+                'call_date': call_date or entry.get('call_date'),
+                'content_path': path,
+                'fetched_at': now
+            })
+            self.db.conn.execute("""
+                INSERT INTO TranscriptCatalog
+                (symbol, year, quarter, call_date, content_path, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(symbol, year, quarter) DO UPDATE SET
+                    call_date = COALESCE(excluded.call_date, call_date),
+                    content_path = excluded.content_path,
+                    fetched_at = excluded.fetched_at
+            """, (*key, call_date, path, now))
+            self.db.conn.commit()
+        
+        return path
+
+
+# Global instance
+_store = None
+_store_lock = threading.Lock()
+
+def get_transcript_store() -> TranscriptStore:
+    """Get or create global transcript store instance."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TranscriptStore()
+    return _store
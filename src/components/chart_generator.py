@@ -1,13 +1,72 @@
 """
 Chart generation utilities for financial data visualization.
 """
+import base64
+import hashlib
+import json
+import logging
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
+from plotly.utils import PlotlyJSONEncoder
+import numpy as np
 import pandas as pd
-from typing import Optional, List
+from typing import Any, Callable, Optional, List, Tuple
 import sys
 sys.path.append('..')
-from config.settings import COLORS, DEFAULT_CHART_HEIGHT
+from config.settings import (
+    COLORS, DEFAULT_CHART_HEIGHT, DEFAULT_CHART_TEMPLATE,
+    CHART_WEBGL_THRESHOLD, FIGURE_CACHE_TTL
+)
+from src.components.downsampling import downsample_line, downsample_ohlc, plot_x, slice_range
+from src.utils.cache_backend import get_cache_backend, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Bump when builders change what they draw, so stale cached figures are ignored
+FIGURE_CACHE_VERSION = 1
+
+# numpy dtype -> plotly.js typed array name ('bdata' encoding)
+_TYPED_ARRAYS = {
+    'float64': 'f8', 'float32': 'f4', 'int32': 'i4', 'uint32': 'u4',
+    'int16': 'i2', 'uint16': 'u2', 'int8': 'i1', 'uint8': 'u1'
+}
+_TYPED_DTYPES = {code: np.dtype(name).newbyteorder('<') for name, code in _TYPED_ARRAYS.items()}
+
+
+def _mark_downsampled(fig: go.Figure, shown: int, total: int):
+    """Record how many points were drawn (pages read fig.layout.meta to explain zooming)."""
+    fig.update_layout(meta=dict(points=shown, total=total, downsampled=shown < total))
+
+
+def _scatter_trace(n_points: int):
+    """Scatter trace class for a trace size (WebGL above CHART_WEBGL_THRESHOLD points)."""
+    return go.Scattergl if n_points > CHART_WEBGL_THRESHOLD else go.Scatter
+
+
+def _sign_marker(values, first: Optional[str] = None) -> dict:
+    """
+    Bar marker colored by sign, computed in one vectorized pass.
+    
+    Colors are sent as numeric codes on a three-stop colorscale rather than
+    one color string per bar, which Plotly would validate bar by bar.
+    
+    Args:
+        values: Numbers to color (>= 0 positive, < 0 or NaN negative)
+        first: Optional color that overrides the first bar
+    
+    Returns:
+        Marker dict for a go.Bar trace
+    """
+    codes = np.where(np.asarray(values, dtype=float) >= 0, 2, 0).astype(np.uint8)
+    if first is not None and len(codes):
+        codes[0] = 1
+    return dict(
+        color=codes,
+        colorscale=[[0, COLORS['negative']], [0.5, first or COLORS['negative']], [1, COLORS['positive']]],
+        cmin=0,
+        cmax=2
+    )
 
 
 def create_line_chart(
@@ -16,11 +75,16 @@ def create_line_chart(
     y_column: str,
     title: str = "",
     y_label: str = "Price",
-    color: str = COLORS['info']
+    color: str = COLORS['info'],
+    max_points: Optional[int] = None,
+    x_range: Optional[Tuple] = None
 ) -> go.Figure:
     """
     Create a line chart for stock prices.
     
+    Long series are downsampled with LTTB to about one point per pixel;
+    pass a narrower x_range to redraw a window at full resolution.
+    
     Args:
         df: DataFrame with data
         x_column: Column name for x-axis (typically date)
@@ -28,15 +92,20 @@ def create_line_chart(
         title: Chart title
         y_label: Y-axis label
         color: Line color
+        max_points: Maximum points drawn (None = sized to chart width, 0 = all)
+        x_range: Optional (start, end) window to draw
         
     Returns:
         Plotly figure object
     """
+    df = slice_range(df, x_column, x_range)
+    x, y = downsample_line(df[x_column], df[y_column], max_points)
+    
     fig = go.Figure()
     
-    fig.add_trace(go.Scatter(
-        x=df[x_column],
-        y=df[y_column],
+    fig.add_trace(_scatter_trace(len(y))(
+        x=x,
+        y=y,
         mode='lines',
         name=y_label,
         line=dict(color=color, width=2),
@@ -52,26 +121,39 @@ def create_line_chart(
         hovermode='x unified',
         showlegend=True
     )
+    _mark_downsampled(fig, len(y), len(df))
     
     return fig
 
 
 def create_candlestick_chart(
     df: pd.DataFrame,
-    title: str = "Stock Price"
+    title: str = "Stock Price",
+    max_points: Optional[int] = None,
+    x_range: Optional[Tuple] = None
 ) -> go.Figure:
     """
     Create a candlestick chart for stock prices.
     
+    Long series are merged into OHLC buckets sized to the chart width;
+    pass a narrower x_range to redraw a window at full resolution.
+    
     Args:
         df: DataFrame with OHLC data
         title: Chart title
+        max_points: Maximum candles drawn (None = sized to chart width, 0 = all)
+        x_range: Optional (start, end) window to draw
         
     Returns:
         Plotly figure object
     """
+    df = slice_range(df, 'date', x_range)
+    total = len(df)
+    if max_points != 0:
+        df = downsample_ohlc(df, max_points)
+    
     fig = go.Figure(data=[go.Candlestick(
-        x=df['date'] if 'date' in df.columns else df.index,
+        x=plot_x(df['date'] if 'date' in df.columns else df.index),
         open=df['open'],
         high=df['high'],
         low=df['low'],
@@ -88,6 +170,7 @@ def create_candlestick_chart(
         height=DEFAULT_CHART_HEIGHT,
         xaxis_rangeslider_visible=False
     )
+    _mark_downsampled(fig, len(df), total)
     
     return fig
 
@@ -106,21 +189,13 @@ def create_volume_chart(
     Returns:
         Plotly figure object
     """
-    # Color bars based on price change
-    colors = []
-    for i in range(len(df)):
-        if i == 0:
-            colors.append(COLORS['info'])
-        else:
-            if df.iloc[i]['close'] >= df.iloc[i-1]['close']:
-                colors.append(COLORS['positive'])
-            else:
-                colors.append(COLORS['negative'])
+    # Color bars based on price change (the first bar has no prior close)
+    marker = _sign_marker(df['close'].diff(), first=COLORS['info'])
     
     fig = go.Figure(data=[go.Bar(
-        x=df['date'] if 'date' in df.columns else df.index,
+        x=plot_x(df['date'] if 'date' in df.columns else df.index),
         y=df['volume'],
-        marker_color=colors,
+        marker=marker,
         name='Volume'
     )])
     
@@ -141,28 +216,39 @@ def create_multi_line_chart(
     x_column: str,
     y_columns: List[str],
     title: str = "",
-    y_label: str = "Value"
+    y_label: str = "Value",
+    max_points: Optional[int] = None,
+    x_range: Optional[Tuple] = None
 ) -> go.Figure:
     """
     Create a multi-line chart for comparing multiple series.
     
+    Each series is downsampled with LTTB on its own (see create_line_chart).
+    
     Args:
         df: DataFrame with data
         x_column: Column name for x-axis
         y_columns: List of column names for y-axis
         title: Chart title
         y_label: Y-axis label
+        max_points: Maximum points per series (None = sized to chart width, 0 = all)
+        x_range: Optional (start, end) window to draw
         
     Returns:
         Plotly figure object
     """
+    df = slice_range(df, x_column, x_range)
+    shown = 0
+    
     fig = go.Figure()
     
     for col in y_columns:
         if col in df.columns:
-            fig.add_trace(go.Scatter(
-                x=df[x_column],
-                y=df[col],
+            x, y = downsample_line(df[x_column], df[col], max_points)
+            shown = max(shown, len(y))
+            fig.add_trace(_scatter_trace(len(y))(
+                x=x,
+                y=y,
                 mode='lines',
                 name=col,
                 hovertemplate='%{y:.2f}<extra></extra>'
@@ -177,6 +263,7 @@ def create_multi_line_chart(
         hovermode='x unified',
         showlegend=True
     )
+    _mark_downsampled(fig, shown, len(df))
     
     return fig
 
@@ -240,17 +327,16 @@ def create_bar_chart(
     """
     # Determine bar colors
     if color_column and color_column in df.columns:
-        colors = [COLORS['positive'] if x >= 0 else COLORS['negative'] 
-                  for x in df[color_column]]
+        marker = _sign_marker(df[color_column])
     else:
-        colors = COLORS['info']
+        marker = dict(color=COLORS['info'])
     
     if horizontal:
         fig = go.Figure(data=[go.Bar(
             y=df[x_column],
             x=df[y_column],
             orientation='h',
-            marker_color=colors
+            marker=marker
         )])
         fig.update_layout(
             xaxis_title=y_column,
@@ -260,7 +346,7 @@ def create_bar_chart(
         fig = go.Figure(data=[go.Bar(
             x=df[x_column],
             y=df[y_column],
-            marker_color=colors
+            marker=marker
         )])
         fig.update_layout(
             xaxis_title=x_column,
@@ -299,9 +385,10 @@ def create_comparison_chart(
     
     fig = go.Figure()
     
+    trace = _scatter_trace(len(df_normalized))
     for col in df_normalized.columns:
         if col != 'date':
-            fig.add_trace(go.Scatter(
+            fig.add_trace(trace(
                 x=df_normalized['date'] if 'date' in df_normalized.columns else df_normalized.index,
                 y=df_normalized[col],
                 mode='lines',
@@ -322,3 +409,185 @@ def create_comparison_chart(
     return fig
 
 
+def create_correlation_heatmap(
+    corr: pd.DataFrame,
+    title: str = "Correlation Matrix",
+    show_labels: Optional[bool] = None
+) -> go.Figure:
+    """
+    Create a correlation heatmap (pass a cluster-ordered matrix to see blocks).
+    
+    Args:
+        corr: Square correlation matrix with tickers as index and columns
+        title: Chart title
+        show_labels: Show ticker tick labels (default only up to 60 names)
+    
+    Returns:
+        Plotly figure object
+    """
+    if show_labels is None:
+        show_labels = len(corr) <= 60
+    labels = [str(c) for c in corr.columns]
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=corr.to_numpy(),
+        x=labels,
+        y=labels,
+        zmin=-1,
+        zmax=1,
+        zmid=0,
+        colorscale='RdBu_r',
+        colorbar=dict(title="ρ"),
+        hovertemplate='%{y} / %{x}<br>ρ = %{z:.2f}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=title,
+        template="plotly_white",
+        height=max(DEFAULT_CHART_HEIGHT, min(900, 12 * len(labels))),
+        xaxis=dict(showticklabels=show_labels, tickangle=-45),
+        yaxis=dict(showticklabels=show_labels, autorange='reversed', scaleanchor='x')
+    )
+    
+    return fig
+
+
+def _narrow(array: np.ndarray) -> np.ndarray:
+    """Smallest typed-array dtype holding the values exactly (whole numbers as integers)."""
+    if array.dtype.kind == 'b':
+        return array.astype(np.uint8)
+    if array.dtype.kind == 'f' and not (np.isfinite(array).all() and (array == np.round(array)).all()):
+        return array.astype(np.float64)
+    low, high = array.min(), array.max()
+    for dtype in (np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return array.astype(dtype)
+    return array.astype(np.float64)
+
+
+def _pack_arrays(value: Any) -> Any:
+    """Replace numeric numpy arrays with base64 typed arrays and dates with ISO strings, recursively."""
+    if isinstance(value, dict):
+        return {k: _pack_arrays(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_pack_arrays(v) for v in value]
+    if isinstance(value, np.ndarray) and value.dtype.kind in 'biuf' and value.size:
+        array = _narrow(value)
+        code = _TYPED_ARRAYS[array.dtype.name]
+        data = np.ascontiguousarray(array, dtype=_TYPED_DTYPES[code])
+        return {'dtype': code, 'bdata': base64.b64encode(data.tobytes()).decode('ascii')}
+    if isinstance(value, np.ndarray) and value.dtype.kind == 'M':
+        # Same ISO text as fig.to_json, so cache hits and misses render alike
+        whole_seconds = (value.astype('datetime64[s]') == value).all()
+        return np.datetime_as_string(value, unit='s' if whole_seconds else 'us').tolist()
+    return value
+
+
+def _unpack_array(obj: dict) -> Any:
+    """json object_hook decoding typed arrays written by _pack_arrays."""
+    if len(obj) == 2 and 'bdata' in obj and obj.get('dtype') in _TYPED_DTYPES:
+        return np.frombuffer(base64.b64decode(obj['bdata']), dtype=_TYPED_DTYPES[obj['dtype']])
+    return obj
+
+
+def figure_to_json(fig: go.Figure) -> str:
+    """
+    Serialize a figure compactly.
+    
+    Numeric arrays are stored as base64 typed arrays ({'dtype', 'bdata'},
+    the plotly.js binary array format) instead of decimal text, and the
+    default template is stored by name rather than expanded.
+    
+    Args:
+        fig: Plotly figure
+    
+    Returns:
+        JSON string
+    """
+    spec = fig.to_plotly_json()
+    layout = spec.get('layout', {})
+    if layout.get('template') == pio.templates[DEFAULT_CHART_TEMPLATE].to_plotly_json():
+        layout['template'] = DEFAULT_CHART_TEMPLATE
+    return json.dumps(_pack_arrays(spec), cls=PlotlyJSONEncoder, separators=(',', ':'))
+
+
+def figure_from_json(payload: str) -> go.Figure:
+    """
+    Inverse of figure_to_json.
+    
+    The payload was serialized from a validated figure, so it is not
+    validated again: plotly's property validation costs more than building
+    a simple chart from scratch.
+    
+    Args:
+        payload: JSON string from figure_to_json
+    
+    Returns:
+        Plotly figure object
+    """
+    spec = json.loads(payload, object_hook=_unpack_array)
+    layout = spec.get('layout', {})
+    if isinstance(layout.get('template'), str):
+        # Expanding a template name is part of the skipped validation
+        layout['template'] = pio.templates[layout['template']].to_plotly_json()
+    return go.Figure(spec, _validate=False)
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame (values, index, columns and dtypes).
+    
+    Args:
+        df: DataFrame
+    
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha1(repr((list(df.columns), [str(t) for t in df.dtypes], df.shape)).encode())
+    if len(df):
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def cached_figure(builder: Callable[..., go.Figure], df: pd.DataFrame, **params) -> go.Figure:
+    """
+    Build a chart, or reuse the one built for the same data and parameters.
+    
+    Figures are stored in the shared cache backend as compact JSON (see
+    figure_to_json), so Streamlit reruns triggered by unrelated widgets skip
+    downsampling and trace construction. Cache errors fall through to
+    building the figure.
+    
+    Args:
+        builder: Chart function taking df as its first argument
+        df: Chart data
+        **params: Keyword arguments for builder
+    
+    Returns:
+        Plotly figure object
+    """
+    key = make_cache_key(
+        'figure', builder.__name__,
+        (FIGURE_CACHE_VERSION, data_fingerprint(df), sorted(params.items()))
+    )
+    backend = get_cache_backend()
+    
+    try:
+        data = backend.get_bytes(key)
+    except Exception as e:
+        logger.warning(f"Figure cache read failed for {key}: {e}")
+        data = None
+    if data is not None:
+        backend.hits += 1
+        return figure_from_json(data.decode('utf-8'))
+    backend.misses += 1
+    
+    fig = builder(df, **params)
+    try:
+        payload = figure_to_json(fig).encode('utf-8')
+        if len(payload) <= backend.max_item_bytes:
+            backend.set_bytes(key, payload, FIGURE_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Figure cache write failed for {key}: {e}")
+    return fig
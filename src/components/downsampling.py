@@ -0,0 +1,182 @@
+"""
+Server-side downsampling for long chart series.
+Lines use Largest-Triangle-Three-Buckets, which keeps the points that shape
+the curve (peaks, troughs, breaks); candles are merged into fixed-count
+buckets that keep each bucket's open, high, low, close and total volume.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import CHART_WIDTH_PX, CHART_CANDLE_PX
+
+
+def line_budget(width_px: int = CHART_WIDTH_PX) -> int:
+    """Points per line trace for a plot width (about one per pixel)."""
+    return max(3, int(width_px))
+
+
+def candle_budget(width_px: int = CHART_WIDTH_PX, candle_px: int = CHART_CANDLE_PX) -> int:
+    """Candles that fit a plot width while staying readable."""
+    return max(2, int(width_px) // max(1, int(candle_px)))
+
+
+def plot_x(x) -> np.ndarray:
+    """
+    X values as a numpy array Plotly serializes quickly.
+    
+    Timezone-aware dates become naive wall-clock datetime64: as an object
+    array of Timestamps they serialize ~100x slower, and plotly.js ignores
+    UTC offsets anyway, so the drawn times are unchanged.
+    """
+    if isinstance(x, (pd.Series, pd.Index)) and isinstance(x.dtype, pd.DatetimeTZDtype):
+        return pd.DatetimeIndex(x).tz_localize(None).to_numpy()
+    return np.asarray(x)
+
+
+def _numeric_x(x) -> np.ndarray:
+    """X values as float64 (datetimes as nanoseconds since the first point)."""
+    values = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        ns = values.dt.tz_localize(None).astype('int64') if values.dt.tz is not None else values.astype('int64')
+        ns = ns.to_numpy()
+        return (ns - ns[0]).astype(float) if len(ns) else ns.astype(float)
+    return values.to_numpy(dtype=float)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps.
+    
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the average of the next bucket.
+    
+    Args:
+        x: Numeric, increasing x values
+        y: Y values (no NaN)
+        n_out: Points to keep
+    
+    Returns:
+        Sorted integer indices into x/y
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # Bucket b covers [edges[b], edges[b + 1]); the last point is its own bucket
+    every = (n - 2) / (n_out - 2)
+    edges = np.append((np.floor(np.arange(n_out - 1) * every) + 1).astype(np.int64), n)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x, edges[:-1]) / counts
+    avg_y = np.add.reduceat(y, edges[:-1]) / counts
+    
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x[b + 1]) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y[b + 1] - ay))
+        a = start + int(np.argmax(area))
+        kept[b + 1] = a
+    return kept
+
+
+def downsample_line(x, y, n_out: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsample one line trace with LTTB (NaN points are dropped first).
+    
+    Args:
+        x: X values (dates or numbers, increasing)
+        y: Y values
+        n_out: Points to keep (default line_budget(), 0 = keep all)
+    
+    Returns:
+        Tuple of (x, y) arrays
+    """
+    x = plot_x(x)
+    y = np.asarray(y, dtype=float)
+    n_out = line_budget() if n_out is None else n_out
+    if n_out <= 0:
+        return x, y
+    valid = ~np.isnan(y)
+    if not valid.all():
+        x, y = x[valid], y[valid]
+    if len(y) <= n_out:
+        return x, y
+    keep = lttb_indices(_numeric_x(x), y, n_out)
+    return x[keep], y[keep]
+
+
+def downsample_ohlc(df: pd.DataFrame, n_out: Optional[int] = None, x_column: str = 'date') -> pd.DataFrame:
+    """
+    Merge consecutive candles into at most n_out buckets.
+    
+    Each bucket opens at its first open, closes at its last close, spans the
+    highest high and lowest low, sums volume and is dated at its first row.
+    
+    Args:
+        df: OHLC rows in time order (open, high, low, close, optional volume)
+        n_out: Maximum candles (default candle_budget(), 0 = keep all)
+        x_column: Date column (the index is used if absent)
+    
+    Returns:
+        Downsampled DataFrame with the same OHLC columns (df itself if
+        already small enough)
+    """
+    n_out = candle_budget() if n_out is None else n_out
+    n = len(df)
+    if n <= n_out or n_out < 1:
+        return df
+    
+    starts = np.unique(np.floor(np.arange(n_out) * n / n_out).astype(np.int64))
+    ends = np.append(starts[1:], n) - 1
+    dates = df[x_column].to_numpy() if x_column in df.columns else df.index.to_numpy()
+    
+    out = {x_column: dates[starts]}
+    out['open'] = df['open'].to_numpy(dtype=float)[starts]
+    out['high'] = np.fmax.reduceat(df['high'].to_numpy(dtype=float), starts)
+    out['low'] = np.fmin.reduceat(df['low'].to_numpy(dtype=float), starts)
+    out['close'] = df['close'].to_numpy(dtype=float)[ends]
+    if 'volume' in df.columns:
+        out['volume'] = np.add.reduceat(np.nan_to_num(df['volume'].to_numpy(dtype=float)), starts)
+    return pd.DataFrame(out)
+
+
+def slice_range(df: pd.DataFrame, x_column: str, x_range: Optional[Tuple]) -> pd.DataFrame:
+    """
+    Rows whose x falls inside x_range (inclusive), for zoomed re-renders.
+    
+    Args:
+        df: Chart data
+        x_column: Date column (the index is used if absent)
+        x_range: (start, end); either may be None
+    
+    Returns:
+        Sliced DataFrame (df itself if x_range is None)
+    """
+    if not x_range:
+        return df
+    x = pd.Series(df[x_column] if x_column in df.columns else df.index, index=df.index)
+    start, end = x_range
+    mask = pd.Series(True, index=df.index)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        tz = x.dt.tz
+        
+        def bound(value, end_of_day=False):
+            ts = pd.Timestamp(value)
+            if end_of_day and ts == ts.normalize():
+                ts += pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+            if tz is not None and ts.tzinfo is None:
+                ts = ts.tz_localize(tz)
+            return ts
+        
+        start = bound(start) if start is not None else None
+        end = bound(end, end_of_day=True) if end is not None else None
+    if start is not None:
+        mask &= x >= start
+    if end is not None:
+        mask &= x <= end
+    return df[mask.to_numpy()]
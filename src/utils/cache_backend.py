@@ -0,0 +1,676 @@
+"""
+Pluggable cache backends shared by the fetcher and analysis layers.
+Unlike st.cache_data, the SQLite and Redis backends are shared by every
+Streamlit process on a host (or behind a load balancer), so replicas stop
+warming their own caches and spending their own API quota.
+"""
+import functools
+import hashlib
+import inspect
+import io
+import json
+import logging
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from config.settings import (
+    CACHE_BACKEND, CACHE_MAX_BYTES, CACHE_MAX_ITEM_BYTES,
+    CACHE_SQLITE_PATH, CACHE_REDIS_URL, CACHE_NAMESPACE, CACHE_TOUCH_INTERVAL_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401  (enables Parquet serialization of DataFrames)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# One-byte format tags prefixed to every serialized value
+_PARQUET = b'P'
+_JSON = b'J'
+_PICKLE = b'K'
+
+
+def _to_jsonable(value: Any) -> Any:
+    """
+    Convert a value to plain JSON types, tagging the ones JSON cannot hold.
+    
+    Raises:
+        TypeError: For objects with no safe representation
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: _to_jsonable(v) for k, v in value.items()}
+        return {'__items__': [[_to_jsonable(k), _to_jsonable(v)] for k, v in value.items()]}
+    if isinstance(value, list):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, tuple):
+        return {'__tuple__': [_to_jsonable(v) for v in value]}
+    if isinstance(value, pd.DataFrame):
+        return {'__frame__': value.to_json(orient='table', date_unit='ns')}
+    if isinstance(value, pd.Series):
+        return {
+            '__series__': value.to_frame('values').to_json(orient='table', date_unit='ns'),
+            'name': _to_jsonable(value.name)
+        }
+    if isinstance(value, pd.Timestamp):
+        return {'__timestamp__': value.isoformat()}
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind not in 'biufc':
+            return {'__list_array__': [_to_jsonable(v) for v in value.tolist()]}
+        return {'__ndarray__': value.tolist(), 'dtype': value.dtype.str}
+    if isinstance(value, np.generic):
+        return _to_jsonable(value.item())
+    raise TypeError(f"{type(value).__name__} has no safe cache representation")
+
+
+def _from_jsonable(obj: Dict) -> Any:
+    """json object_hook reversing _to_jsonable's tags."""
+    if '__items__' in obj:
+        return {_hashable(k): v for k, v in obj['__items__']}
+    if '__tuple__' in obj:
+        return tuple(obj['__tuple__'])
+    if '__frame__' in obj:
+        return pd.read_json(io.StringIO(obj['__frame__']), orient='table')
+    if '__series__' in obj:
+        return pd.read_json(io.StringIO(obj['__series__']), orient='table')['values'].rename(obj['name'])
+    if '__timestamp__' in obj:
+        return pd.Timestamp(obj['__timestamp__'])
+    if '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    if '__date__' in obj:
+        return date.fromisoformat(obj['__date__'])
+    if '__ndarray__' in obj:
+        return np.array(obj['__ndarray__'], dtype=np.dtype(obj['dtype']))
+    if '__list_array__' in obj:
+        return np.array(obj['__list_array__'], dtype=object)
+    return obj
+
+
+def _hashable(key: Any) -> Any:
+    """Decoded dict keys: JSON lists come back for tuple-like keys."""
+    return tuple(key) if isinstance(key, list) else key
+
+
+def serialize(value: Any, allow_pickle: bool = False) -> bytes:
+    """
+    Serialize a value for storage.
+    
+    DataFrames are written as Parquet (columnar, compressed, no Python
+    objects) when pyarrow is installed; everything else, and DataFrames
+    Parquet cannot represent, is written as tagged JSON. Pickle is only
+    used when allow_pickle is set, i.e. for stores no other process can
+    write to: unpickling bytes from a shared store would let anyone with
+    write access to it run code in the app.
+    
+    Args:
+        value: Value to serialize
+        allow_pickle: Fall back to pickle for values JSON cannot hold
+    
+    Returns:
+        Tagged bytes
+    
+    Raises:
+        TypeError: If the value cannot be stored safely and pickle is not allowed
+    """
+    if PARQUET_AVAILABLE and isinstance(value, pd.DataFrame):
+        try:
+            buffer = io.BytesIO()
+            value.to_parquet(buffer, engine='pyarrow', compression='zstd')
+            return _PARQUET + buffer.getvalue()
+        except Exception:
+            pass  # e.g. non-string column labels or mixed-type object columns
+    try:
+        return _JSON + json.dumps(_to_jsonable(value), separators=(',', ':')).encode('utf-8')
+    except (TypeError, ValueError):
+        if not allow_pickle:
+            raise
+    return _PICKLE + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def deserialize(data: bytes, allow_pickle: bool = False) -> Any:
+    """
+    Inverse of serialize.
+    
+    Args:
+        data: Tagged bytes
+        allow_pickle: Accept pickled values (trusted, in-process stores only)
+    
+    Returns:
+        Original value
+    
+    Raises:
+        ValueError: For unknown formats, or pickled data when not allowed
+    """
+    tag, payload = data[:1], data[1:]
+    if tag == _PARQUET:
+        return pd.read_parquet(io.BytesIO(payload), engine='pyarrow')
+    if tag == _JSON:
+        return json.loads(payload.decode('utf-8'), object_hook=_from_jsonable)
+    if tag == _PICKLE and allow_pickle:
+        return pickle.loads(payload)
+    raise ValueError(f"Refusing cache value format {tag!r}")
+
+
+class CacheBackend(ABC):
+    """Byte-oriented key/value store with TTLs."""
+    
+    name = 'base'
+    trusted = False  # Only in-process stores may hold pickled values
+    
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES, max_item_bytes: int = CACHE_MAX_ITEM_BYTES):
+        """
+        Initialize the backend.
+        
+        Args:
+            max_bytes: Total size of stored values before least recently used
+                       entries are evicted
+            max_item_bytes: Values larger than this are not cached
+        """
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @abstractmethod
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Get raw bytes for a key (None if missing or expired)."""
+    
+    @abstractmethod
+    def set_bytes(self, key: str, data: bytes, ttl: Optional[float] = None):
+        """Store raw bytes, expiring after ttl seconds (None = no expiry)."""
+    
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove a key."""
+    
+    @abstractmethod
+    def clear(self):
+        """Remove every key."""
+    
+    @abstractmethod
+    def size(self) -> Tuple[int, int]:
+        """Get (number of entries, total bytes)."""
+    
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value in a format this store may hold."""
+        return serialize(value, allow_pickle=self.trusted)
+    
+    def loads(self, data: bytes) -> Any:
+        """Deserialize bytes read from this store."""
+        return deserialize(data, allow_pickle=self.trusted)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a cached value.
+        
+        Args:
+            key: Cache key
+            default: Returned when the key is missing or expired
+        
+        Returns:
+            Deserialized value or default
+        """
+        data = self.get_bytes(key)
+        if data is not None:
+            try:
+                value = self.loads(data)
+            except ValueError as e:
+                logger.warning(f"Ignoring cached {key}: {e}")
+            else:
+                self.hits += 1
+                return value
+        self.misses += 1
+        return default
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        Cache a value.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds until the value expires (None = no expiry)
+        
+        Returns:
+            False if the value was too large or cannot be stored safely
+        """
+        try:
+            data = self.dumps(value)
+        except (TypeError, ValueError) as e:
+            logger.info(f"Not caching {key}: {e}")
+            return False
+        if len(data) > self.max_item_bytes:
+            logger.info(f"Not caching {key}: {len(data)} bytes exceeds item limit")
+            return False
+        self.set_bytes(key, data, ttl)
+        return True
+    
+    def stats(self) -> Dict:
+        """Get hit/miss/eviction counts and current size."""
+        entries, total = self.size()
+        return {
+            'backend': self.name,
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU cache bounded by total value size."""
+    
+    name = 'memory'
+    trusted = True
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries: 'OrderedDict[str, Tuple[bytes, Optional[float]]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return data
+    
+    def set_bytes(self, key: str, data: bytes, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (data, expires_at)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def _remove(self, key: str):
+        data, _ = self._entries.pop(key)
+        self._bytes -= len(data)
+    
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def size(self) -> Tuple[int, int]:
+        with self._lock:
+            return len(self._entries), self._bytes
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    On-disk cache in its own SQLite file, shared by every process on the host.
+    Evicts least recently accessed entries once the total size exceeds max_bytes;
+    access times are updated at most every touch_interval seconds per entry.
+    """
+    
+    name = 'sqlite'
+    
+    def __init__(
+        self,
+        db_path: str = CACHE_SQLITE_PATH,
+        touch_interval: float = CACHE_TOUCH_INTERVAL_SECONDS,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.touch_interval = touch_interval
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._local = threading.local()
+        
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS CacheEntries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON CacheEntries(accessed_at)")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run during writes."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM CacheEntries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None  # Expired rows are removed by the next write's eviction pass
+        # Reads take the write lock only to refresh a stale LRU time, so
+        # concurrent readers in several processes rarely contend
+        if now - row[2] >= self.touch_interval:
+            with conn:
+                conn.execute("UPDATE CacheEntries SET accessed_at = ? WHERE key = ?", (now, key))
+        return bytes(row[0])
+    
+    def set_bytes(self, key: str, data: bytes, ttl: Optional[float] = None):
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO CacheEntries (key, value, size, expires_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (key, sqlite3.Binary(data), len(data), now + ttl if ttl is not None else None, now))
+            self._evict(conn, now)
+    
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        conn.execute("DELETE FROM CacheEntries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM CacheEntries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        # Walk entries oldest-first and delete until enough bytes are freed
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM CacheEntries ORDER BY accessed_at"):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        conn.executemany("DELETE FROM CacheEntries WHERE key = ?", victims)
+        self.evictions += len(victims)
+    
+    def delete(self, key: str):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM CacheEntries WHERE key = ?", (key,))
+    
+    def clear(self):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM CacheEntries")
+    
+    def size(self) -> Tuple[int, int]:
+        row = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM CacheEntries"
+        ).fetchone()
+        return row[0], row[1]
+
+
+class RespConnection:
+    """Minimal client for the Redis serialization protocol (RESP2)."""
+    
+    def __init__(self, host: str, port: int, password: Optional[str] = None, db: int = 0, timeout: float = 5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.reader = self.sock.makefile('rb')
+        if password:
+            self.execute('AUTH', password)
+        if db:
+            self.execute('SELECT', db)
+    
+    def execute(self, *args) -> Any:
+        """
+        Send one command and read its reply.
+        
+        Raises:
+            RuntimeError: If the server replies with an error
+        """
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self.sock.sendall(b''.join(parts))
+        return self._read_reply()
+    
+    def _read_reply(self) -> Any:
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode()
+        if kind == b'-':
+            raise RuntimeError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(rest)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RuntimeError(f"Unexpected RESP reply {line!r}")
+    
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisBackend(CacheBackend):
+    """
+    Cache on any Redis-compatible server (Redis, KeyDB, Valkey, or a local
+    stand-in speaking RESP), shared by every replica.
+    
+    Expiry uses the server's PX option. Size-based eviction is the server's
+    job (configure maxmemory with allkeys-lru); max_item_bytes is enforced here.
+    """
+    
+    name = 'redis'
+    
+    def __init__(self, url: str = CACHE_REDIS_URL, namespace: str = CACHE_NAMESPACE, **kwargs):
+        super().__init__(**kwargs)
+        parts = urlsplit(url)
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.lstrip('/') or 0)
+        self.prefix = f"{namespace}:"
+        self._local = threading.local()
+    
+    def _connect(self) -> RespConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = RespConnection(self.host, self.port, self.password, self.db)
+            self._local.conn = conn
+        return conn
+    
+    def _execute(self, *args) -> Any:
+        """Run a command, reconnecting once if the connection dropped."""
+        try:
+            return self._connect().execute(*args)
+        except (ConnectionError, OSError):
+            conn = getattr(self._local, 'conn', None)
+            if conn is not None:
+                conn.close()
+            self._local.conn = None
+            return self._connect().execute(*args)
+    
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        return self._execute('GET', self.prefix + key)
+    
+    def set_bytes(self, key: str, data: bytes, ttl: Optional[float] = None):
+        if ttl is not None:
+            self._execute('SET', self.prefix + key, data, 'PX', max(1, int(ttl * 1000)))
+        else:
+            self._execute('SET', self.prefix + key, data)
+    
+    def delete(self, key: str):
+        self._execute('DEL', self.prefix + key)
+    
+    def _scan(self) -> List[bytes]:
+        """All keys in this namespace."""
+        keys, cursor = [], '0'
+        while True:
+            cursor, batch = self._execute('SCAN', cursor, 'MATCH', self.prefix + '*', 'COUNT', 500)
+            keys.extend(batch)
+            cursor = cursor.decode() if isinstance(cursor, bytes) else str(cursor)
+            if cursor == '0':
+                return keys
+    
+    def clear(self):
+        keys = self._scan()
+        for i in range(0, len(keys), 500):
+            self._execute('DEL', *keys[i:i + 500])
+    
+    def size(self) -> Tuple[int, int]:
+        keys = self._scan()
+        total = 0
+        for key in keys:
+            total += self._execute('STRLEN', key) or 0
+        return len(keys), total
+
+
+def create_backend(kind: str = CACHE_BACKEND, **kwargs) -> CacheBackend:
+    """
+    Create a cache backend.
+    
+    Args:
+        kind: 'memory', 'sqlite' or 'redis'
+        **kwargs: Backend options (max_bytes, db_path, url, ...)
+    
+    Returns:
+        Cache backend instance
+    """
+    backends = {'memory': MemoryBackend, 'sqlite': SQLiteBackend, 'redis': RedisBackend}
+    if kind not in backends:
+        raise ValueError(f"Unknown cache backend '{kind}'; expected one of {sorted(backends)}")
+    return backends[kind](**kwargs)
+
+
+def is_empty_result(value: Any) -> bool:
+    """
+    Whether a fetch result is None, empty, or a dict of empty values (the
+    fetchers return these instead of raising when a request fails).
+    """
+    if value is None:
+        return True
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.empty
+    if isinstance(value, dict):
+        return all(is_empty_result(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return len(value) == 0
+    return False
+
+
+def make_cache_key(namespace: str, name: str, arguments: Any) -> str:
+    """Stable key for a function call (the same in every process)."""
+    digest = hashlib.sha1(repr(arguments).encode()).hexdigest()
+    return f"{namespace}:{name}:{digest}"
+
+
+def cached(namespace: str, ttl: Optional[float] = None, is_method: bool = True) -> Callable:
+    """
+    Decorator caching a function's results in the shared cache backend.
+    
+    Drop-in replacement for st.cache_data on fetcher and analysis functions:
+    the instance is left out of the key, empty results (failed fetches, see
+    is_empty_result) are not cached, and cache errors fall through to calling
+    the function.
+    
+    Callers pass refresh=True to skip the cached value when it was explicitly
+    invalidated; the fresh result still replaces it for everyone else.
+    
+    Args:
+        namespace: Key prefix (usually the data source, e.g. 'yfinance')
+        ttl: Seconds results stay cached (None = until evicted)
+        is_method: Whether the first argument is self
+    
+    Returns:
+        Decorator
+    """
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+        
+        @functools.wraps(fn)
+        def wrapper(*args, refresh: bool = False, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.items())[1 if is_method else 0:]
+            key = make_cache_key(namespace, fn.__qualname__, arguments)
+            backend = get_cache_backend()
+            
+            if not refresh:
+                try:
+                    data = backend.get_bytes(key)
+                    if data is not None:
+                        value = backend.loads(data)
+                        backend.hits += 1
+                        return value
+                except Exception as e:
+                    logger.warning(f"Cache read failed for {key}: {e}")
+            backend.misses += 1
+            
+            result = fn(*args, **kwargs)
+            if not is_empty_result(result):
+                try:
+                    backend.set(key, result, ttl)
+                except Exception as e:
+                    logger.warning(f"Cache write failed for {key}: {e}")
+            return result
+        
+        return wrapper
+    
+    return decorator
+
+
+# Global instance
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_cache_backend() -> CacheBackend:
+    """Get or create global cache backend instance (kind from CACHE_BACKEND)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+    return _backend
@@ -21,6 +21,9 @@ class Database:
         
     def connect(self):
         """Establish database connection."""
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
         self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row  # Enable column access by name
         return self.conn
@@ -114,9 +117,36 @@ class Database:
                 summary TEXT,
                 publish_date TIMESTAMP NOT NULL,
                 source TEXT,
-                url TEXT UNIQUE,
+                url TEXT,
                 related_ticker TEXT,
-                sentiment_score REAL
+                sentiment_score REAL,
+                provider TEXT,
+                sentiment_label TEXT,
+                fetched_at TIMESTAMP,
+                sentiment_confidence REAL,
+                UNIQUE(url, related_ticker)
+            )
+        """)
+        self._add_missing_columns("NewsArticles", {
+            "provider": "TEXT",
+            "sentiment_label": "TEXT",
+            "fetched_at": "TIMESTAMP",
+            "sentiment_confidence": "REAL"
+        })
+        self._migrate_news_url_uniqueness()
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_news_ticker_date
+            ON NewsArticles (related_ticker, publish_date)
+        """)
+        
+        # NewsFetchState table (per-source high-water marks for incremental fetching)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS NewsFetchState (
+                ticker TEXT NOT NULL,
+                source TEXT NOT NULL,
+                last_published_at TIMESTAMP,
+                last_fetched_at TIMESTAMP,
+                PRIMARY KEY (ticker, source)
             )
         """)
         
@@ -152,6 +182,7 @@ class Database:
                 user_id INTEGER NOT NULL,
                 portfolio_name TEXT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                cost_basis_method TEXT DEFAULT 'FIFO',
                 FOREIGN KEY (user_id) REFERENCES Users(user_id),
                 UNIQUE(user_id, portfolio_name)
             )
@@ -173,6 +204,68 @@ class Database:
             )
         """)
         
+        self._add_missing_columns("Portfolios", {
+            "cost_basis_method": "TEXT DEFAULT 'FIFO'"
+        })
+        
+        # Transactions table (append-only ledger: buys, sells, dividends, splits)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS Transactions (
+                txn_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                portfolio_id INTEGER NOT NULL,
+                ticker TEXT NOT NULL,
+                txn_type TEXT NOT NULL,
+                trade_date DATE NOT NULL,
+                quantity REAL,
+                price REAL,
+                fees REAL DEFAULT 0,
+                amount REAL,
+                realized_pl REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (portfolio_id) REFERENCES Portfolios(portfolio_id),
+                CHECK (txn_type IN ('BUY', 'SELL', 'DIVIDEND', 'SPLIT'))
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_transactions_position
+            ON Transactions(portfolio_id, ticker, trade_date, txn_id)
+        """)
+        
+        # TaxLots table (open lots; closed lots are deleted)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS TaxLots (
+                lot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                portfolio_id INTEGER NOT NULL,
+                ticker TEXT NOT NULL,
+                open_txn_id INTEGER,
+                open_date DATE NOT NULL,
+                quantity REAL NOT NULL,
+                cost_per_share REAL NOT NULL,
+                FOREIGN KEY (open_txn_id) REFERENCES Transactions(txn_id)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_taxlots_position
+            ON TaxLots(portfolio_id, ticker, open_date, lot_id)
+        """)
+        
+        # PositionState table (running totals maintained as transactions append)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS PositionState (
+                portfolio_id INTEGER NOT NULL,
+                ticker TEXT NOT NULL,
+                quantity REAL NOT NULL DEFAULT 0,
+                cost_basis REAL NOT NULL DEFAULT 0,
+                realized_pl REAL NOT NULL DEFAULT 0,
+                dividends REAL NOT NULL DEFAULT 0,
+                fees REAL NOT NULL DEFAULT 0,
+                last_trade_date DATE,
+                last_txn_id INTEGER,
+                updated_at TIMESTAMP,
+                PRIMARY KEY (portfolio_id, ticker)
+            )
+        """)
+        
         # Alerts table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS Alerts (
@@ -193,6 +286,10 @@ class Database:
                        (company_id IS NULL AND index_id IS NOT NULL))
             )
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_alerts_status
+            ON Alerts(status, alert_id)
+        """)
         
         # AnalysisTemplates table
         cursor.execute("""
@@ -214,13 +311,233 @@ class Database:
                 timestamp TIMESTAMP NOT NULL UNIQUE,
                 overall_market_sentiment REAL,
                 source TEXT,
-                category TEXT
+                category TEXT,
+                weighted_sentiment REAL,
+                sentiment_dispersion REAL,
+                article_count INTEGER,
+                ticker_count INTEGER,
+                updated_at TIMESTAMP
             )
         """)
+        self._add_missing_columns("MarketSentiment", {
+            "weighted_sentiment": "REAL",
+            "sentiment_dispersion": "REAL",
+            "article_count": "INTEGER",
+            "ticker_count": "INTEGER",
+            "updated_at": "TIMESTAMP"
+        })
+        
+        # DailySentiment table (per-ticker daily news sentiment series)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS DailySentiment (
+                ticker TEXT NOT NULL,
+                day DATE NOT NULL,
+                article_count INTEGER NOT NULL,
+                mean_sentiment REAL,
+                weighted_sentiment REAL,
+                sentiment_dispersion REAL,
+                positive_count INTEGER,
+                negative_count INTEGER,
+                neutral_count INTEGER,
+                updated_at TIMESTAMP,
+                PRIMARY KEY (ticker, day)
+            )
+        """)
+        
+        # AggregationState table (row high-water marks for incremental jobs)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS AggregationState (
+                job_name TEXT PRIMARY KEY,
+                last_row_id INTEGER NOT NULL,
+                updated_at TIMESTAMP
+            )
+        """)
+        
+        # TranscriptSentiment table (final results of background analysis jobs)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS TranscriptSentiment (
+                result_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticker TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                result_json TEXT NOT NULL,
+                segments_analyzed INTEGER,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(ticker, year, quarter)
+            )
+        """)
+        
+        # TranscriptSegments table (earnings call text split for search)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS TranscriptSegments (
+                segment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticker TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                call_date DATE,
+                segment_index INTEGER NOT NULL,
+                speaker TEXT,
+                content TEXT NOT NULL,
+                UNIQUE(ticker, year, quarter, segment_index)
+            )
+        """)
+        
+        # TranscriptCatalog table (known transcripts and their on-disk content)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS TranscriptCatalog (
+                symbol TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                quarter INTEGER NOT NULL,
+                call_date TEXT,
+                content_path TEXT,
+                listed_at TIMESTAMP,
+                fetched_at TIMESTAMP,
+                last_attempt_at TIMESTAMP,
+                PRIMARY KEY (symbol, year, quarter)
+            )
+        """)
+        
+        # ScreenerFactors table (nightly factor snapshot, one row per ticker)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ScreenerFactors (
+                ticker TEXT PRIMARY KEY,
+                as_of DATE NOT NULL,
+                company_name TEXT,
+                sector TEXT,
+                industry TEXT,
+                market_cap REAL,
+                price REAL,
+                volume REAL,
+                return_1d REAL,
+                return_5d REAL,
+                return_1m REAL,
+                return_3m REAL,
+                return_6m REAL,
+                return_ytd REAL,
+                return_1y REAL,
+                return_5y REAL,
+                return_10y REAL,
+                return_max REAL,
+                volatility_20d REAL,
+                volatility_1y REAL,
+                rsi REAL,
+                dist_ma_20 REAL,
+                dist_ma_50 REAL,
+                dist_ma_200 REAL,
+                sentiment REAL,
+                sentiment_articles INTEGER,
+                updated_at TIMESTAMP
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_screener_sector_cap
+            ON ScreenerFactors(sector, market_cap)
+        """)
         
         self.conn.commit()
+        self.initialize_search_index()
         print("Database schema initialized successfully!")
         
+    def initialize_search_index(self):
+        """Create FTS5 full-text indexes over news and transcript segments.
+        
+        The indexes are external-content tables kept in sync by triggers, so
+        every insert into NewsArticles or TranscriptSegments is indexed
+        immediately. Skipped (with a warning) if SQLite lacks FTS5.
+        """
+        cursor = self.conn.cursor()
+        indexed_tables = {
+            "NewsArticlesFTS": ("NewsArticles", "article_id", ["title", "summary"]),
+            "TranscriptSegmentsFTS": ("TranscriptSegments", "segment_id", ["speaker", "content"]),
+        }
+        
+        for fts_table, (base_table, key, columns) in indexed_tables.items():
+            exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (fts_table,)
+            ).fetchone()
+            if not exists:
+                try:
+                    cursor.execute(f"""
+                        CREATE VIRTUAL TABLE {fts_table} USING fts5(
+                            {', '.join(columns)},
+                            content='{base_table}',
+                            content_rowid='{key}',
+                            tokenize='porter unicode61'
+                        )
+                    """)
+                except sqlite3.OperationalError as e:
+                    print(f"Full-text search unavailable ({e}); skipping {fts_table}")
+                    continue
+            
+            # Triggers are created even for an existing index: rebuilding the
+            # base table (see _migrate_news_url_uniqueness) drops them
+            cols = ', '.join(columns)
+            new_vals = ', '.join(f"new.{c}" for c in columns)
+            old_vals = ', '.join(f"old.{c}" for c in columns)
+            cursor.executescript(f"""
+                CREATE TRIGGER IF NOT EXISTS {base_table}_ai AFTER INSERT ON {base_table} BEGIN
+                    INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.{key}, {new_vals});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {base_table}_ad AFTER DELETE ON {base_table} BEGIN
+                    INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.{key}, {old_vals});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {base_table}_au AFTER UPDATE OF {cols} ON {base_table} BEGIN
+                    INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.{key}, {old_vals});
+                    INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.{key}, {new_vals});
+                END;
+            """)
+            
+            # Index rows stored before the search index existed
+            if not exists:
+                cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+        
+        self.conn.commit()
+    
+    def _add_missing_columns(self, table: str, columns: dict):
+        """Add columns introduced after a table was first created.
+        
+        Args:
+            table: Table name
+            columns: Mapping of column name to SQL type
+        """
+        cursor = self.conn.cursor()
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        for name, sql_type in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+    
+    def _migrate_news_url_uniqueness(self):
+        """Rebuild NewsArticles tables created with a global UNIQUE url.
+        
+        An article covering two tickers must be stored once per ticker, so
+        uniqueness is on (url, related_ticker). SQLite cannot drop a column
+        constraint in place, so the table is copied; rows keep their
+        article_id. The copy drops the old table's indexes and FTS triggers:
+        initialize_schema recreates them, and the search index is rebuilt
+        here from the new table.
+        """
+        cursor = self.conn.cursor()
+        row = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'NewsArticles'"
+        ).fetchone()
+        if not row or 'url TEXT UNIQUE' not in row[0]:
+            return
+        
+        columns = [r[1] for r in cursor.execute("PRAGMA table_info(NewsArticles)")]
+        cursor.execute("ALTER TABLE NewsArticles RENAME TO NewsArticles_old")
+        cursor.execute(row[0].replace('url TEXT UNIQUE', 'url TEXT').rstrip().rstrip(')')
+                       + ",\n                UNIQUE(url, related_ticker)\n            )")
+        column_list = ', '.join(columns)
+        cursor.execute(f"INSERT INTO NewsArticles ({column_list}) SELECT {column_list} FROM NewsArticles_old")
+        cursor.execute("DROP TABLE NewsArticles_old")
+        has_index = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'NewsArticlesFTS'"
+        ).fetchone()
+        if has_index:
+            cursor.execute("INSERT INTO NewsArticlesFTS(NewsArticlesFTS) VALUES('rebuild')")
+        print("Migrated NewsArticles to per-ticker url uniqueness")
+    
     def create_demo_user(self):
         """Create a default demo user if none exists."""
         if not self.conn:
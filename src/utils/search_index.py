@@ -0,0 +1,269 @@
+"""
+Full-text search over stored news articles and earnings call transcripts.
+Backed by the SQLite FTS5 indexes created in Database.initialize_search_index.
+"""
+import logging
+import re
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional, Union
+
+from src.utils.database import Database
+from config.settings import DATABASE_PATH
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, date, datetime]
+
+_SPEAKER_PATTERN = re.compile(r"^([A-Z][\w .,'&-]{1,60}?):\s+(.*)$", re.S)
+MAX_SEGMENT_CHARS = 1500
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free-form user input into a safe FTS5 MATCH expression.
+    
+    Quoted text becomes a phrase, bare words are matched as individual terms
+    (all terms must appear) and a trailing '*' on a word keeps prefix search.
+    
+    Args:
+        query: User query, e.g. '"guidance cut" margin'
+    
+    Returns:
+        FTS5 query string
+    """
+    parts = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', query):
+        if phrase:
+            tokens = re.findall(r'\w+', phrase)
+            if tokens:
+                parts.append('"' + ' '.join(tokens) + '"')
+        else:
+            prefix = word.endswith('*')
+            tokens = re.findall(r'\w+', word)
+            for token in tokens:
+                parts.append(f'"{token}"')
+            if prefix and tokens:
+                parts[-1] += '*'
+    return ' '.join(parts)
+
+
+def split_transcript(content: str) -> List[Dict]:
+    """
+    Split a transcript into speaker-attributed segments for indexing.
+    
+    Args:
+        content: Full transcript text
+    
+    Returns:
+        List of dicts with 'speaker' (or None) and 'content'
+    """
+    segments = []
+    for block in re.split(r'\n\s*\n|\n(?=[A-Z][\w .,\'&-]{1,60}?:\s)', content):
+        block = block.strip()
+        if not block:
+            continue
+        
+        match = _SPEAKER_PATTERN.match(block)
+        speaker, text = (match.group(1), match.group(2)) if match else (None, block)
+        
+        # Long monologues are split on sentence boundaries
+        while len(text) > MAX_SEGMENT_CHARS:
+            cut = text.rfind('. ', 0, MAX_SEGMENT_CHARS)
+            cut = cut + 1 if cut > 0 else MAX_SEGMENT_CHARS
+            segments.append({'speaker': speaker, 'content': text[:cut].strip()})
+            text = text[cut:].strip()
+        if text:
+            segments.append({'speaker': speaker, 'content': text})
+    
+    return segments
+
+
+def _to_date_str(value: Optional[DateLike]) -> Optional[str]:
+    """Format a date filter as 'YYYY-MM-DD'."""
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    return str(value)[:10]
+
+
+class SearchIndex:
+    """Ranked keyword/phrase search with ticker and date filters."""
+    
+    def __init__(self, db_path: str = DATABASE_PATH):
+        """
+        Initialize the search index.
+        
+        Args:
+            db_path: SQLite database path
+        """
+        self._lock = threading.Lock()
+        self.db = Database(db_path)
+        self.db.connect()
+        self.db.initialize_schema()
+    
+    def index_transcript(
+        self,
+        ticker: str,
+        year: int,
+        quarter: int,
+        content: str,
+        call_date: Optional[DateLike] = None
+    ) -> int:
+        """
+        Store a transcript's segments; triggers add them to the FTS index.
+        
+        Re-indexing the same (ticker, year, quarter) replaces its segments.
+        
+        Args:
+            ticker: Stock ticker symbol
+            year: Fiscal year
+            quarter: Quarter number
+            content: Full transcript text
+            call_date: Date of the call, used by date filters
+        
+        Returns:
+            Number of segments indexed
+        """
+        segments = split_transcript(content or '')
+        key = (ticker.upper(), int(year), int(quarter))
+        
+        with self._lock:
+            cursor = self.db.conn.cursor()
+            cursor.execute(
+                "DELETE FROM TranscriptSegments WHERE ticker = ? AND year = ? AND quarter = ?",
+                key
+            )
+            cursor.executemany("""
+                INSERT INTO TranscriptSegments
+                (ticker, year, quarter, call_date, segment_index, speaker, content)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (*key, _to_date_str(call_date), i, seg['speaker'], seg['content'])
+                for i, seg in enumerate(segments)
+            ])
+            self.db.conn.commit()
+        
+        logger.info(f"Indexed {len(segments)} transcript segments for {key}")
+        return len(segments)
+    
+    def search_news(
+        self,
+        query: str,
+        tickers: Optional[List[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        limit: int = 20
+    ) -> List[Dict]:
+        """
+        Search stored news headlines and summaries.
+        
+        Args:
+            query: Keywords and/or "quoted phrases"
+            tickers: Restrict to these tickers
+            start_date: Earliest publish date (inclusive)
+            end_date: Latest publish date (inclusive)
+            limit: Maximum number of results
+        
+        Returns:
+            Matching articles ordered by BM25 relevance, with a highlighted snippet
+        """
+        sql = """
+            SELECT a.article_id, a.title, a.summary, a.publish_date, a.source, a.url,
+                   a.related_ticker, a.sentiment_score,
+                   snippet(NewsArticlesFTS, -1, '[', ']', '...', 16) AS snippet,
+                   bm25(NewsArticlesFTS, 2.0, 1.0) AS rank
+            FROM NewsArticlesFTS
+            JOIN NewsArticles a ON a.article_id = NewsArticlesFTS.rowid
+            WHERE NewsArticlesFTS MATCH ?
+        """
+        sql, params = self._add_filters(
+            sql, [build_match_query(query)], 'a.related_ticker', 'a.publish_date',
+            tickers, start_date, end_date
+        )
+        return self._run(sql + " ORDER BY rank LIMIT ?", params + [limit])
+    
+    def search_transcripts(
+        self,
+        query: str,
+        tickers: Optional[List[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        limit: int = 20
+    ) -> List[Dict]:
+        """
+        Search stored earnings call transcript segments.
+        
+        Args:
+            query: Keywords and/or "quoted phrases", e.g. '"guidance cut"'
+            tickers: Restrict to these tickers
+            start_date: Earliest call date (inclusive)
+            end_date: Latest call date (inclusive)
+            limit: Maximum number of results
+        
+        Returns:
+            Matching segments ordered by BM25 relevance, with a highlighted snippet
+        """
+        sql = """
+            SELECT s.segment_id, s.ticker, s.year, s.quarter, s.call_date,
+                   s.segment_index, s.speaker, s.content,
+                   snippet(TranscriptSegmentsFTS, 1, '[', ']', '...', 24) AS snippet,
+                   bm25(TranscriptSegmentsFTS, 0.5, 1.0) AS rank
+            FROM TranscriptSegmentsFTS
+            JOIN TranscriptSegments s ON s.segment_id = TranscriptSegmentsFTS.rowid
+            WHERE TranscriptSegmentsFTS MATCH ?
+        """
+        sql, params = self._add_filters(
+            sql, [build_match_query(query)], 's.ticker', 's.call_date',
+            tickers, start_date, end_date
+        )
+        return self._run(sql + " ORDER BY rank LIMIT ?", params + [limit])
+    
+    def _add_filters(
+        self,
+        sql: str,
+        params: List,
+        ticker_col: str,
+        date_col: str,
+        tickers: Optional[List[str]],
+        start_date: Optional[DateLike],
+        end_date: Optional[DateLike]
+    ):
+        """Append ticker/date WHERE clauses."""
+        if tickers:
+            sql += f" AND {ticker_col} IN ({','.join('?' * len(tickers))})"
+            params += [t.upper() for t in tickers]
+        if start_date is not None:
+            sql += f" AND {date_col} >= ?"
+            params.append(_to_date_str(start_date))
+        if end_date is not None:
+            # Dates are stored as text; compare against the end of the day
+            sql += f" AND {date_col} <= ?"
+            params.append(_to_date_str(end_date) + ' 23:59:59')
+        return sql, params
+    
+    def _run(self, sql: str, params: List) -> List[Dict]:
+        """Execute a search query, returning [] for empty/invalid queries."""
+        if not params[0]:
+            return []
+        try:
+            with self._lock:
+                rows = self.db.conn.execute(sql, params).fetchall()
+        except Exception as e:
+            logger.error(f"Search failed: {e}")
+            return []
+        return [dict(row) for row in rows]
+
+
+# Global instance
+_index = None
+_index_lock = threading.Lock()
+
+def get_search_index() -> SearchIndex:
+    """Get or create global search index instance."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+    return _index
@@ -0,0 +1,176 @@
+"""
+Request coalescing (single-flight) for upstream API calls.
+Concurrent calls with the same key wait for one in-flight call and share
+its result instead of each hitting the API.
+"""
+import functools
+import inspect
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight call that followers wait on."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+def _share(value: Any) -> Any:
+    """Give followers their own copy of mutable results (DataFrames, dicts)."""
+    copy = getattr(value, 'copy', None)
+    return copy() if callable(copy) else value
+
+
+class SingleFlight:
+    """Group of keyed calls where only one call per key runs at a time."""
+    
+    def __init__(self, name: str):
+        """
+        Initialize the group.
+        
+        Args:
+            name: Group name used in metrics
+        """
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+    
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) unless a call with the same key is in flight,
+        in which case wait for it and return its result.
+        
+        Args:
+            key: Identity of the call
+            fn: Function to run
+        
+        Returns:
+            The result of the (shared) call
+        
+        Raises:
+            Whatever the shared call raised
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return _share(call.result)
+        
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        
+        if not call.followers:
+            return call.result
+        
+        # The shared object stays untouched; every caller mutates its own copy
+        logger.info(f"single-flight[{self.name}] {key!r}: shared with {call.followers} waiting callers")
+        return _share(call.result)
+    
+    def stats(self) -> Dict:
+        """
+        Get coalescing metrics.
+        
+        Returns:
+            Dict with calls, executions, coalesced, errors, in_flight and
+            coalesced_ratio
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'errors': self.errors,
+                'in_flight': len(self._calls),
+                'coalesced_ratio': self.coalesced / self.calls if self.calls else 0.0
+            }
+
+
+# Registry of named groups
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+def get_group(name: str) -> SingleFlight:
+    """Get or create a named single-flight group."""
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight(name)
+    return group
+
+
+def get_single_flight_stats() -> Dict[str, Dict]:
+    """Get metrics for every single-flight group."""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.stats() for group in groups}
+
+
+def single_flight(group: str, is_method: bool = True) -> Callable:
+    """
+    Decorator coalescing concurrent calls with identical arguments.
+    
+    For methods the instance is left out of the key, so separate fetcher
+    instances (one per Streamlit session) still share in-flight calls.
+    
+    Args:
+        group: Name of the single-flight group (one per data source)
+        is_method: Whether the first argument is self
+    
+    Returns:
+        Decorator
+    """
+    def decorator(fn: Callable) -> Callable:
+        flight = get_group(group)
+        signature = inspect.signature(fn)
+        
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            # Bind to the signature so f(x, period='1y') and f(x, '1y') share a key
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                return fn(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = list(bound.arguments.items())[1 if is_method else 0:]
+            key = (fn.__qualname__, tuple(arguments))
+            try:
+                hash(key)
+            except TypeError:
+                return fn(*args, **kwargs)  # Unhashable arguments cannot be coalesced
+            return flight.do(key, fn, *args, **kwargs)
+        
+        return wrapper
+    
+    return decorator
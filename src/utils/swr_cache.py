@@ -0,0 +1,309 @@
+"""
+Stale-while-revalidate cache for market data.
+Serves the last good value immediately once it is past its TTL and refreshes
+it in the background; keys can be invalidated individually. A load that fails
+or returns no data never replaces the last good value.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+from src.utils.cache_backend import is_empty_result
+from src.utils.single_flight import SingleFlight
+from config.settings import SWR_TTLS, SWR_MAX_STALE_SECONDS, SWR_REFRESH_WORKERS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 3600  # seconds, for data types without an entry in SWR_TTLS
+
+
+class _Entry:
+    """Cached value with its age and refresh state."""
+    
+    def __init__(self, value: Any, ttl: float):
+        self.value = value
+        self.ttl = ttl
+        self.fetched_at = time.time()
+        self.invalidated = False
+        self.refreshing = False
+        self.last_error: Optional[str] = None
+    
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+    
+    @property
+    def stale(self) -> bool:
+        return self.invalidated or self.age > self.ttl
+
+
+class NoDataError(Exception):
+    """A loader returned None or an empty result (the fetchers' failure signal)."""
+    
+    def __init__(self, key: Hashable, value: Any):
+        super().__init__(f"no data returned for {key!r}")
+        self.value = value
+
+
+def _copy(value: Any) -> Any:
+    """Hand out copies of DataFrames so callers cannot mutate the cached value."""
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    return value
+
+
+class SWRCache:
+    """In-process stale-while-revalidate cache shared by all sessions."""
+    
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_stale_seconds: float = SWR_MAX_STALE_SECONDS,
+        refresh_workers: int = SWR_REFRESH_WORKERS
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            ttls: Seconds a value stays fresh, per data type
+            max_stale_seconds: Age beyond which a stale value is not served
+                               and the caller waits for a fresh load
+            refresh_workers: Background refresh threads
+        """
+        self.ttls = ttls if ttls is not None else SWR_TTLS
+        self.max_stale_seconds = max_stale_seconds
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight('swr-cache')
+        self.executor = ThreadPoolExecutor(
+            max_workers=refresh_workers,
+            thread_name_prefix='swr-refresh'
+        )
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+    
+    def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        data_type: str = 'default',
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Get a value, loading it on a miss and revalidating it when stale.
+        
+        Args:
+            key: Cache key
+            loader: Zero-argument function that fetches the value
+            data_type: Data type used to pick the TTL (e.g. 'quotes', 'history')
+            ttl: Explicit TTL in seconds, overriding the data type
+        
+        Returns:
+            Cached (possibly stale) or freshly loaded value
+        """
+        ttl = ttl if ttl is not None else self.ttls.get(data_type, DEFAULT_TTL)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not entry.stale:
+                self.hits += 1
+                return _copy(entry.value)
+            serve_stale = entry is not None and entry.age <= self.max_stale_seconds
+            if serve_stale:
+                self.stale_hits += 1
+                if not entry.refreshing:
+                    entry.refreshing = True
+                    self.executor.submit(self._refresh, key, loader, ttl)
+                return _copy(entry.value)
+            self.misses += 1
+        
+        # Cold (or too old): concurrent callers share one synchronous load
+        try:
+            return _copy(self._flight.do(key, self._load, key, loader, ttl))
+        except Exception as e:
+            found, value = self._keep_previous(key, e)
+            if found:
+                logger.warning(f"Load of {key!r} failed ({e}); serving the previous value")
+                return _copy(value)
+            if isinstance(e, NoDataError):
+                return e.value  # Nothing to fall back on; not cached, so retried next time
+            raise
+    
+    def _load(self, key: Hashable, loader: Callable[[], Any], ttl: float) -> Any:
+        """
+        Fetch a value and store it.
+        
+        Raises:
+            NoDataError: If the loader returned None or an empty result
+        """
+        value = loader()
+        if is_empty_result(value):
+            raise NoDataError(key, value)
+        with self._lock:
+            self._entries[key] = _Entry(value, ttl)
+        return value
+    
+    def _keep_previous(self, key: Hashable, error: Exception) -> Tuple[bool, Any]:
+        """
+        Record a failed load against the existing entry, which stays as is.
+        
+        Returns:
+            Tuple of (whether an entry exists, its value)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            entry.refreshing = False
+            entry.last_error = str(error)
+            return True, entry.value
+    
+    def _refresh(self, key: Hashable, loader: Callable[[], Any], ttl: float):
+        """Background revalidation; on failure the stale value is kept."""
+        try:
+            self._flight.do(key, self._load, key, loader, ttl)
+            logger.info(f"Revalidated cache key {key!r}")
+        except Exception as e:
+            logger.error(f"Background refresh of {key!r} failed: {e}")
+            self._keep_previous(key, e)
+    
+    def is_due(self, key: Hashable, data_type: str = 'default', lead: float = 1.0) -> bool:
+        """
+        Whether a key is missing, invalidated or close to expiry.
+        
+        Args:
+            key: Cache key
+            data_type: Data type used to pick the TTL
+            lead: Fraction of the TTL after which the key counts as due
+        
+        Returns:
+            True if the key should be (re)loaded
+        """
+        ttl = self.ttls.get(data_type, DEFAULT_TTL)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is None or entry.invalidated or entry.age >= ttl * lead
+    
+    def refresh(self, key: Hashable, loader: Callable[[], Any], data_type: str = 'default') -> Any:
+        """
+        Load a value now and store it, without counting a hit or miss.
+        Used to warm keys ahead of expiry.
+        
+        Args:
+            key: Cache key
+            loader: Zero-argument function that fetches the value
+            data_type: Data type used to pick the TTL
+        
+        Returns:
+            Freshly loaded value
+        
+        Raises:
+            NoDataError: If the loader returned no data (the cached value is kept)
+        """
+        ttl = self.ttls.get(data_type, DEFAULT_TTL)
+        try:
+            return self._flight.do(key, self._load, key, loader, ttl)
+        except Exception as e:
+            self._keep_previous(key, e)
+            raise
+    
+    def peek(self, key: Hashable) -> Any:
+        """
+        Get a copy of the cached value regardless of age, without loading.
+        
+        Returns:
+            Cached value or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return _copy(entry.value) if entry is not None else None
+    
+    def invalidate(self, key: Hashable, drop: bool = False):
+        """
+        Invalidate one key.
+        
+        Args:
+            key: Cache key
+            drop: Remove the value entirely (next reader waits for a load)
+                  instead of marking it stale (next reader gets the old value
+                  while it is refreshed)
+        """
+        with self._lock:
+            if drop:
+                self._entries.pop(key, None)
+            elif key in self._entries:
+                self._entries[key].invalidated = True
+    
+    def invalidate_where(self, predicate: Callable[[Hashable], bool], drop: bool = False) -> int:
+        """
+        Invalidate every key matching a predicate.
+        
+        Args:
+            predicate: Function called with each key
+            drop: See invalidate
+        
+        Returns:
+            Number of keys invalidated
+        """
+        with self._lock:
+            keys = [k for k in self._entries if predicate(k)]
+        for key in keys:
+            self.invalidate(key, drop)
+        return len(keys)
+    
+    def info(self, key: Hashable) -> Optional[Dict]:
+        """
+        Describe a cached key for display.
+        
+        Returns:
+            Dict with fetched_at, age, stale, refreshing and last_error, or
+            None if the key is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return {
+                'fetched_at': pd.Timestamp.fromtimestamp(entry.fetched_at),
+                'age': entry.age,
+                'stale': entry.stale,
+                'refreshing': entry.refreshing,
+                'last_error': entry.last_error
+            }
+    
+    def stats(self) -> Dict:
+        """Get hit/miss counts and the number of cached keys."""
+        with self._lock:
+            return {
+                'keys': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses
+            }
+    
+    def keys(self) -> List[Hashable]:
+        """List cached keys."""
+        with self._lock:
+            return list(self._entries)
+
+
+# Global instance
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_swr_cache() -> SWRCache:
+    """Get or create global stale-while-revalidate cache instance."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SWRCache()
+    return _cache